@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""Benchmark the per-request overhead of Core connections vs ORM sessions.
+
+Each iteration simulates the database lifecycle of a single request that only
+runs a hand-written Core statement, either in a request session
+(:meth:`falcon_sqla.Manager.session_scope`) or in a plain connection
+(:meth:`falcon_sqla.Manager.connection_scope`). Alternatively, whole requests
+can be simulated through a Falcon app using the respective middleware.
+
+Usage::
+
+    $ python benchmarks/connection_scope.py [--iterations N] [--app]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import statistics
+import time
+from typing import Any, Callable
+
+import falcon
+import falcon.testing
+from sqlalchemy import Connection
+from sqlalchemy import create_engine
+from sqlalchemy import Engine
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+import falcon_sqla
+
+STATEMENT = text('SELECT name FROM items WHERE id = :id')
+
+
+def create_manager(engine: Engine) -> falcon_sqla.Manager:
+    manager = falcon_sqla.Manager(engine)
+    # NOTE: Register a replica to exercise the role-based routing.
+    manager.add_engine(engine.execution_options(), falcon_sqla.EngineRole.READ)
+    return manager
+
+
+def session_cycle(manager: falcon_sqla.Manager) -> Callable[[], None]:
+    resp = falcon.Response()
+
+    def cycle() -> None:
+        req = falcon.testing.create_req()
+        with manager.session_scope(req, resp) as session:
+            session.execute(STATEMENT, {'id': 1}).scalar_one()
+
+    return cycle
+
+
+def connection_cycle(manager: falcon_sqla.Manager) -> Callable[[], None]:
+    resp = falcon.Response()
+
+    def cycle() -> None:
+        req = falcon.testing.create_req()
+        with manager.connection_scope(req, resp) as connection:
+            connection.execute(STATEMENT, {'id': 1}).scalar_one()
+
+    return cycle
+
+
+class ItemResource:
+    def on_get_session(
+        self, req: falcon.Request, resp: falcon.Response
+    ) -> None:
+        session: Session = req.context.session
+        resp.media = session.execute(STATEMENT, {'id': 1}).scalar_one()
+
+    def on_get_connection(
+        self, req: falcon.Request, resp: falcon.Response
+    ) -> None:
+        connection: Connection = req.context.connection
+        resp.media = connection.execute(STATEMENT, {'id': 1}).scalar_one()
+
+
+def app_cycle(manager: falcon_sqla.Manager, kind: str) -> Callable[[], None]:
+    middleware = (
+        manager.middleware
+        if kind == 'session'
+        else manager.connection_middleware
+    )
+    app = falcon.App(middleware=[middleware])
+    app.add_route('/item', ItemResource(), suffix=kind)
+    client = falcon.testing.TestClient(app)
+
+    def cycle() -> None:
+        client.simulate_get('/item')
+
+    return cycle
+
+
+def run(kind: str, cycle: Callable[[], None], iterations: int) -> Any:
+    for _ in range(1000):
+        cycle()
+
+    timings = []
+    gc.collect()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        cycle()
+        timings.append(time.perf_counter() - start)
+
+    return {
+        'kind': kind,
+        'mean_us': statistics.fmean(timings) * 1e6,
+        'p50_us': statistics.median(timings) * 1e6,
+        'p99_us': statistics.quantiles(timings, n=100)[98] * 1e6,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=20000)
+    parser.add_argument(
+        '--app',
+        action='store_true',
+        help='simulate whole requests through a Falcon app',
+    )
+    args = parser.parse_args()
+
+    engine = create_engine('sqlite://')
+    with engine.begin() as conn:
+        conn.exec_driver_sql('CREATE TABLE items (id INTEGER, name TEXT)')
+        conn.exec_driver_sql("INSERT INTO items VALUES (1, 'one')")
+
+    manager = create_manager(engine)
+    for kind in ('session', 'connection'):
+        if args.app:
+            cycle = app_cycle(manager, kind)
+        elif kind == 'session':
+            cycle = session_cycle(manager)
+        else:
+            cycle = connection_cycle(manager)
+
+        result = run(kind, cycle, args.iterations)
+        print(
+            '  '.join(
+                f'{key}={value:.1f}'
+                if isinstance(value, float)
+                else f'{key}={value}'
+                for key, value in result.items()
+            )
+        )
+
+
+if __name__ == '__main__':
+    main()
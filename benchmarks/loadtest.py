@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""Load test routing options & pool settings with SQLite replicas.
+
+The solar system app from ``examples/solar_sync.py`` is served by a local
+threaded WSGI server, backed by a primary SQLite engine and a number of
+read-only engines (replicas) opening the same database file. A configurable
+mix of reads and writes is then driven from many client threads (or
+processes) for each combination of the requested manager configurations.
+Throughput, latency percentiles, and the distribution of statements among the
+engines are reported as JSON.
+
+Usage::
+
+    $ python benchmarks/loadtest.py [--replicas N] [--clients N]
+          [--processes] [--duration SECONDS] [--write-ratio RATIO]
+          [--sticky-binds false,true] [--read-from-rw-engines true,false]
+          [--write-engine-if-flushing true] [--pool-size 5]
+          [--max-overflow 10] [--output results.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import concurrent.futures
+import contextlib
+import http.client
+import importlib
+import itertools
+import json
+import pathlib
+import random
+import socketserver
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from typing import Any
+import wsgiref.simple_server
+
+from sqlalchemy import create_engine
+from sqlalchemy import Engine
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+import falcon_sqla
+
+EXAMPLES_PATH = pathlib.Path(__file__).resolve().parent.parent / 'examples'
+
+READ_PATHS = (
+    '/planets',
+    '/planets/earth',
+    '/planets/jupiter',
+    '/satellites',
+    '/satellites/moon',
+    '/dwarfplanets/pluto',
+)
+WRITE_NAMES = ('mercury', 'venus', 'earth', 'mars')
+
+
+class ThreadingWSGIServer(
+    socketserver.ThreadingMixIn, wsgiref.simple_server.WSGIServer
+):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class QuietHandler(wsgiref.simple_server.WSGIRequestHandler):
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def parse_bools(value: str) -> list[bool]:
+    return [
+        item.strip().lower() in {'1', 'true', 'yes'}
+        for item in value.split(',')
+    ]
+
+
+def parse_ints(value: str) -> list[int]:
+    return [int(item) for item in value.split(',')]
+
+
+def create_replica(
+    path: pathlib.Path, pool_size: int, max_overflow: int
+) -> Engine:
+    # NOTE: The same approach as the read-only engine in tests/conftest.py.
+    def connect_ro() -> sqlite3.Connection:
+        return sqlite3.connect(
+            f'file:{path}?mode=ro', uri=True, check_same_thread=False
+        )
+
+    return create_engine(
+        'sqlite://',
+        creator=connect_ro,
+        poolclass=QueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+    )
+
+
+def count_statements(engine: Engine, counts: dict[str, int], key: str) -> None:
+    lock = threading.Lock()
+    counts[key] = 0
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(*args: Any) -> None:
+        with lock:
+            counts[key] += 1
+
+
+def drive(
+    port: int, duration: float, write_ratio: float, seed: int
+) -> list[tuple[str, float, int]]:
+    """Issue requests for ``duration`` seconds.
+
+    Returns a list of ``(kind, latency, status)`` tuples.
+    """
+    rng = random.Random(seed)
+    samples = []
+    deadline = time.perf_counter() + duration
+
+    while time.perf_counter() < deadline:
+        if rng.random() < write_ratio:
+            kind = 'write'
+            method = 'PUT'
+            path = f'/planets/{rng.choice(WRITE_NAMES)}'
+            body: bytes | None = json.dumps(
+                {'mass': rng.uniform(1e23, 1e25)}
+            ).encode()
+        else:
+            kind = 'read'
+            method = 'GET'
+            path = rng.choice(READ_PATHS)
+            body = None
+
+        start = time.perf_counter()
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        try:
+            headers = {'Content-Type': 'application/json'} if body else {}
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            status = response.status
+        except OSError:
+            status = 0
+        finally:
+            conn.close()
+        samples.append((kind, time.perf_counter() - start, status))
+
+    return samples
+
+
+def summarize(latencies: list[float], duration: float) -> dict[str, Any]:
+    if len(latencies) < 2:
+        return {'requests': len(latencies)}
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    return {
+        'requests': len(latencies),
+        'throughput_rps': len(latencies) / duration,
+        'latency_ms': {
+            'mean': statistics.fmean(latencies) * 1e3,
+            'p50': percentiles[49] * 1e3,
+            'p95': percentiles[94] * 1e3,
+            'p99': percentiles[98] * 1e3,
+        },
+    }
+
+
+def run(
+    args: argparse.Namespace, solar: Any, config: dict[str, Any]
+) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix='falcon-sqla-load-') as tmp:
+        path = pathlib.Path(tmp) / 'solar_system.sqlite'
+
+        with contextlib.redirect_stdout(sys.stderr):
+            primary = solar.init_engine(f'sqlite:///{path}', fresh=True)
+        primary.dispose()
+        primary = create_engine(
+            f'sqlite:///{path}',
+            pool_size=config['pool_size'],
+            max_overflow=config['max_overflow'],
+            connect_args={'timeout': 30},
+        )
+
+        counts: dict[str, int] = {}
+        count_statements(primary, counts, 'primary')
+
+        manager = falcon_sqla.Manager(primary)
+        options = manager.session_options
+        # NOTE: These options are applied upon adding engines.
+        options.read_from_rw_engines = config['read_from_rw_engines']
+        options.sticky_binds = config['sticky_binds']
+        options.write_engine_if_flushing = config['write_engine_if_flushing']
+
+        for index in range(args.replicas):
+            replica = create_replica(
+                path, config['pool_size'], config['max_overflow']
+            )
+            count_statements(replica, counts, f'replica{index}')
+            manager.add_engine(replica, falcon_sqla.EngineRole.READ)
+
+        app = solar.create_app(manager)
+        server = wsgiref.simple_server.make_server(
+            '127.0.0.1',
+            0,
+            app,
+            server_class=ThreadingWSGIServer,
+            handler_class=QuietHandler,
+        )
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        executor: concurrent.futures.Executor
+        if args.processes:
+            executor = concurrent.futures.ProcessPoolExecutor(args.clients)
+        else:
+            executor = concurrent.futures.ThreadPoolExecutor(args.clients)
+
+        start = time.perf_counter()
+        try:
+            with executor:
+                futures = [
+                    executor.submit(
+                        drive,
+                        server.server_port,
+                        args.duration,
+                        args.write_ratio,
+                        args.seed + index,
+                    )
+                    for index in range(args.clients)
+                ]
+                samples = [
+                    sample for future in futures for sample in future.result()
+                ]
+        finally:
+            elapsed = time.perf_counter() - start
+            server.shutdown()
+            server.server_close()
+            for engine in manager.read_engines + manager.write_engines:
+                engine.dispose()
+
+    ok = [sample for sample in samples if 200 <= sample[2] < 300]
+    return {
+        'config': config,
+        'errors': len(samples) - len(ok),
+        **summarize([latency for _, latency, _ in ok], elapsed),
+        'reads': summarize(
+            [latency for kind, latency, _ in ok if kind == 'read'], elapsed
+        ),
+        'writes': summarize(
+            [latency for kind, latency, _ in ok if kind == 'write'], elapsed
+        ),
+        'statements': counts,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('--replicas', type=int, default=3)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument(
+        '--processes',
+        action='store_true',
+        help='drive the load from client processes instead of threads',
+    )
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--write-ratio', type=float, default=0.1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--sticky-binds', type=parse_bools, default=[False])
+    parser.add_argument(
+        '--read-from-rw-engines', type=parse_bools, default=[True]
+    )
+    parser.add_argument(
+        '--write-engine-if-flushing', type=parse_bools, default=[True]
+    )
+    parser.add_argument('--pool-size', type=parse_ints, default=[5])
+    parser.add_argument('--max-overflow', type=parse_ints, default=[10])
+    parser.add_argument(
+        '--output', help='write JSON results to this file (default: stdout)'
+    )
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(EXAMPLES_PATH))
+    solar = importlib.import_module('solar_sync')
+
+    keys = (
+        'sticky_binds',
+        'read_from_rw_engines',
+        'write_engine_if_flushing',
+        'pool_size',
+        'max_overflow',
+    )
+    results = []
+    for values in itertools.product(*(getattr(args, key) for key in keys)):
+        config = dict(zip(keys, values))
+        print(f'Running {config}...', file=sys.stderr)
+        results.append(run(args, solar, config))
+
+    report = {
+        'parameters': {
+            'replicas': args.replicas,
+            'clients': args.clients,
+            'processes': args.processes,
+            'duration': args.duration,
+            'write_ratio': args.write_ratio,
+            'seed': args.seed,
+        },
+        'results': results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        pathlib.Path(args.output).write_text(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""Benchmark the round trips saved by read-only modes of safe requests.
+
+A Falcon app serving a number of ``GET`` requests (each running a few SELECT
+statements) is simulated with every :class:`falcon_sqla.ReadOnlyMode`. The
+statements actually sent to SQLite are recorded via the ``sqlite3`` trace
+callback, and summarized per request along with the mean request latency.
+
+Since pysqlite does not emit ``BEGIN`` before SELECT statements by default,
+the SQLAlchemy recipe for explicit ``BEGIN`` is applied to the engine in order
+to mimic the behaviour of client-server databases (where every transaction
+begins and ends with a round trip).
+
+Usage::
+
+    $ python benchmarks/read_only.py [--requests N] [--queries N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import collections
+import pathlib
+import sqlite3
+import statistics
+import tempfile
+import time
+from typing import Any, Optional
+
+import falcon
+import falcon.testing
+from sqlalchemy import Connection
+from sqlalchemy import create_engine
+from sqlalchemy import Engine
+from sqlalchemy import event
+from sqlalchemy import insert
+from sqlalchemy import select
+from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+from sqlalchemy.pool import ConnectionPoolEntry
+
+import falcon_sqla
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Item(Base):
+    __tablename__ = 'items'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str]
+
+
+class Items:
+    def __init__(self, queries: int) -> None:
+        self.queries = queries
+
+    def on_get(self, req: falcon.Request, resp: falcon.Response) -> None:
+        session = req.context.session
+        resp.media = [
+            session.scalars(select(Item.name).where(Item.id == pk)).one()
+            for pk in range(1, self.queries + 1)
+        ]
+
+
+def create_traced_engine(
+    path: pathlib.Path, statements: collections.Counter[str]
+) -> Engine:
+    engine = create_engine(f'sqlite:///{path}')
+
+    def trace(statement: str) -> None:
+        statements[statement.split(None, 1)[0].upper()] += 1
+
+    @event.listens_for(engine, 'connect')
+    def connect(
+        dbapi_connection: sqlite3.Connection, record: ConnectionPoolEntry
+    ) -> None:
+        dbapi_connection.set_trace_callback(trace)
+
+    @event.listens_for(engine, 'begin')
+    def begin(conn: Connection) -> None:
+        options = conn.get_execution_options()
+        if options.get('isolation_level') == 'AUTOCOMMIT':
+            return
+
+        # NOTE: Disable pysqlite's own transaction handling, and emit BEGIN
+        #   explicitly (see also the SQLAlchemy docs on "Serializable
+        #   isolation / Savepoints / Transactional DDL").
+        dbapi_connection: Any = conn.connection.dbapi_connection
+        dbapi_connection.isolation_level = None
+        conn.exec_driver_sql('BEGIN')
+
+    return engine
+
+
+def run(
+    path: pathlib.Path,
+    mode: Optional[falcon_sqla.ReadOnlyMode],
+    requests: int,
+    queries: int,
+) -> dict[str, Any]:
+    statements: collections.Counter[str] = collections.Counter()
+    engine = create_traced_engine(path, statements)
+
+    manager = falcon_sqla.Manager(engine)
+    manager.session_options.read_only_mode = mode
+    app = falcon.App(middleware=[manager.middleware])
+    app.add_route('/items', Items(queries))
+    client = falcon.testing.TestClient(app)
+
+    # NOTE: Warm up the connection pool and the compiled cache.
+    client.simulate_get('/items')
+    statements.clear()
+
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        result = client.simulate_get('/items')
+        timings.append(time.perf_counter() - start)
+        assert result.status_code == 200
+    engine.dispose()
+
+    total = sum(statements.values())
+    return {
+        'mode': mode.name if mode else 'DEFAULT',
+        'statements_per_request': total / requests,
+        'overhead_per_request': (total - statements['SELECT']) / requests,
+        **{
+            f'{kind.lower()}_per_request': count / requests
+            for kind, count in sorted(statements.items())
+            if kind != 'SELECT'
+        },
+        'mean_us': statistics.fmean(timings) * 1e6,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--queries', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='falcon-sqla-ro-') as tmp:
+        path = pathlib.Path(tmp) / 'read_only.sqlite'
+        engine = create_engine(f'sqlite:///{path}')
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(
+                insert(Item),
+                [
+                    {'id': pk, 'name': f'item{pk}'}
+                    for pk in range(1, args.queries + 1)
+                ],
+            )
+        engine.dispose()
+
+        modes: list[Optional[falcon_sqla.ReadOnlyMode]] = [None]
+        modes.extend(falcon_sqla.ReadOnlyMode)
+        for mode in modes:
+            result = run(path, mode, args.requests, args.queries)
+            print(
+                '  '.join(
+                    f'{key}={value:.2f}'
+                    if isinstance(value, float)
+                    else f'{key}={value}'
+                    for key, value in result.items()
+                )
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Benchmark request session construction with and without recycling.
+
+Each iteration simulates the session lifecycle of a single request, as driven
+by falcon_sqla's middleware: obtain a session, run one primary key lookup, and
+finalize the session.
+
+Usage::
+
+    $ python benchmarks/session_recycling.py [--iterations N] [--no-query]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import statistics
+import time
+import tracemalloc
+from typing import Any
+
+import falcon
+import falcon.testing
+from sqlalchemy import create_engine
+from sqlalchemy import Engine
+from sqlalchemy import insert
+from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+
+import falcon_sqla
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Item(Base):
+    __tablename__ = 'items'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str]
+
+
+def create_manager(engine: Engine, recycle: int) -> falcon_sqla.Manager:
+    manager = falcon_sqla.Manager(engine)
+    # NOTE: Register a replica to exercise the manager's get_bind().
+    manager.add_engine(engine.execution_options(), falcon_sqla.EngineRole.READ)
+    manager.session_options.recycle_sessions = recycle
+    return manager
+
+
+def cycle(manager: falcon_sqla.Manager, query: bool) -> None:
+    req = falcon.testing.create_req()
+    resp = falcon.Response()
+
+    session = manager.get_session(req, resp)
+    if query:
+        session.get(Item, 1)
+    manager.close_session(session, True, req, resp)
+
+
+def run(engine: Engine, recycle: int, iterations: int, query: bool) -> Any:
+    manager = create_manager(engine, recycle)
+    for _ in range(1000):
+        cycle(manager, query)
+
+    timings = []
+    gc.collect()
+    gen0 = gc.get_stats()[0]['collections']
+    for _ in range(iterations):
+        start = time.perf_counter()
+        cycle(manager, query)
+        timings.append(time.perf_counter() - start)
+    gen0 = gc.get_stats()[0]['collections'] - gen0
+
+    tracemalloc.start()
+    peaks = []
+    for _ in range(min(iterations, 2000)):
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        cycle(manager, query)
+        peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    tracemalloc.stop()
+
+    return {
+        'recycle_sessions': recycle,
+        'mean_us': statistics.fmean(timings) * 1e6,
+        'p50_us': statistics.median(timings) * 1e6,
+        'p99_us': statistics.quantiles(timings, n=100)[98] * 1e6,
+        'gen0_collections_per_1k': gen0 * 1000 / iterations,
+        'peak_bytes_per_request': statistics.fmean(peaks),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=20000)
+    parser.add_argument('--no-query', action='store_true')
+    args = parser.parse_args()
+
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Item), [{'id': 1, 'name': 'one'}])
+
+    for recycle in (0, 4):
+        result = run(engine, recycle, args.iterations, not args.no_query)
+        print(
+            '  '.join(
+                f'{key}={value:.1f}'
+                if isinstance(value, float)
+                else f'{key}={value}'
+                for key, value in result.items()
+            )
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""Benchmark the SQLite production profile against a naive single engine.
+
+A number of client threads simulate the database lifecycle of requests
+against a SQLite database file: most requests are ``GET`` requests running a
+couple of SELECT statements, while the rest are ``POST`` requests inserting a
+row. This is done using a manager created by
+:meth:`falcon_sqla.Manager.for_sqlite` (WAL, tuned pragmas, read-only reader
+engines, and a serialized writer), and using a manager wrapping a single
+engine with the default settings (rollback journal).
+
+Throughput, latency percentiles and errors (e.g., ``database is locked``) are
+reported for reads and writes separately.
+
+Usage::
+
+    $ python benchmarks/sqlite_profile.py [--clients N] [--readers N]
+          [--duration SECONDS] [--write-ratio RATIO]
+"""
+
+from __future__ import annotations
+
+import argparse
+import concurrent.futures
+import pathlib
+import random
+import statistics
+import tempfile
+import time
+from typing import Any
+
+import falcon
+import falcon.testing
+from sqlalchemy import create_engine
+from sqlalchemy import exc
+from sqlalchemy import func
+from sqlalchemy import select
+from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+
+import falcon_sqla
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Item(Base):
+    __tablename__ = 'items'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str]
+
+
+def drive(
+    manager: falcon_sqla.Manager,
+    duration: float,
+    write_ratio: float,
+    seed: int,
+) -> list[tuple[str, float, bool]]:
+    """Simulate requests for ``duration`` seconds.
+
+    Returns a list of ``(kind, latency, succeeded)`` tuples.
+    """
+    rng = random.Random(seed)
+    resp = falcon.Response()
+    samples = []
+    deadline = time.perf_counter() + duration
+
+    while time.perf_counter() < deadline:
+        kind = 'write' if rng.random() < write_ratio else 'read'
+        req = falcon.testing.create_req(
+            method='POST' if kind == 'write' else 'GET'
+        )
+
+        start = time.perf_counter()
+        try:
+            with manager.session_scope(req, resp) as session:
+                if kind == 'write':
+                    session.add(Item(name=f'item{rng.random()}'))
+                else:
+                    last = session.scalar(select(func.max(Item.id))) or 0
+                    session.scalars(
+                        select(Item.name).where(Item.id > last - 10)
+                    ).all()
+            succeeded = True
+        except exc.OperationalError:
+            succeeded = False
+        samples.append((kind, time.perf_counter() - start, succeeded))
+
+    return samples
+
+
+def summarize(
+    samples: list[tuple[str, float, bool]], duration: float
+) -> dict[str, Any]:
+    latencies = [latency for _, latency, succeeded in samples if succeeded]
+    summary: dict[str, Any] = {
+        'requests': len(latencies),
+        'errors': len(samples) - len(latencies),
+    }
+    if len(latencies) >= 2:
+        percentiles = statistics.quantiles(latencies, n=100)
+        summary.update(
+            throughput_rps=len(latencies) / duration,
+            p50_ms=percentiles[49] * 1e3,
+            p99_ms=percentiles[98] * 1e3,
+        )
+    return summary
+
+
+def run(
+    name: str, manager: falcon_sqla.Manager, args: argparse.Namespace
+) -> None:
+    with manager.session_scope() as session:
+        session.add_all(Item(name=f'item{index}') for index in range(100))
+
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(args.clients) as executor:
+        futures = [
+            executor.submit(
+                drive, manager, args.duration, args.write_ratio, index
+            )
+            for index in range(args.clients)
+        ]
+        samples = [sample for future in futures for sample in future.result()]
+    elapsed = time.perf_counter() - start
+
+    for engine in set(manager.read_engines + manager.write_engines):
+        engine.dispose()
+
+    for kind in ('read', 'write'):
+        summary = summarize(
+            [sample for sample in samples if sample[0] == kind], elapsed
+        )
+        print(
+            f'{name:8} {kind:5} '
+            + '  '.join(
+                f'{key}={value:.2f}'
+                if isinstance(value, float)
+                else f'{key}={value}'
+                for key, value in summary.items()
+            )
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=3.0)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='falcon-sqla-sqlite-') as tmp:
+        path = pathlib.Path(tmp) / 'naive.sqlite'
+        engine = create_engine(f'sqlite:///{path}')
+        Base.metadata.create_all(engine)
+        run('naive', falcon_sqla.Manager(engine), args)
+
+        path = pathlib.Path(tmp) / 'profile.sqlite'
+        manager = falcon_sqla.Manager.for_sqlite(path, readers=args.readers)
+        Base.metadata.create_all(manager.write_engines[0])
+        run('profile', manager, args)
+
+
+if __name__ == '__main__':
+    main()
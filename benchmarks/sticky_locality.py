@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""Benchmark the cache locality of sticky routing strategies.
+
+Each replica is modelled as an LRU buffer cache of a fixed number of pages.
+Requests come from clients (e.g., tenants) with a Zipf-distributed
+popularity, and each request reads a few pages from its client's working set.
+Requests are routed by :meth:`falcon_sqla.Manager.get_bind` using:
+
+* ``random``: no stickiness (``sticky_binds = False``);
+* ``request``: stickiness within a request only (``sticky_binds = True``);
+* ``consistent``: stickiness by client on a consistent-hash ring
+  (``sticky_key_func``).
+
+The buffer cache hit ratio is reported for each strategy, before and after
+adding another replica halfway through. Moreover, the fraction of clients
+remapped upon adding the replica is compared between the consistent-hash ring
+and naive ``hash(key) % N`` routing.
+
+Usage::
+
+    $ python benchmarks/sticky_locality.py [--replicas N] [--clients N]
+          [--requests N] [--zipf S] [--cache-pages N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import collections
+import random
+import uuid
+
+import falcon
+import falcon.testing
+from sqlalchemy import create_engine
+from sqlalchemy import Engine
+
+import falcon_sqla
+from falcon_sqla.hashring import context_key
+from falcon_sqla.hashring import HashRing
+
+PAGES_PER_CLIENT = 64
+PAGES_PER_REQUEST = 4
+
+
+class LRUCache:
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.pages: collections.OrderedDict[tuple[int, int], None] = (
+            collections.OrderedDict()
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def read(self, page: tuple[int, int]) -> None:
+        if page in self.pages:
+            self.pages.move_to_end(page)
+            self.hits += 1
+            return
+
+        self.misses += 1
+        self.pages[page] = None
+        if len(self.pages) > self.capacity:
+            self.pages.popitem(last=False)
+
+
+def create_replica(index: int) -> Engine:
+    # NOTE: Engines connect lazily, so no database is ever opened here.
+    return create_engine(f'sqlite:///replica{index}.db')
+
+
+def create_manager(strategy: str, replicas: int) -> falcon_sqla.Manager:
+    manager = falcon_sqla.Manager(create_replica(0))
+    options = manager.session_options
+    options.read_from_rw_engines = False
+    options.sticky_binds = strategy != 'random'
+    if strategy == 'consistent':
+        options.sticky_key_func = context_key('client')
+    for index in range(replicas):
+        manager.add_engine(
+            create_replica(index + 1), falcon_sqla.EngineRole.READ
+        )
+    return manager
+
+
+def simulate(
+    manager: falcon_sqla.Manager,
+    caches: dict[Engine, LRUCache],
+    clients: list[int],
+    rng: random.Random,
+) -> float:
+    hits = sum(cache.hits for cache in caches.values())
+    total = sum(cache.hits + cache.misses for cache in caches.values())
+
+    # NOTE: Constructing Falcon responses is relatively expensive, and the
+    #   response is not used for routing.
+    resp = falcon.Response()
+    for client in clients:
+        req = falcon.testing.create_req()
+        req.context.client = client
+        req.context.request_id = uuid.uuid4()
+        session = manager.get_session(req, resp)
+        for _ in range(PAGES_PER_REQUEST):
+            engine = session.get_bind()
+            page = (client, rng.randrange(PAGES_PER_CLIENT))
+            caches[engine].read(page)  # type: ignore[index]
+        manager.close_session(session, True, req, resp)
+
+    hits = sum(cache.hits for cache in caches.values()) - hits
+    total = sum(cache.hits + cache.misses for cache in caches.values()) - total
+    return hits / total
+
+
+def run(args: argparse.Namespace, strategy: str) -> dict[str, object]:
+    rng = random.Random(args.seed)
+    weights = [1 / (rank**args.zipf) for rank in range(1, args.clients + 1)]
+    clients = rng.choices(range(args.clients), weights, k=args.requests)
+    half = len(clients) // 2
+
+    manager = create_manager(strategy, args.replicas)
+    caches = {
+        engine: LRUCache(args.cache_pages) for engine in manager.read_engines
+    }
+
+    # NOTE: Warm up the caches before measuring.
+    simulate(manager, caches, clients[: half // 2], rng)
+    before = simulate(manager, caches, clients[half // 2 : half], rng)
+
+    replica = create_replica(args.replicas + 1)
+    caches[replica] = LRUCache(args.cache_pages)
+    manager.add_engine(replica, falcon_sqla.EngineRole.READ)
+    after = simulate(manager, caches, clients[half:], rng)
+
+    return {
+        'strategy': strategy,
+        'hit_ratio': round(before, 4),
+        'hit_ratio_after_adding_replica': round(after, 4),
+    }
+
+
+def remapped(args: argparse.Namespace) -> dict[str, float]:
+    engines = [create_replica(index) for index in range(args.replicas + 1)]
+    keys = range(args.clients)
+
+    def modulo(replicas: list[Engine], key: int) -> Engine:
+        return replicas[hash(str(key)) % len(replicas)]
+
+    before = HashRing(engines[:-1])
+    after = HashRing(engines)
+    return {
+        'modulo': sum(
+            modulo(engines[:-1], key) is not modulo(engines, key)
+            for key in keys
+        )
+        / args.clients,
+        'consistent': sum(
+            before.get(key) is not after.get(key) for key in keys
+        )
+        / args.clients,
+        'ideal': 1 / len(engines),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('--replicas', type=int, default=4)
+    parser.add_argument('--clients', type=int, default=2000)
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--zipf', type=float, default=1.1)
+    parser.add_argument('--cache-pages', type=int, default=4096)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    for strategy in ('random', 'request', 'consistent'):
+        result = run(args, strategy)
+        print('  '.join(f'{key}={value}' for key, value in result.items()))
+
+    fractions = remapped(args)
+    print(
+        'clients remapped upon adding a replica:  '
+        + '  '.join(f'{key}={value:.3f}' for key, value in fractions.items())
+    )
+
+
+if __name__ == '__main__':
+    main()
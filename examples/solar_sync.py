@@ -26,6 +26,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy.pool import ConnectionPoolEntry
 
 import falcon_sqla
+from falcon_sqla.pagination import KeysetPaginator
 
 HERE = pathlib.Path(__file__).resolve().parent
 DATA_PATH = HERE / 'solar_system.json'
@@ -107,15 +108,17 @@ _KINDS = {
 class BodyResource:
     def __init__(self, model: type[CelestialBody]) -> None:
         self._model = model
+        # NOTE: Sort keys must not be NULL, and the distance of the Sun is,
+        #   hence paginate by the (unique) name instead.
+        self._paginator = KeysetPaginator([model.name], page_size=10)
 
     def on_get_collection(
         self, req: falcon.Request, resp: falcon.Response
     ) -> None:
-        stmt = select(self._model).order_by(self._model.distance)
-        resp.media = [
-            body.to_dict()
-            for body in req.context.session.execute(stmt).scalars()
-        ]
+        page = self._paginator.paginate(
+            req.context.session, select(self._model), req, resp
+        )
+        resp.media = [body.to_dict() for body in page.items]
 
     def on_get(self, req: Request, resp: Response, name: str) -> None:
         body = req.context.session.get(self._model, name.lower())
@@ -13,13 +13,17 @@
 #  limitations under the License.
 
 from .constants import EngineRole
+from .constants import IdentityMapAction
+from .constants import ReadOnlyMode
 from .constants import SessionCleanup
 from .manager import Manager
 from .version import __version__
 
 __all__ = [
     'EngineRole',
+    'IdentityMapAction',
     'Manager',
+    'ReadOnlyMode',
     'SessionCleanup',
     '__version__',
 ]
@@ -0,0 +1,270 @@
+#  Copyright 2020-2025 Vytautas Liuolia
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""Thread pool bridge for using the session manager with ``falcon.asgi``."""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import functools
+from typing import Any, Callable, Optional, TYPE_CHECKING, TypeVar
+
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool
+
+from .util import AsyncClosingStreamWrapper
+
+if TYPE_CHECKING:
+    from falcon.asgi import Request
+    from falcon.asgi import Response
+
+    from .manager import Manager
+
+__all__ = ['DatabaseContext', 'Middleware', 'default_max_workers']
+
+_T = TypeVar('_T')
+
+
+def _pool_capacity(engine: Engine) -> Optional[int]:
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return None
+
+    # NOTE(vytas): A negative max_overflow means that the pool is unbounded.
+    max_overflow: int = pool._max_overflow
+    if max_overflow < 0:
+        return None
+    return pool.size() + max_overflow
+
+
+def default_max_workers(manager: Manager) -> Optional[int]:
+    """Return the default worker thread count for the given manager.
+
+    The thread pool is sized to the capacity (``pool_size + max_overflow``)
+    of the smallest bounded connection pool among the manager's engines. This
+    way, even if all worker threads happen to hit the same engine at once,
+    they never starve waiting for a connection to be checked out, while
+    surplus threads (that would only queue up on the connection pool) are not
+    created in the first place.
+
+    Returns:
+        int: The number of worker threads, or ``None`` if no engine has a
+        bounded connection pool (in which case the default sizing of
+        :class:`concurrent.futures.ThreadPoolExecutor` applies).
+    """
+    engines = set(manager.read_engines + manager.write_engines)
+    capacities = [
+        capacity
+        for capacity in map(_pool_capacity, engines)
+        if capacity is not None
+    ]
+    return min(capacities) if capacities else None
+
+
+class DatabaseContext:
+    """Runs synchronous session work for a single request in a thread pool.
+
+    An instance of this class is stored as ``req.context.db`` by the ASGI
+    :class:`Middleware`. The request session is created (via
+    :func:`Manager.get_session() <falcon_sqla.Manager.get_session>`) upon the
+    first work item, and then pinned to the request: work items of the same
+    request are executed one at a time, even if they are awaited
+    concurrently.
+
+    Args:
+        manager (Manager): The session manager.
+        req (Request): The current request.
+        resp (Response): The current response.
+        executor (Executor): The thread pool to run work items on.
+    """
+
+    def __init__(
+        self,
+        manager: Manager,
+        req: Request,
+        resp: Response,
+        executor: concurrent.futures.Executor,
+    ) -> None:
+        self._manager = manager
+        self._req = req
+        self._resp = resp
+        self._executor = executor
+        self._lock = asyncio.Lock()
+        self._session: Optional[Session] = None
+
+    @property
+    def session(self) -> Optional[Session]:
+        """The request session (or ``None`` if it has not been created yet).
+
+        Warning:
+            The session must only be used inside work items passed to
+            :meth:`run`, and not directly on the event loop.
+        """
+        return self._session
+
+    def _call(self, func: Callable[..., _T], args: Any, kwargs: Any) -> _T:
+        if self._session is None:
+            self._session = self._manager.get_session(self._req, self._resp)
+        return func(self._session, *args, **kwargs)
+
+    async def _submit(self, func: Callable[..., _T], *args: Any) -> _T:
+        loop = asyncio.get_running_loop()
+
+        async with self._lock:
+            future = loop.run_in_executor(self._executor, func, *args)
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # NOTE(vytas): The work item cannot be interrupted, so keep the
+                #   session pinned until it has actually finished running.
+                await asyncio.wait([future])
+                raise
+
+    async def run(
+        self, func: Callable[..., _T], *args: Any, **kwargs: Any
+    ) -> _T:
+        """Run ``func(session, *args, **kwargs)`` in a worker thread.
+
+        Args:
+            func (callable): A synchronous function that accepts the request
+                session as its first argument.
+
+        Returns:
+            The return value of ``func``.
+        """
+        return await self._submit(self._call, func, args, kwargs)
+
+    async def close(self, succeeded: bool) -> None:
+        """Finalize the request session (if any) in a worker thread.
+
+        The session is finalized using
+        :func:`Manager.close_session() <falcon_sqla.Manager.close_session>`.
+        """
+        session = self._session
+        if session is None:
+            return
+
+        self._session = None
+        await self._submit(
+            self._manager.close_session,
+            session,
+            succeeded,
+            self._req,
+            self._resp,
+        )
+
+
+class Middleware:
+    """ASGI middleware that can be used with the session manager.
+
+    This middleware bridges the synchronous session manager to ``falcon.asgi``
+    applications by executing session work in a bounded thread pool, thus
+    not blocking the event loop. Instead of a session, a
+    :class:`DatabaseContext` is stored as ``req.context.db``::
+
+        class LanguagesResource:
+            async def on_get(self, req, resp):
+                def get_languages(session):
+                    return session.scalars(select(Language.name)).all()
+
+                resp.media = await req.context.db.run(get_languages)
+
+    Args:
+        manager (Manager): Manager instance to use in this middleware.
+        max_workers (int, optional): The maximum number of worker threads.
+            Defaults to the value returned by :func:`default_max_workers`
+            (upon creating the thread pool when it is first needed).
+    """
+
+    def __init__(
+        self, manager: Manager, max_workers: Optional[int] = None
+    ) -> None:
+        self._manager = manager
+        self._options = manager.session_options
+
+        self._max_workers = max_workers
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        # NOTE(vytas): The thread pool is created upon first use (rather than
+        #   in process_startup) since ASGI lifespan events are optional.
+        if self._executor is None:
+            max_workers = self._max_workers
+            if max_workers is None:
+                max_workers = default_max_workers(self._manager)
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix='falcon-sqla-asgi'
+            )
+        return self._executor
+
+    async def process_request(self, req: Request, resp: Response) -> None:
+        """
+        Set up a :class:`DatabaseContext` for this request.
+
+        The context object is stored as ``req.context.db``; the session itself
+        is only created upon running the first work item.
+
+        When the :attr:`~.SessionOptions.sticky_binds` option is set to
+        ``True``, a ``req.context.request_id`` identifier is created (if not
+        already present) by calling the
+        :attr:`~.SessionOptions.request_id_func` function.
+        """
+        if req.method not in self._options.no_session_methods:
+            req.context.db = DatabaseContext(
+                self._manager, req, resp, self._get_executor()
+            )
+            if self._options.sticky_binds and not getattr(
+                req.context, 'request_id', None
+            ):
+                req.context.request_id = self._options.request_id_func()
+        else:
+            req.context.db = None
+
+    async def process_response(
+        self,
+        req: Request,
+        resp: Response,
+        resource: Optional[object],
+        req_succeeded: bool,
+    ) -> None:
+        """
+        Clean up the session, if one was created.
+
+        The session is finalized off the event loop by calling the manager's
+        :func:`~falcon_sqla.Manager.close_session` method in a worker thread.
+        """
+        db = getattr(req.context, 'db', None)
+
+        if db:
+            if resp.stream is not None and self._options.wrap_response_stream:
+                resp.stream = AsyncClosingStreamWrapper(
+                    resp.stream, functools.partial(db.close, req_succeeded)
+                )
+            else:
+                await db.close(req_succeeded)
+
+    async def process_shutdown(
+        self, scope: dict[str, Any], event: dict[str, Any]
+    ) -> None:
+        """Shut down the thread pool upon ASGI lifespan shutdown.
+
+        Should the application continue serving requests (as is the case,
+        e.g., with simulated requests in tests), a new thread pool is created.
+        """
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, executor.shutdown)
@@ -0,0 +1,278 @@
+#  Copyright 2020-2025 Vytautas Liuolia
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""Compiled statement cache instrumentation."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from collections.abc import Iterator
+import json
+import threading
+from typing import Any, Optional
+
+from sqlalchemy import Engine
+from sqlalchemy.engine import ExecutionContext
+from sqlalchemy.sql import ClauseElement
+from sqlalchemy.sql import compiler
+from sqlalchemy.sql import visitors
+from sqlalchemy.sql.elements import BindParameter
+
+from .util import EngineListeners
+
+__all__ = [
+    'CompiledCacheMonitor',
+    'CompiledCacheStats',
+    'StatementRegistry',
+    'read_recorded',
+]
+
+
+class CompiledCacheStats:
+    """Compiled statement cache statistics of a single engine.
+
+    Attributes:
+        hits (int): Number of statements whose compiled form was found in the
+            engine's compiled cache.
+        misses (int): Number of statements that had to be compiled, and were
+            then stored in the cache.
+        uncached (int): Number of statements that bypassed the cache
+            altogether (e.g., textual SQL, or caching disabled).
+    """
+
+    __slots__ = ['hits', 'misses', 'uncached']
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.uncached = 0
+
+    @property
+    def hit_ratio(self) -> Optional[float]:
+        """The ratio of hits to all cacheable statements (or ``None``)."""
+        total = self.hits + self.misses
+        return self.hits / total if total else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable snapshot of these statistics."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'uncached': self.uncached,
+            'hit_ratio': self.hit_ratio,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f'{type(self).__name__}(hits={self.hits}, misses={self.misses}, '
+            f'uncached={self.uncached})'
+        )
+
+
+class StatementRegistry:
+    """Named statements that can be warmed by name.
+
+    Statements are identified at runtime by their cache keys (ignoring the
+    values of bind parameters), so that misses of registered statements can
+    be recorded by name, and the recorded names can be warmed upon the next
+    startup.
+
+    An instance of this class is available as :attr:`Manager.statements
+    <falcon_sqla.Manager.statements>`.
+    """
+
+    def __init__(self) -> None:
+        self._statements: dict[str, ClauseElement] = {}
+        self._names: dict[Any, str] = {}
+
+    def register(self, name: str, statement: ClauseElement) -> ClauseElement:
+        """Register a statement under the given name, and return it.
+
+        Raises:
+            ValueError: The name is already taken, or the statement cannot be
+                cached.
+        """
+        if name in self._statements:
+            raise ValueError(f'statement {name!r} is already registered')
+        cache_key = statement._generate_cache_key()
+        if cache_key is None:
+            raise ValueError(f'statement {name!r} cannot be cached')
+
+        self._statements[name] = statement
+        self._names[cache_key.key] = name
+        return statement
+
+    def name_of(self, cache_key: Any) -> Optional[str]:
+        """Return the name of the statement with the given cache key."""
+        if cache_key is None:
+            return None
+        return self._names.get(cache_key.key)
+
+    def get(self, name: str) -> Optional[ClauseElement]:
+        """Return the statement registered under ``name`` (or ``None``)."""
+        return self._statements.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._statements
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._statements)
+
+    def __len__(self) -> int:
+        return len(self._statements)
+
+
+class CompiledCacheMonitor:
+    """Tracks compiled cache hits & misses of the manager's engines.
+
+    An instance of this class is created by
+    :meth:`Manager.monitor_compiled_cache()
+    <falcon_sqla.Manager.monitor_compiled_cache>`.
+
+    Args:
+        registry (StatementRegistry): The registry to look up the names of
+            statements that missed the cache.
+        record_path (str, optional): If specified, the name of each
+            registered statement that missed the compiled cache is appended
+            to this file (once) as a JSON line. The recorded statements can
+            be warmed upon the next startup using
+            :meth:`Manager.warm_recorded_statements()
+            <falcon_sqla.Manager.warm_recorded_statements>`.
+    """
+
+    def __init__(
+        self, registry: StatementRegistry, record_path: Optional[str] = None
+    ) -> None:
+        self._stats: dict[Engine, CompiledCacheStats] = {}
+        self._listeners = EngineListeners()
+        self._registry = registry
+        self._record_path = record_path
+        self._recorded: set[str] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self) -> dict[Engine, CompiledCacheStats]:
+        """Compiled cache statistics keyed by engine."""
+        return self._stats
+
+    def attach(self, engine: Engine) -> None:
+        """Start tracking the compiled cache of the given engine."""
+        if engine in self._stats:
+            return
+
+        stats = self._stats[engine] = CompiledCacheStats()
+        cache_hit = engine.dialect.CACHE_HIT
+        cache_miss = engine.dialect.CACHE_MISS
+
+        def after_cursor_execute(
+            conn: Any,
+            cursor: Any,
+            statement: str,
+            parameters: Any,
+            context: Optional[ExecutionContext],
+            executemany: bool,
+        ) -> None:
+            outcome = getattr(context, 'cache_hit', None)
+            if outcome is cache_hit:
+                stats.hits += 1
+            elif outcome is cache_miss:
+                stats.misses += 1
+                if self._record_path:
+                    self._record(context)
+            else:
+                stats.uncached += 1
+
+        self._listeners.listen(
+            engine, engine, 'after_cursor_execute', after_cursor_execute
+        )
+
+    def detach(self, engine: Engine) -> None:
+        """Stop tracking the given engine, and drop its statistics."""
+        self._listeners.remove(engine)
+        self._stats.pop(engine, None)
+
+    def _record(self, context: Any) -> None:
+        assert self._record_path is not None
+        cache_key = getattr(context.compiled, 'cache_key', None)
+        name = self._registry.name_of(cache_key)
+        if name is None:
+            return
+
+        with self._lock:
+            if name in self._recorded:
+                return
+            self._recorded.add(name)
+            with open(self._record_path, 'a', encoding='utf-8') as fp:
+                fp.write(json.dumps({'name': name}) + '\n')
+
+
+def read_recorded(path: str) -> list[str]:
+    """Read the names of statements recorded by :class:`CompiledCacheMonitor`.
+
+    Returns:
+        list: The unique names in the order of recording, or an empty list if
+        the file does not exist (yet).
+    """
+    try:
+        with open(path, encoding='utf-8') as fp:
+            lines = fp.read().splitlines()
+    except FileNotFoundError:
+        return []
+    names = (json.loads(line)['name'] for line in lines if line.strip())
+    return list(dict.fromkeys(names))
+
+
+def required_bind_keys(statement: ClauseElement) -> list[str]:
+    """Return the sorted keys of bind parameters that lack a value.
+
+    These are the parameters that need to be supplied at execution time, and
+    they are also a part of the statement's compiled cache key.
+    """
+    return sorted(
+        {
+            element.key
+            for element in visitors.iterate(statement)
+            if isinstance(element, BindParameter) and element.required
+        }
+    )
+
+
+def warm(engine: Engine, statements: Iterable[ClauseElement]) -> int:
+    """Compile the given statements into the engine's compiled cache.
+
+    Returns:
+        int: The number of statements that were actually compiled (i.e.,
+        that were not already cached).
+    """
+    # NOTE(vytas): There is no public API to populate the compiled cache
+    #   without executing a statement, so this mirrors what
+    #   Connection._execute_clauseelement() does.
+    compiled_cache = engine._compiled_cache
+    dialect = engine.dialect
+    if compiled_cache is None or not dialect._supports_statement_cache:
+        return 0
+
+    compiled = 0
+    for statement in statements:
+        _, _, _, outcome = statement._compile_w_cache(
+            dialect=dialect,
+            compiled_cache=compiled_cache,
+            column_keys=required_bind_keys(statement),
+            for_executemany=False,
+            schema_translate_map=None,
+            linting=dialect.compiler_linting | compiler.WARN_LINTING,
+        )
+        if outcome is dialect.CACHE_MISS:
+            compiled += 1
+    return compiled
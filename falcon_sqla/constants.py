@@ -92,3 +92,57 @@ class SessionCleanup(enum.Enum):
     This mode only closes the session. Any commit or rollback should be
     performed explicitly in the code.
     """
+
+
+class ReadOnlyMode(enum.Enum):
+    """Execution mode of request sessions for safe methods.
+
+    See also :attr:`~falcon_sqla.manager.SessionOptions.read_only_mode`.
+    """
+
+    AUTOCOMMIT = 'autocommit'
+    """Use the ``AUTOCOMMIT`` isolation level.
+
+    No transaction is started at all, i.e., each statement sees the latest
+    committed data, and no ``BEGIN``/``COMMIT`` round trips are incurred.
+    This mode is the cheapest one, but reads of the same request are not
+    guaranteed to be consistent with each other.
+
+    Warning:
+        Should a request write despite using a safe method, any statements
+        executed on an autocommit connection are committed immediately.
+    """
+
+    READ_ONLY_TRANSACTION = 'read_only'
+    """Use a read-only transaction.
+
+    On PostgreSQL, the transaction is started as ``READ ONLY`` via the
+    ``postgresql_readonly`` execution option; on MySQL & MariaDB, ``SET
+    TRANSACTION READ ONLY`` is issued; and on SQLite, ``PRAGMA query_only`` is
+    enabled for the duration of the transaction. Other dialects use a regular
+    transaction. Any writes fail.
+    """
+
+
+class IdentityMapAction(enum.Enum):
+    """Action taken when a request session exceeds its identity map limit.
+
+    See also
+    :meth:`Manager.enable_identity_map_guard()
+    <falcon_sqla.Manager.enable_identity_map_guard>`.
+    """
+
+    WARN = 'warn'
+    """Emit an :class:`~falcon_sqla.memory.IdentityMapWarning` (once per
+    session)."""
+
+    EXPUNGE = 'expunge'
+    """Expunge unmodified persistent objects from the session.
+
+    Objects are expunged before executing the next ORM statement, i.e., not
+    while a result is being loaded.
+    """
+
+    ABORT = 'abort'
+    """Raise :class:`~falcon_sqla.memory.IdentityMapLimitExceeded`, aborting
+    the request."""
@@ -0,0 +1,215 @@
+#  Copyright 2020-2025 Vytautas Liuolia
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""File-based discovery of replica engines."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from typing import Any, Callable, Optional, TYPE_CHECKING
+
+from sqlalchemy import create_engine
+from sqlalchemy import Engine
+
+from .constants import EngineRole
+
+if TYPE_CHECKING:
+    from .manager import Manager
+
+__all__ = ['ConfigFileWatcher']
+
+_logger = logging.getLogger(__name__)
+
+
+class ConfigFileWatcher:
+    """Reconciles the manager's engines with a local JSON config file.
+
+    The config file is expected to contain a list of engine definitions::
+
+        {
+            "engines": [
+                {"url": "postgresql://replica1/db", "role": "r"},
+                {
+                    "url": "postgresql://replica2/db",
+                    "options": {"pool_size": 10}
+                }
+            ]
+        }
+
+    Each definition must contain a database ``url``, and can optionally
+    specify the engine ``role`` (see also :class:`~falcon_sqla.EngineRole`;
+    defaults to ``"r"``), and ``options`` to pass to the engine factory as
+    keyword arguments.
+
+    Upon each reconciliation, engines for new definitions are created and
+    added to the manager, while engines whose definitions have been removed
+    are removed from the manager (see also
+    :meth:`Manager.remove_engine() <falcon_sqla.Manager.remove_engine>`).
+    Engines whose definition has changed are replaced
+    (:meth:`Manager.replace_engine()
+    <falcon_sqla.Manager.replace_engine>`). Only engines created by the
+    watcher itself are ever removed or replaced.
+
+    The file is polled for changes (of its modification time) in a background
+    thread once the watcher is started. If the file cannot be read or parsed,
+    or if an engine cannot be created, the error is logged, the current set
+    of engines is kept, and reconciliation is retried upon the next poll.
+
+    Args:
+        manager (Manager): The manager whose engines to reconcile.
+        path (str): The path of the config file.
+        interval (float): The polling interval (in seconds). Defaults to
+            ``5.0``.
+        engine_factory (callable): A callable that creates an engine given
+            a database URL and keyword arguments. Defaults to SQLAlchemy's
+            ``create_engine``.
+        drain_timeout (float): The maximum time (in seconds) to wait for
+            removed engines to be drained. Defaults to ``30.0``.
+    """
+
+    def __init__(
+        self,
+        manager: Manager,
+        path: str,
+        interval: float = 5.0,
+        engine_factory: Callable[..., Engine] = create_engine,
+        drain_timeout: float = 30.0,
+    ) -> None:
+        self._manager = manager
+        self._path = path
+        self._interval = interval
+        self._engine_factory = engine_factory
+        self._drain_timeout = drain_timeout
+
+        self._engines: dict[str, tuple[str, Engine]] = {}
+        self._mtime: Optional[float] = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def engines(self) -> dict[str, Engine]:
+        """Engines currently managed by this watcher keyed by URL."""
+        return {url: engine for url, (_, engine) in self._engines.items()}
+
+    def _load(self) -> Optional[dict[str, dict[str, Any]]]:
+        try:
+            with open(self._path) as config_file:
+                config = json.load(config_file)
+
+            definitions = {}
+            for item in config['engines']:
+                url = item['url']
+                options = item.get('options', {})
+                if not isinstance(url, str) or not isinstance(options, dict):
+                    raise TypeError('invalid engine definition')
+
+                role = EngineRole(item.get('role', EngineRole.READ))
+                definitions[url] = {'role': role, 'options': options}
+            return definitions
+        except (OSError, ValueError, KeyError, TypeError) as ex:
+            _logger.warning(
+                'failed to load engine definitions from %s: %r', self._path, ex
+            )
+            return None
+
+    def reconcile(self) -> bool:
+        """Reconcile the manager's engines with the config file now.
+
+        Returns:
+            bool: ``True`` if the config file was loaded successfully,
+            ``False`` otherwise (in which case the engines are left intact).
+        """
+        with self._lock:
+            definitions = self._load()
+            if definitions is None:
+                return False
+
+            self._apply(definitions)
+            return True
+
+    def _apply(self, definitions: dict[str, dict[str, Any]]) -> None:
+        for url in set(self._engines) - set(definitions):
+            _, engine = self._engines.pop(url)
+            self._manager.remove_engine(engine, self._drain_timeout)
+
+        for url, definition in definitions.items():
+            role = definition['role']
+            fingerprint = json.dumps(
+                [role.value, definition['options']], sort_keys=True
+            )
+            current = self._engines.get(url)
+            if current is not None and current[0] == fingerprint:
+                continue
+
+            engine = self._engine_factory(url, **definition['options'])
+            self._engines[url] = (fingerprint, engine)
+            if current is None:
+                self._manager.add_engine(engine, role)
+            else:
+                self._manager.replace_engine(
+                    current[1], engine, role, self._drain_timeout
+                )
+
+    def poll(self) -> bool:
+        """Reconcile the engines if the config file has been modified.
+
+        Returns:
+            bool: ``True`` if a reconciliation was performed successfully.
+        """
+        try:
+            mtime = os.stat(self._path).st_mtime
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+
+        # NOTE(vytas): Only remember the modification time once the file has
+        #   been reconciled, so that failures (e.g., reading a half-written
+        #   file) are retried upon the next poll.
+        if not self.reconcile():
+            return False
+        self._mtime = mtime
+        return True
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self._interval):
+            try:
+                self.poll()
+            except Exception:
+                # NOTE(vytas): Keep watching even if an engine could not be
+                #   created; reconciliation is retried upon the next poll.
+                _logger.exception(
+                    'failed to reconcile engines with %s', self._path
+                )
+
+    def start(self) -> ConfigFileWatcher:
+        """Reconcile the engines, and start polling in a background thread."""
+        self.poll()
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name='falcon-sqla-discovery', daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop polling the config file."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
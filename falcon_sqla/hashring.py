@@ -0,0 +1,116 @@
+#  Copyright 2020-2025 Vytautas Liuolia
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Consistent hashing of request keys onto engines."""
+
+from __future__ import annotations
+
+import bisect
+from collections.abc import Hashable
+from collections.abc import Sequence
+import hashlib
+from typing import Callable, Optional, TYPE_CHECKING
+
+from sqlalchemy import Engine
+
+if TYPE_CHECKING:
+    from falcon import Request
+
+__all__ = ['HashRing', 'context_key', 'cookie_key', 'header_key']
+
+KeyFunc = Callable[['Request'], Optional[Hashable]]
+
+
+def _hash(value: str) -> int:
+    digest = hashlib.blake2b(value.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+class HashRing:
+    """A consistent-hash ring of engines with virtual nodes.
+
+    Each engine is placed on the ring at ``vnodes`` pseudo-random points
+    derived from its URL (without the password), so that the mapping of keys
+    to engines is the same across processes. A key is served by the engine
+    owning the first point following the key's hash. Consequently, when an
+    engine is added to (or removed from) a ring of ``N`` engines, only about
+    ``1/N`` of the keys move to another engine.
+
+    Args:
+        engines (Sequence[Engine]): The engines to place on the ring.
+        vnodes (int): The number of virtual nodes per engine. Defaults to
+            ``100``.
+    """
+
+    __slots__ = ['engines', '_points', '_owners']
+
+    def __init__(self, engines: Sequence[Engine], vnodes: int = 100) -> None:
+        self.engines = tuple(engines)
+
+        occurrences: dict[str, int] = {}
+        nodes: list[tuple[int, int, Engine]] = []
+        for engine in self.engines:
+            name = engine.url.render_as_string()
+            # NOTE(vytas): Distinguish engines connecting to the same URL
+            #   (e.g., with different options) by their order of appearance.
+            occurrence = occurrences.get(name, 0)
+            occurrences[name] = occurrence + 1
+
+            for vnode in range(vnodes):
+                point = _hash(f'{name}#{occurrence}-{vnode}')
+                nodes.append((point, len(nodes), engine))
+
+        nodes.sort(key=lambda node: node[:2])
+        self._points = [point for point, _, _ in nodes]
+        self._owners = [engine for _, _, engine in nodes]
+
+    def get(self, key: Hashable) -> Engine:
+        """Return the engine responsible for the given key.
+
+        The key is hashed using its ``str()`` representation.
+        """
+        index = bisect.bisect(self._points, _hash(str(key)))
+        return self._owners[index % len(self._owners)]
+
+
+def context_key(name: str) -> KeyFunc:
+    """Key requests by the ``req.context`` attribute of the given name.
+
+    For instance, ``context_key('user')`` can be used if an authentication
+    middleware stores the user's identifier as ``req.context.user``.
+    """
+
+    def key(req: Request) -> Optional[Hashable]:
+        value: Optional[Hashable] = getattr(req.context, name, None)
+        return value
+
+    return key
+
+
+def header_key(name: str) -> KeyFunc:
+    """Key requests by the value of the given header (e.g., a tenant ID)."""
+
+    def key(req: Request) -> Optional[Hashable]:
+        return req.get_header(name)
+
+    return key
+
+
+def cookie_key(name: str) -> KeyFunc:
+    """Key requests by the value of the given cookie (e.g., a session ID)."""
+
+    def key(req: Request) -> Optional[Hashable]:
+        values = req.get_cookie_values(name)
+        return values[0] if values else None
+
+    return key
@@ -0,0 +1,214 @@
+#  Copyright 2020-2025 Vytautas Liuolia
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""Hedged reads across replicas."""
+
+from __future__ import annotations
+
+import collections
+from collections.abc import Sequence
+import concurrent.futures
+import threading
+import time
+from typing import Any, Optional
+
+from sqlalchemy import Engine
+from sqlalchemy import Row
+from sqlalchemy.orm import Session
+
+__all__ = ['Hedger', 'HedgingStats']
+
+
+class HedgingStats:
+    """Accounting of hedged reads.
+
+    Attributes:
+        requests (int): Total number of hedged read requests.
+        hedged (int): Number of requests where a second (hedge) query was
+            sent, i.e., the extra load incurred by hedging.
+        hedge_wins (int): Number of hedged requests where the second query
+            completed first.
+        errors (int): Number of failed queries (of either kind).
+
+    The counters are updated under the lock of the owning
+    :class:`Hedger`.
+    """
+
+    __slots__ = ['requests', 'hedged', 'hedge_wins', 'errors']
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.errors = 0
+
+    @property
+    def hedge_ratio(self) -> Optional[float]:
+        """The fraction of requests that were hedged (or ``None``)."""
+        return self.hedged / self.requests if self.requests else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable snapshot of these statistics."""
+        return {
+            'requests': self.requests,
+            'hedged': self.hedged,
+            'hedge_wins': self.hedge_wins,
+            'errors': self.errors,
+            'hedge_ratio': self.hedge_ratio,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f'{type(self).__name__}(requests={self.requests}, '
+            f'hedged={self.hedged}, hedge_wins={self.hedge_wins})'
+        )
+
+
+class Hedger:
+    """Sends a read to a second engine if the first one is too slow.
+
+    The delay before hedging adapts to the observed latency distribution:
+    a hedge is only sent after the first query has been running for longer
+    than the given ``percentile`` of recent latencies. Hence, with the
+    default of ``0.95``, roughly 5% of reads are hedged.
+
+    An instance of this class is used by
+    :meth:`Manager.hedged_execute() <falcon_sqla.Manager.hedged_execute>`.
+
+    Args:
+        percentile (float): The latency percentile to use as the hedging
+            delay. Defaults to ``0.95``.
+        window (int): The number of most recent latencies to consider.
+            Defaults to ``1000``.
+        min_samples (int): The minimum number of observed latencies before
+            the delay becomes adaptive. Defaults to ``20``.
+        default_delay (float): The delay (in seconds) to use until enough
+            latencies have been observed. Defaults to ``0.1``.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        window: int = 1000,
+        min_samples: int = 20,
+        default_delay: float = 0.1,
+    ) -> None:
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.default_delay = default_delay
+        self.stats = HedgingStats()
+
+        self._latencies: collections.deque[float] = collections.deque(
+            maxlen=window
+        )
+        self._delay = default_delay
+        self._observed = 0
+        self._lock = threading.Lock()
+
+    def observe(self, latency: float) -> None:
+        """Record the latency of a completed read."""
+        with self._lock:
+            self._latencies.append(latency)
+            self._observed += 1
+            # NOTE(vytas): Sorting the window is relatively expensive, so the
+            #   percentile is only recomputed every min_samples observations
+            #   (and outside of the lock).
+            if self._observed % self.min_samples:
+                return
+            window = tuple(self._latencies)
+
+        ordered = sorted(window)
+        count = len(ordered)
+        index = min(int(count * self.percentile), count - 1)
+        self._delay = ordered[index]
+
+    @property
+    def delay(self) -> float:
+        """The current hedging delay (in seconds)."""
+        return self._delay
+
+    def execute(
+        self,
+        executor: concurrent.futures.Executor,
+        engines: Sequence[Engine],
+        statement: Any,
+        params: Any = None,
+        delay: Optional[float] = None,
+    ) -> Sequence[Row[Any]]:
+        """Execute a read, hedging it on the second engine if needed.
+
+        Args:
+            executor: The executor to run the queries on.
+            engines: One or two engines; the second one is only used for the
+                hedge query.
+            statement: The statement to execute.
+            params: Optional statement parameters.
+            delay (float): Override the adaptive hedging delay (in seconds).
+
+        Returns:
+            The rows of whichever query completed successfully first.
+        """
+        with self._lock:
+            self.stats.requests += 1
+        start = time.perf_counter()
+
+        if len(engines) == 1:
+            rows = self._run(engines[0], statement, params)
+            self.observe(time.perf_counter() - start)
+            return rows
+
+        first = executor.submit(self._run, engines[0], statement, params)
+        done, _ = concurrent.futures.wait(
+            [first], timeout=self.delay if delay is None else delay
+        )
+        if done and first.exception() is None:
+            self.observe(time.perf_counter() - start)
+            return first.result()
+
+        with self._lock:
+            self.stats.hedged += 1
+        second = executor.submit(self._run, engines[1], statement, params)
+        pending = {first, second}
+        error: Optional[BaseException] = None
+
+        while pending:
+            done, pending = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    # NOTE(vytas): A running query cannot be interrupted
+                    #   portably, its result is simply discarded.
+                    for other in pending:
+                        other.cancel()
+                    if future is second:
+                        with self._lock:
+                            self.stats.hedge_wins += 1
+                    self.observe(time.perf_counter() - start)
+                    return future.result()
+
+        assert error is not None
+        raise error
+
+    def _run(
+        self, engine: Engine, statement: Any, params: Any
+    ) -> Sequence[Row[Any]]:
+        try:
+            with Session(engine) as session:
+                return session.execute(statement, params).all()
+        except Exception:
+            with self._lock:
+                self.stats.errors += 1
+            raise
@@ -0,0 +1,138 @@
+#  Copyright 2020-2025 Vytautas Liuolia
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""Latency tracking and latency-aware engine selection."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+import random
+import time
+from typing import Any, Optional
+
+from sqlalchemy import Engine
+from sqlalchemy.engine import ExecutionContext
+
+from .util import EngineListeners
+
+__all__ = ['LatencyTracker']
+
+_START_KEY = 'falcon_sqla.cursor_start'
+
+
+class LatencyTracker:
+    """Tracks an EWMA of statement execution time per engine.
+
+    The latency of each engine is estimated as an exponentially weighted
+    moving average (EWMA) of the time spent executing cursor statements, as
+    measured by SQLAlchemy's ``before_cursor_execute`` and
+    ``after_cursor_execute`` events.
+
+    An instance of this class is created by :class:`~falcon_sqla.Manager`
+    when :attr:`~falcon_sqla.manager.SessionOptions.latency_aware_binds` is
+    enabled.
+
+    Args:
+        alpha (float): The smoothing factor of the EWMA, i.e., the weight of
+            the most recent observation. Defaults to ``0.1``.
+    """
+
+    def __init__(self, alpha: float = 0.1) -> None:
+        self.alpha = alpha
+        self._latencies: dict[Engine, float] = {}
+        self._listeners = EngineListeners()
+
+    @property
+    def latencies(self) -> dict[Engine, float]:
+        """Current latency estimates (in seconds) keyed by engine.
+
+        Engines that have not executed any statements yet are absent.
+        """
+        return dict(self._latencies)
+
+    def observe(self, engine: Engine, latency: float) -> None:
+        """Update the latency estimate of ``engine`` with an observation."""
+        previous = self._latencies.get(engine)
+        if previous is None:
+            self._latencies[engine] = latency
+        else:
+            self._latencies[engine] = previous + self.alpha * (
+                latency - previous
+            )
+
+    def attach(self, engine: Engine) -> None:
+        """Start tracking the latency of the given engine."""
+        if engine in self._listeners:
+            return
+
+        def before_cursor_execute(
+            conn: Any,
+            cursor: Any,
+            statement: str,
+            parameters: Any,
+            context: Optional[ExecutionContext],
+            executemany: bool,
+        ) -> None:
+            conn.info[_START_KEY] = time.perf_counter()
+
+        def after_cursor_execute(
+            conn: Any,
+            cursor: Any,
+            statement: str,
+            parameters: Any,
+            context: Optional[ExecutionContext],
+            executemany: bool,
+        ) -> None:
+            start = conn.info.pop(_START_KEY, None)
+            if start is not None:
+                self.observe(engine, time.perf_counter() - start)
+
+        self._listeners.listen(
+            engine, engine, 'before_cursor_execute', before_cursor_execute
+        )
+        self._listeners.listen(
+            engine, engine, 'after_cursor_execute', after_cursor_execute
+        )
+
+    def detach(self, engine: Engine) -> None:
+        """Stop tracking the latency of the given engine."""
+        self._listeners.remove(engine)
+        self._latencies.pop(engine, None)
+
+    def choose(
+        self, engines: Sequence[Engine], exploration: float = 0.0
+    ) -> Engine:
+        """Choose an engine, preferring the ones with lower latency.
+
+        Two engines are sampled at random, and the one with the lower latency
+        estimate is chosen ("power of two choices"); this favors faster
+        engines without herding all traffic onto the single fastest one.
+        Engines without an estimate yet are preferred in order to measure
+        them.
+
+        Args:
+            engines: Candidate engines.
+            exploration (float): The probability of choosing an engine
+                uniformly at random instead, so that recovering engines
+                eventually get traffic (and fresh estimates) again.
+                Defaults to ``0.0``.
+        """
+        if len(engines) == 1 or random.random() < exploration:
+            return random.choice(engines)
+
+        first, second = random.sample(engines, 2)
+        latencies = self._latencies
+        if latencies.get(first, 0.0) <= latencies.get(second, 0.0):
+            return first
+        return second
@@ -0,0 +1,207 @@
+#  Copyright 2020-2025 Vytautas Liuolia
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Request-scoped batching of primary key lookups."""
+
+from __future__ import annotations
+
+from collections.abc import Hashable
+from collections.abc import Iterable
+from typing import Any, Optional
+
+from sqlalchemy import inspect
+from sqlalchemy import select
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Mapper
+from sqlalchemy.orm import Session
+from sqlalchemy.types import TypeEngine
+
+__all__ = ['DataLoader', 'PendingLoad']
+
+
+class PendingLoad:
+    """A primary key lookup queued with :meth:`DataLoader.load`."""
+
+    __slots__ = ['_loader', '_mapper', '_key']
+
+    def __init__(
+        self, loader: DataLoader, mapper: Mapper[Any], key: tuple[Any, ...]
+    ) -> None:
+        self._loader = loader
+        self._mapper = mapper
+        self._key = key
+
+    def result(self) -> Optional[Any]:
+        """Return the loaded object, or ``None`` if it does not exist.
+
+        All lookups queued for the same entity are loaded in a batch upon the
+        first call to this method (unless they have already been loaded).
+        """
+        return self._loader._result(self._mapper, self._key)
+
+    def __repr__(self) -> str:
+        entity = self._mapper.class_.__name__
+        return f'{type(self).__name__}({entity}, {self._key!r})'
+
+
+class DataLoader:
+    """Collects primary key lookups, and loads them in batches.
+
+    Instead of issuing a query per ``session.get(Model, pk)`` call, lookups
+    are queued using :meth:`load` (or requested in bulk using
+    :meth:`load_many`), and each entity is loaded using as few
+    ``SELECT ... WHERE pk IN (...)`` statements as the dialect's limit on the
+    number of bound parameters allows. Objects that are already present in
+    the session's identity map are not queried again, and the loaded ones are
+    added to the identity map as usual.
+
+    The loader keeps references to the loaded objects (and remembers missing
+    keys), so it is only meant to be used for the duration of a single
+    request (see also :attr:`~.SessionOptions.data_loader`).
+
+    Args:
+        session (Session): The session to load objects with.
+        chunk_size (int): The maximum number of keys per statement. Defaults
+            to ``None`` (derived from the maximum number of bound parameters
+            supported by the dialect).
+
+    Attributes:
+        queries (int): The number of statements issued by this loader.
+    """
+
+    __slots__ = ['session', 'chunk_size', 'queries', '_pending', '_results']
+
+    def __init__(
+        self, session: Session, chunk_size: Optional[int] = None
+    ) -> None:
+        self.session = session
+        self.chunk_size = chunk_size
+        self.queries = 0
+        self._pending: dict[Mapper[Any], dict[tuple[Any, ...], None]] = {}
+        self._results: dict[
+            Mapper[Any], dict[tuple[Any, ...], Optional[Any]]
+        ] = {}
+
+    def load(self, entity: Any, key: Any) -> PendingLoad:
+        """Queue a lookup of ``entity`` by its primary key.
+
+        Args:
+            entity: A mapped class (or mapper).
+            key: The primary key value, or a tuple of values in the case of a
+                composite primary key. Values are converted to the Python
+                types of the primary key columns if needed, e.g., a string
+                parsed from the URL is converted to an integer.
+
+        Returns:
+            PendingLoad: A handle whose :meth:`~PendingLoad.result` returns
+            the loaded object.
+        """
+        mapper = inspect(entity)
+        ident = _normalize(mapper, key)
+        if ident not in self._results.get(mapper, ()):
+            self._pending.setdefault(mapper, {})[ident] = None
+        return PendingLoad(self, mapper, ident)
+
+    def load_many(
+        self, entity: Any, keys: Iterable[Any]
+    ) -> list[Optional[Any]]:
+        """Load objects of ``entity`` by their primary keys.
+
+        Returns:
+            list: The loaded objects (or ``None`` for the missing ones) in the
+            order of the given keys.
+        """
+        handles = [self.load(entity, key) for key in keys]
+        return [handle.result() for handle in handles]
+
+    def dispatch(self) -> None:
+        """Load all queued lookups now."""
+        for mapper in list(self._pending):
+            self._dispatch(mapper)
+
+    def _result(self, mapper: Mapper[Any], ident: tuple[Any, ...]) -> Any:
+        results = self._results.get(mapper, {})
+        if ident not in results:
+            self._dispatch(mapper)
+            results = self._results[mapper]
+        return results[ident]
+
+    def _dispatch(self, mapper: Mapper[Any]) -> None:
+        pending = self._pending.pop(mapper, {})
+        results = self._results.setdefault(mapper, {})
+        identity_map = self.session.identity_map
+
+        keys = []
+        for ident in pending:
+            identity_key = mapper.identity_key_from_primary_key(ident)
+            instance = identity_map.get(identity_key)
+            if instance is not None:
+                results[ident] = instance
+            else:
+                results[ident] = None
+                keys.append(ident)
+
+        if not keys:
+            return
+
+        columns = mapper.primary_key
+        chunk_size = self._get_chunk_size(mapper)
+        for start in range(0, len(keys), chunk_size):
+            chunk = keys[start : start + chunk_size]
+            if len(columns) == 1:
+                criterion = columns[0].in_([ident[0] for ident in chunk])
+            else:
+                criterion = tuple_(*columns).in_(chunk)
+
+            stmt = select(mapper).where(criterion)
+            self.queries += 1
+            for instance in self.session.scalars(stmt):
+                ident = tuple(mapper.primary_key_from_instance(instance))
+                results[ident] = instance
+
+    def _get_chunk_size(self, mapper: Mapper[Any]) -> int:
+        if self.chunk_size is not None:
+            return self.chunk_size
+
+        dialect = self.session.get_bind(mapper=mapper).dialect
+        # NOTE(vytas): Reuse the limit that SQLAlchemy itself observes when
+        #   batching INSERT statements.
+        max_parameters = dialect.insertmanyvalues_max_parameters
+        return max(max_parameters // len(mapper.primary_key), 1)
+
+
+def _normalize(mapper: Mapper[Any], key: Any) -> tuple[Hashable, ...]:
+    ident = key if isinstance(key, tuple) else (key,)
+    if len(ident) != len(mapper.primary_key):
+        return ident
+
+    # NOTE(vytas): Loaded objects are keyed by their primary key as returned
+    #   by the database, so the requested values need to be of the same type.
+    return tuple(
+        _convert(column.type, value)
+        for column, value in zip(mapper.primary_key, ident)
+    )
+
+
+def _convert(column_type: TypeEngine[Any], value: Any) -> Any:
+    try:
+        python_type = column_type.python_type
+    except NotImplementedError:
+        return value
+
+    if value is None or isinstance(value, python_type):
+        return value
+    try:
+        return python_type(value)
+    except (TypeError, ValueError):
+        return value
@@ -15,22 +15,56 @@
 from __future__ import annotations
 
 from collections.abc import Hashable
+from collections.abc import Iterable
 from collections.abc import Iterator
+from collections.abc import Sequence
+import concurrent.futures
 import contextlib
+import os
 import random
-from typing import Any, Callable, Optional, Union
+import threading
+import time
+from typing import Any, Callable, Optional, TypeVar, Union
 import uuid
+import weakref
 
 from falcon import Request
 from falcon import Response
+from sqlalchemy import Connection
 from sqlalchemy import Engine
+from sqlalchemy import event
+from sqlalchemy import inspect
+from sqlalchemy import Result
+from sqlalchemy import Row
+from sqlalchemy.orm import ORMExecuteState
 from sqlalchemy.orm import Session
+from sqlalchemy.orm import SessionTransaction
 from sqlalchemy.orm.session import sessionmaker
+from sqlalchemy.sql import ClauseElement
 from sqlalchemy.sql import Delete
 from sqlalchemy.sql import Update
+from sqlalchemy.sql.util import find_tables
 
+from . import asgi
+from . import cache
+from . import hashring
+from . import hedging
+from . import latency
+from . import memory
+from . import ping
+from . import profiling
+from . import readonly
+from . import retry
+from . import shadow
+from . import sharedstats
+from . import sqlite
+from . import tracing
+from . import workload
 from .constants import EngineRole
+from .constants import IdentityMapAction
+from .constants import ReadOnlyMode
 from .constants import SessionCleanup
+from .middleware import ConnectionMiddleware
 from .middleware import Middleware
 from .session import RequestSession
 
@@ -41,6 +75,8 @@ COMMIT = SessionCleanup.COMMIT
 COMMIT_ON_SUCCESS = SessionCleanup.COMMIT_ON_SUCCESS
 ROLLBACK = SessionCleanup.ROLLBACK
 
+_T = TypeVar('_T')
+
 
 class Manager:
     """A manager for SQLAlchemy sessions.
@@ -59,6 +95,15 @@ class Manager:
             binds on a per-entity basis in the session. See also
             https://docs.sqlalchemy.org/en/20/orm/session_api.html#sqlalchemy.orm.Session.params.binds.
             Defaults to ``None``.
+
+            If the values of the dictionary are engines, the session uses
+            them directly, and the role-based routing is disabled. If (some
+            of) the values are group names (strings) instead, the respective
+            entities (mapped classes, their bases, or tables) are routed
+            among the engines added to that group (see also
+            :meth:`add_engine`) using the usual role and balancing logic,
+            whereas other entities are routed among the engines that do not
+            belong to any group. Engine values are then still used directly.
     """
 
     def __init__(
@@ -73,16 +118,113 @@ class Manager:
         }
         self._read_engines: tuple[Engine, ...] = (engine,)
         self._write_engines: tuple[Engine, ...] = (engine,)
+        self._engine_groups: dict[Engine, str] = {}
+        self._group_routing: dict[
+            str, tuple[tuple[Engine, ...], tuple[Engine, ...]]
+        ] = {}
+        self._hash_rings: dict[
+            tuple[int, tuple[Engine, ...]], hashring.HashRing
+        ] = {}
         self._session_kwargs: dict[str, Any] = {}
+        self._engines_lock = threading.RLock()
+        self._engine_hooks: list[Callable[[Engine], None]] = []
+        self._engine_unhooks: list[Callable[[Engine], None]] = []
+        self._cache_monitor: Optional[cache.CompiledCacheMonitor] = None
+        self._statements = cache.StatementRegistry()
+        self._recycled = threading.local()
+        self._recycled_generation = 0
+        self._listen_lock = threading.Lock()
+        self._listening = False
+        self._retry_stats = retry.RetryStats()
+        self._retry_lock = threading.Lock()
+        self._flushed: weakref.WeakSet[SessionTransaction] = weakref.WeakSet()
+        self._hedger = hedging.Hedger()
+        self._latency_tracker: Optional[latency.LatencyTracker] = None
+        self._pre_ping: Optional[ping.AdaptivePrePing] = None
+        self._tracer: Optional[tracing.Tracer] = None
+        self._profiler: Optional[profiling.RequestProfiler] = None
+        self._shared_stats: Optional[sharedstats.SharedStats] = None
+        self._shadow: Optional[shadow.ShadowMirror] = None
+        self._recorder: Optional[workload.WorkloadRecorder] = None
+        self._guard: Optional[memory.IdentityMapGuard] = None
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
 
         self._binds = binds
+        self._bind_groups: dict[Any, Union[Engine, str]] = {}
+        if binds and any(isinstance(value, str) for value in binds.values()):
+            if not issubclass(session_cls, RequestSession):
+                raise ValueError(
+                    'engine groups require a subclass of RequestSession'
+                )
+            # NOTE(vytas): The manager resolves all binds by itself then.
+            #   Like in SQLAlchemy, mapped classes bind their tables, too.
+            self._bind_groups = dict(binds)
+            for key, value in binds.items():
+                insp = inspect(key, raiseerr=False)
+                if getattr(insp, 'is_mapper', False):
+                    for table in insp.tables:
+                        self._bind_groups.setdefault(table, value)
+            binds = None
         self._session_cls = session_cls
+        if issubclass(session_cls, RequestSession):
+            self._session_kwargs = {
+                '_manager_connection_options': self._connection_options
+            }
+        self._listening_read_only = False
         self._Session = sessionmaker(
             bind=engine, class_=session_cls, binds=binds
         )
 
         self.session_options = SessionOptions()
 
+    @classmethod
+    def for_sqlite(
+        cls,
+        path: Union[str, os.PathLike[str]],
+        readers: int = 4,
+        pragmas: Optional[dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> Manager:
+        """Create a manager tuned for a SQLite database file.
+
+        A writer engine (see :func:`~falcon_sqla.sqlite.create_writer_engine`)
+        is registered as the main read-write engine, and the requested number
+        of read-only engines (see
+        :func:`~falcon_sqla.sqlite.create_reader_engine`) are added with the
+        :attr:`~.EngineRole.READ` role. Unless no readers are requested,
+        reads are only routed to the reader engines.
+
+        The database file is created (if needed) and switched to WAL mode
+        immediately.
+
+        Args:
+            path (str): Path to the database file.
+            readers (int): The number of reader engines. Defaults to ``4``.
+
+                Note:
+                    The writer engine only has a single connection. Without
+                    any readers, all requests are thus serialized.
+
+            pragmas (dict, optional): Pragmas to apply on top of (or, if set
+                to ``None``, instead of) :data:`~falcon_sqla.sqlite.PRAGMAS`.
+            **kwargs: Additional arguments for the :class:`Manager`
+                constructor.
+        """
+        writer = sqlite.create_writer_engine(path, pragmas)
+        # NOTE(vytas): Connect right away in order to set up WAL, which
+        #   read-only connections are unable to do by themselves.
+        writer.connect().close()
+
+        manager = cls(writer, **kwargs)
+        if readers > 0:
+            manager.session_options.read_from_rw_engines = False
+        for _ in range(readers):
+            manager.add_engine(
+                sqlite.create_reader_engine(path, pragmas), EngineRole.READ
+            )
+        return manager
+
     def _filter_by_role(
         self, engines: tuple[Engine, ...], role: EngineRole
     ) -> tuple[Engine, ...]:
@@ -95,8 +237,25 @@ class Manager:
         )
         return filtered or engines
 
+    def _add_engine_hook(
+        self,
+        hook: Callable[[Engine], None],
+        unhook: Callable[[Engine], None],
+    ) -> None:
+        """Invoke ``hook`` for every current and future engine.
+
+        ``unhook`` is invoked for every engine that is removed or replaced.
+        """
+        self._engine_hooks.append(hook)
+        self._engine_unhooks.append(unhook)
+        for engine in self._engines:
+            hook(engine)
+
     def add_engine(
-        self, engine: Engine, role: Union[EngineRole, str] = EngineRole.READ
+        self,
+        engine: Engine,
+        role: Union[EngineRole, str] = EngineRole.READ,
+        group: Optional[str] = None,
     ) -> None:
         """Adds a new engine with the specified role.
 
@@ -111,29 +270,221 @@ class Manager:
                     will continue to be supported in the foreseeable future for
                     backwards compatibility, but new code should prefer passing
                     enum constants instead.
+
+            group (str, optional): The name of the engine group that this
+                engine belongs to (see the ``binds`` argument of
+                :class:`Manager`). Defaults to ``None`` (the engine is used
+                for entities not bound to any group).
         """
         role = EngineRole(role)
 
-        self._engines[engine] = role
-        if role in {EngineRole.READ, EngineRole.READ_WRITE}:
-            self._read_engines += (engine,)
-        if role in {EngineRole.WRITE, EngineRole.READ_WRITE}:
-            self._write_engines += (engine,)
+        with self._engines_lock:
+            # NOTE(vytas): Engines are read without the lock (e.g., while
+            #   serving requests), hence the mapping is copied on write
+            #   instead of being mutated in place.
+            self._engines = {**self._engines, engine: role}
+            if group is not None:
+                self._engine_groups = {**self._engine_groups, engine: group}
+            for hook in self._engine_hooks:
+                hook(engine)
+
+            self._update_routing()
+
+    def _route(
+        self, engines: Sequence[Engine]
+    ) -> tuple[tuple[Engine, ...], tuple[Engine, ...]]:
+        """Split ``engines`` into read & write engines by their roles."""
+        read_engines = tuple(
+            engine
+            for engine in engines
+            if self._engines[engine]
+            in {EngineRole.READ, EngineRole.READ_WRITE}
+        )
+        write_engines = tuple(
+            engine
+            for engine in engines
+            if self._engines[engine]
+            in {EngineRole.WRITE, EngineRole.READ_WRITE}
+        )
 
         if not self.session_options.read_from_rw_engines:
-            self._read_engines = self._filter_by_role(
-                self._read_engines, EngineRole.READ
-            )
+            read_engines = self._filter_by_role(read_engines, EngineRole.READ)
         if not self.session_options.write_to_rw_engines:
-            self._write_engines = self._filter_by_role(
-                self._write_engines, EngineRole.WRITE
+            write_engines = self._filter_by_role(
+                write_engines, EngineRole.WRITE
             )
 
-        # NOTE(vytas): Do not tamper with custom binds.
+        return read_engines, write_engines
+
+    def _update_routing(self) -> None:
+        """Rebuild the read & write engine tuples from registered engines."""
+        groups: dict[str, list[Engine]] = {}
+        ungrouped = []
+        for engine in self._engines:
+            group = self._engine_groups.get(engine)
+            if group is None:
+                ungrouped.append(engine)
+            else:
+                groups.setdefault(group, []).append(engine)
+
+        self._read_engines, self._write_engines = self._route(ungrouped)
+        self._group_routing = {
+            group: self._route(engines) for group, engines in groups.items()
+        }
+        self._hash_rings = {}
+
+        # NOTE(vytas): Sessions without a request are bound to the first write
+        #   engine of each group.
+        if self._bind_groups:
+            binds = {}
+            for key, bind in self._bind_groups.items():
+                if isinstance(bind, str):
+                    read_engines, write_engines = self._group_routing.get(
+                        bind, ((), ())
+                    )
+                    engines = write_engines or read_engines
+                    if not engines:
+                        continue
+                    bind = engines[0]
+                binds[key] = bind
+            self._Session.configure(binds=binds)
+
+        # NOTE(vytas): Do not tamper with custom binds (unless they refer to
+        #   engine groups).
         # NOTE(vytas): We can only rely on RequestSession and its subclasses to
         #   implement the private _manager_get_bind constructor kwarg.
-        if not self._binds and issubclass(self._session_cls, RequestSession):
-            self._session_kwargs = {'_manager_get_bind': self.get_bind}
+        if (not self._binds or self._bind_groups) and issubclass(
+            self._session_cls, RequestSession
+        ):
+            self._session_kwargs = {
+                **self._session_kwargs,
+                '_manager_get_bind': self.get_bind,
+            }
+
+        # NOTE(vytas): Recycled sessions might have been created with
+        #   outdated kwargs, discard them.
+        self._recycled_generation += 1
+
+    def remove_engine(
+        self, engine: Engine, drain_timeout: float = 30.0
+    ) -> bool:
+        """Remove an engine, and dispose of its connection pool.
+
+        New sessions stop being routed to the engine immediately. Then, this
+        method waits (up to ``drain_timeout`` seconds) for in-flight sessions
+        to return their connections of the engine to the pool, and finally
+        disposes of the pool.
+
+        Note:
+            The main engine (the one passed to the constructor) cannot be
+            removed, but it can be replaced using :meth:`replace_engine`.
+
+        Args:
+            engine (Engine): A previously added engine.
+            drain_timeout (float): The maximum time (in seconds) to wait for
+                checked out connections of the engine to be returned to the
+                pool. Defaults to ``30.0``.
+
+        Returns:
+            bool: ``True`` if the engine was fully drained before its pool
+            was disposed, ``False`` if the timeout was reached.
+        """
+        with self._engines_lock:
+            if engine is self._main_engine:
+                raise ValueError(
+                    'the main engine cannot be removed, use replace_engine()'
+                )
+            if engine not in self._engines:
+                raise ValueError(f'{engine!r} is not registered')
+
+            self._engines = {
+                item: item_role
+                for item, item_role in self._engines.items()
+                if item is not engine
+            }
+            self._engine_groups = {
+                item: group
+                for item, group in self._engine_groups.items()
+                if item is not engine
+            }
+            self._update_routing()
+            for unhook in self._engine_unhooks:
+                unhook(engine)
+
+        return self._drain(engine, drain_timeout)
+
+    def replace_engine(
+        self,
+        engine: Engine,
+        new_engine: Engine,
+        role: Optional[Union[EngineRole, str]] = None,
+        drain_timeout: float = 30.0,
+    ) -> bool:
+        """Atomically replace an engine with another one.
+
+        The new engine takes over the position and (unless ``role`` is
+        specified) the role of the replaced engine. The replaced engine is
+        then drained and disposed of just like in :meth:`remove_engine`.
+
+        Args:
+            engine (Engine): A previously added engine (or the main engine).
+            new_engine (Engine): The engine to replace it with.
+            role (EngineRole, optional): The role of the new engine. Defaults
+                to the role of the replaced engine.
+            drain_timeout (float): The maximum time (in seconds) to wait for
+                checked out connections of the replaced engine to be returned
+                to the pool. Defaults to ``30.0``.
+
+        Returns:
+            bool: ``True`` if the replaced engine was fully drained before its
+            pool was disposed, ``False`` if the timeout was reached.
+        """
+        with self._engines_lock:
+            if engine not in self._engines:
+                raise ValueError(f'{engine!r} is not registered')
+            if new_engine in self._engines:
+                raise ValueError(f'{new_engine!r} is already registered')
+
+            new_role = self._engines[engine] if role is None else role
+            self._engines = {
+                (new_engine if item is engine else item): (
+                    EngineRole(new_role) if item is engine else item_role
+                )
+                for item, item_role in self._engines.items()
+            }
+            self._engine_groups = {
+                (new_engine if item is engine else item): group
+                for item, group in self._engine_groups.items()
+            }
+            # NOTE(vytas): Detach the replaced engine first, so that the new
+            #   one can take over any per-engine slots it occupied.
+            for unhook in self._engine_unhooks:
+                unhook(engine)
+            for hook in self._engine_hooks:
+                hook(new_engine)
+
+            if engine is self._main_engine:
+                self._main_engine = new_engine
+                self._Session.configure(bind=new_engine)
+            self._update_routing()
+
+        return self._drain(engine, drain_timeout)
+
+    def _drain(self, engine: Engine, timeout: float) -> bool:
+        """Wait for connections of a removed engine, and dispose of it."""
+        deadline = time.monotonic() + timeout
+        checkedout = getattr(engine.pool, 'checkedout', None)
+
+        drained = True
+        if checkedout is not None:
+            while checkedout() > 0:
+                if time.monotonic() >= deadline:
+                    drained = False
+                    break
+                time.sleep(0.01)
+
+        engine.dispose()
+        return drained
 
     def get_bind(
         self,
@@ -147,32 +498,492 @@ class Manager:
 
         This method is not used directly, it's called by the session instance
         if multiple engines are defined.
+
+        If the ``binds`` passed to the manager refer to engine groups, the
+        group is resolved by ``mapper`` (or, failing that, by the tables of
+        ``clause``) first, and the engine is then chosen among the engines of
+        that group.
         """
         write = req.method not in self.session_options.safe_methods or (
             self.session_options.write_engine_if_flushing
             and (session._flushing or isinstance(clause, (Update, Delete)))
         )
-        engines = self._write_engines if write else self._read_engines
+        engines = self._routed_engines(write, mapper, clause)
+        if isinstance(engines, Engine):
+            return engines
+
+        excluded = getattr(session, '_excluded_binds', None)
+        if excluded:
+            engines = (
+                tuple(engine for engine in engines if engine not in excluded)
+                or engines
+            )
+
+        engine = self._choose_engine(req, engines)
+        if self._shared_stats is not None:
+            self._shared_stats.record(engine, sharedstats.SELECTIONS)
+        return engine
+
+    def _routed_engines(
+        self, write: bool, mapper: Any, clause: Any
+    ) -> Union[Engine, tuple[Engine, ...]]:
+        """Return the candidate engines (or the pinned engine) of a bind."""
+        if self._bind_groups:
+            bind = self._resolve_bind(mapper, clause)
+            if isinstance(bind, Engine):
+                return bind
+            if bind is not None:
+                return self._routed_group_engines(bind, write)
+        return self._write_engines if write else self._read_engines
+
+    def _routed_group_engines(
+        self, group: str, write: bool
+    ) -> tuple[Engine, ...]:
+        """Return the read or write engines of a group (or raise)."""
+        read_engines, write_engines = self._group_routing.get(group, ((), ()))
+        engines = write_engines if write else read_engines
+        if not engines:
+            raise ValueError(
+                f'engine group {group!r} has no '
+                f'{"write" if write else "read"} engines'
+            )
+        return engines
+
+    def _resolve_bind(
+        self, mapper: Any, clause: Any
+    ) -> Union[Engine, str, None]:
+        """Look up the bind (an engine or group) of a mapper or clause."""
+        binds = self._bind_groups
+        if mapper is not None:
+            # NOTE(vytas): Accept mapped classes and aliases, too.
+            mapper = inspect(mapper).mapper
+            for cls in mapper.class_.__mro__:
+                if cls in binds:
+                    return binds[cls]
+            for table in mapper.tables:
+                if table in binds:
+                    return binds[table]
+
+        if clause is not None:
+            for table in find_tables(clause, include_crud=True):
+                if table in binds:
+                    return binds[table]
+
+        return None
 
+    def _choose_engine(
+        self, req: Request, engines: tuple[Engine, ...]
+    ) -> Engine:
+        """Choose one of ``engines`` according to the routing options."""
         if len(engines) == 1:
             return engines[0]
 
         if self.session_options.sticky_binds:
+            key_func = self.session_options.sticky_key_func
+            key = key_func(req) if key_func else None
+            if key is not None:
+                return self._get_hash_ring(engines).get(key)
             return engines[hash(req.context.request_id) % len(engines)]
 
+        if self.session_options.latency_aware_binds:
+            return self._get_latency_tracker().choose(
+                engines, self.session_options.latency_exploration
+            )
+
         return random.choice(engines)
 
+    def _get_hash_ring(self, engines: tuple[Engine, ...]) -> hashring.HashRing:
+        """Return a (cached) consistent-hash ring of the given engines."""
+        vnodes = self.session_options.sticky_vnodes
+        ring = self._hash_rings.get((vnodes, engines))
+        if ring is None:
+            ring = hashring.HashRing(engines, vnodes)
+            # NOTE(vytas): Rings of engine subsets (when some engines are
+            #   excluded due to errors) are also cached, but the cache is
+            #   kept small.
+            if len(self._hash_rings) >= 16:
+                self._hash_rings = {}
+            self._hash_rings[(vnodes, engines)] = ring
+        return ring
+
+    def _get_latency_tracker(self) -> latency.LatencyTracker:
+        """Return the latency tracker (attached to engines on first use)."""
+        # NOTE(vytas): This is called upon every get_bind(), so avoid taking
+        #   the lock once the tracker has been created.
+        if self._latency_tracker is not None:
+            return self._latency_tracker
+
+        with self._listen_lock:
+            if self._latency_tracker is None:
+                self._latency_tracker = latency.LatencyTracker()
+                self._add_engine_hook(
+                    self._latency_tracker.attach, self._latency_tracker.detach
+                )
+            return self._latency_tracker
+
+    @property
+    def engine_latencies(self) -> dict[Engine, float]:
+        """Current statement latency estimates (in seconds) per engine.
+
+        The estimates are only tracked once latency-aware binds have been
+        used (see also :attr:`~.SessionOptions.latency_aware_binds`);
+        otherwise, the returned dictionary is empty.
+        """
+        if self._latency_tracker is None:
+            return {}
+        return self._latency_tracker.latencies
+
+    def _connection_options(
+        self,
+        session: Session,
+        bind: Union[Engine, Connection],
+        req: Optional[Request] = None,
+        resp: Optional[Response] = None,
+        **kwargs: Any,
+    ) -> Optional[dict[str, Any]]:
+        """Supply execution options for a new connection of a request session.
+
+        This method is called by the session instance (see also
+        :attr:`~.SessionOptions.read_only_mode`).
+        """
+        mode = self._read_only_mode(req)
+        if mode is None:
+            return None
+
+        if not self._listening_read_only:
+            self._listen_read_only_events()
+
+        return readonly.execution_options(mode, bind.dialect.name)
+
+    def _read_only_mode(
+        self, req: Optional[Request]
+    ) -> Optional[ReadOnlyMode]:
+        if req is None or req.method not in self.session_options.safe_methods:
+            return None
+        mode: Optional[ReadOnlyMode] = getattr(
+            req.context, 'read_only_mode', self.session_options.read_only_mode
+        )
+        return mode
+
+    def _listen_read_only_events(self) -> None:
+        with self._listen_lock:
+            if not self._listening_read_only:
+                event.listen(
+                    self._Session, 'after_begin', self._on_after_begin
+                )
+                self._listening_read_only = True
+
+    def _on_after_begin(
+        self,
+        session: Session,
+        transaction: SessionTransaction,
+        connection: Connection,
+    ) -> None:
+        mode = connection.get_execution_options().get(readonly.MODE_OPTION)
+        if mode is None:
+            # NOTE(vytas): Flushing procures connections without consulting
+            #   the session's _connection_for_bind(); it is too late to
+            #   change the isolation level at this point, but the transaction
+            #   can still be made read-only.
+            mode = self._read_only_mode(session.info.get('req'))
+        if mode is ReadOnlyMode.READ_ONLY_TRANSACTION:
+            readonly.begin_read_only(connection)
+
+    def _can_skip_commit(self, session: Session) -> bool:
+        """Check if the session only holds autocommit/read-only connections."""
+        if not self._listening_read_only:
+            return False
+        if session.new or session.deleted or session.dirty:
+            return False
+
+        transaction = session.get_transaction()
+        if transaction is None:
+            return False
+
+        # NOTE(vytas): SessionTransaction._connections maps binds to
+        #   (connection, transaction, should_commit, autoclose) tuples.
+        return all(
+            readonly.MODE_OPTION in conn.get_execution_options()
+            for conn, *_ in transaction._connections.values()
+        )
+
     def get_session(
         self, req: Optional[Request] = None, resp: Optional[Response] = None
     ) -> Session:
-        """Returns a new session object."""
+        """Returns a new session object.
+
+        When :attr:`~.SessionOptions.recycle_sessions` is enabled, a request
+        session might also be reused from the current thread's free list.
+        """
         if req and resp:
-            return self._Session(
-                info={'req': req, 'resp': resp}, **self._session_kwargs
+            options = self.session_options
+            if not self._listening and (
+                options.release_after_read or options.retry_attempts
+            ):
+                self._listen_session_events()
+
+            recycled = (
+                self._get_recycled() if options.recycle_sessions else None
             )
+            session: Session
+            if recycled:
+                session = recycled.pop()
+                session.info['req'] = req
+                session.info['resp'] = resp
+            else:
+                session = self._Session(
+                    info={'req': req, 'resp': resp}, **self._session_kwargs
+                )
+
+            if self._guard is not None:
+                self._guard.begin(session)
+            return session
 
         return self._Session()
 
+    def _listen_session_events(self) -> None:
+        # NOTE(vytas): The listeners are only registered on demand, since any
+        #   do_orm_execute listener incurs overhead on every ORM statement.
+        with self._listen_lock:
+            if not self._listening:
+                event.listen(
+                    self._Session, 'do_orm_execute', self._on_orm_execute
+                )
+                event.listen(self._Session, 'after_flush', self._mark_flushed)
+                self._listening = True
+
+    def _mark_flushed(self, session: Session, flush_context: Any) -> None:
+        self._flushed.add(session.get_transaction())  # type: ignore[arg-type]
+
+    def _has_writes(self, session: Session) -> bool:
+        """Check if the session's transaction might contain any writes."""
+        return bool(
+            session.get_transaction() in self._flushed
+            or session.new
+            or session.deleted
+            or session.dirty
+        )
+
+    def _on_orm_execute(
+        self, orm_execute_state: ORMExecuteState
+    ) -> Optional[Result[Any]]:
+        """Retry and/or release connections on reads in safe requests.
+
+        This listener is only registered when
+        :attr:`~.SessionOptions.release_after_read` or
+        :attr:`~.SessionOptions.retry_attempts` is enabled.
+        """
+        options = self.session_options
+        session = orm_execute_state.session
+        req = session.info.get('req')
+
+        if (
+            not isinstance(session, RequestSession)
+            or req is None
+            or req.method not in options.safe_methods
+            or not orm_execute_state.is_select
+            or session.in_nested_transaction()
+        ):
+            return None
+
+        execution_options = orm_execute_state.execution_options
+        release = options.release_after_read and not (
+            execution_options.get('yield_per')
+            or execution_options.get('stream_results')
+        )
+        retry = (
+            options.retry_attempts
+            and not session._retrying_unit
+            and not self._has_writes(session)
+        )
+
+        if retry:
+            result = self._invoke_with_retries(orm_execute_state)
+        elif release:
+            result = orm_execute_state.invoke_statement()
+        else:
+            return None
+
+        if not release:
+            return result
+
+        # NOTE(vytas): Buffer the result since the cursor would otherwise be
+        #   closed together with the connection.
+        frozen = result.freeze()
+
+        # NOTE(vytas): Never end a transaction that might contain writes.
+        if not self._has_writes(session):
+            session.release()
+
+        return frozen()
+
+    def _invoke_with_retries(
+        self, orm_execute_state: ORMExecuteState
+    ) -> Result[Any]:
+        session = orm_execute_state.session
+        assert isinstance(session, RequestSession)
+        attempt = 0
+
+        while True:
+            try:
+                result = orm_execute_state.invoke_statement()
+            except Exception as ex:
+                if not self._should_retry(ex, attempt):
+                    raise
+                # NOTE(vytas): The transaction only contains reads at this
+                #   point, so it is safe to roll it back and start over on
+                #   another engine. Only the bind that the failing statement
+                #   was routed to is excluded, other binds are likely fine.
+                session.rollback()
+                if session._last_bind is not None:
+                    session._excluded_binds.add(session._last_bind)
+                self._prepare_retry(attempt)
+                attempt += 1
+                continue
+
+            if attempt:
+                with self._retry_lock:
+                    self._retry_stats.recovered += 1
+            return result
+
+    def _should_retry(self, error: Exception, attempt: int) -> bool:
+        if not self.is_transient_error(error):
+            return False
+        if attempt >= self.session_options.retry_attempts:
+            # NOTE(vytas): Only count operations that were actually retried;
+            #   with retries disabled, nothing has been exhausted.
+            if attempt:
+                with self._retry_lock:
+                    self._retry_stats.exhausted += 1
+            return False
+        return True
+
+    def _prepare_retry(self, attempt: int) -> None:
+        delay = retry.backoff_delay(
+            attempt, self.session_options.retry_backoff
+        )
+        with self._retry_lock:
+            self._retry_stats.retries += 1
+            self._retry_stats.backoff += delay
+        time.sleep(delay)
+
+    def is_transient_error(self, error: BaseException) -> bool:
+        """Check whether the provided error is transient, and worth retrying.
+
+        The default implementation consults
+        :func:`~falcon_sqla.retry.is_transient_error` using the dialects of the
+        registered engines. This method can be overridden in order to
+        customize the classification.
+        """
+        dialect_names = {engine.dialect.name for engine in self._engines}
+        return retry.is_transient_error(error, dialect_names)
+
+    def run_in_session(
+        self,
+        func: Callable[[Session], _T],
+        req: Optional[Request] = None,
+        resp: Optional[Response] = None,
+        idempotent: bool = False,
+    ) -> _T:
+        """Run a unit of work in a session scope, retrying transient errors.
+
+        The provided callable is invoked with a session obtained via
+        :func:`get_session`, which is finalized using :func:`close_session`
+        afterwards (like in :func:`session_scope`).
+
+        If the unit of work (or the final commit) fails with a transient error
+        (see also :func:`is_transient_error`), and the request method is in
+        :attr:`~.SessionOptions.safe_methods` (or ``idempotent`` is set), the
+        whole unit is retried in a new session up to
+        :attr:`~.SessionOptions.retry_attempts` times, sleeping a randomized
+        exponential backoff in between. Subsequent attempts avoid the engines
+        that the failing statements of the previous attempts were routed to
+        if other suitable ones are available.
+
+        Note:
+            Unlike a ``with`` block, a callable can be re-run, hence this
+            method complements :func:`session_scope` for retries.
+
+        Args:
+            func (callable): A callable accepting a session as its only
+                argument.
+            req (Request, optional): The current request.
+            resp (Response, optional): The current response.
+            idempotent (bool): Whether ``func`` may be safely retried
+                regardless of the request method. Defaults to ``False``.
+
+        Returns:
+            The return value of ``func``.
+        """
+        retriable = idempotent or (
+            req is not None and req.method in self.session_options.safe_methods
+        )
+        excluded: set[Union[Engine, Connection]] = set()
+        attempt = 0
+
+        while True:
+            session = self.get_session(req, resp)
+            if isinstance(session, RequestSession):
+                session._retrying_unit = True
+                session._excluded_binds = set(excluded)
+
+            # NOTE(vytas): Remember the bind that the last statement was
+            #   routed to before closing (and possibly recycling) the session.
+            last_bind = None
+            try:
+                try:
+                    result = func(session)
+                except Exception:
+                    last_bind = getattr(session, '_last_bind', None)
+                    self.close_session(session, False, req, resp)
+                    raise
+                last_bind = getattr(session, '_last_bind', None)
+                self.close_session(session, True, req, resp)
+            except Exception as ex:
+                if not retriable or not self._should_retry(ex, attempt):
+                    raise
+                if last_bind is not None:
+                    excluded.add(last_bind)
+                self._prepare_retry(attempt)
+                attempt += 1
+                continue
+
+            if attempt:
+                with self._retry_lock:
+                    self._retry_stats.recovered += 1
+            return result
+
+    @property
+    def retry_stats(self) -> retry.RetryStats:
+        """Statistics of retries performed by this manager."""
+        return self._retry_stats
+
+    def _get_recycled(self) -> list[RequestSession]:
+        """Return the current thread's free list of recycled sessions."""
+        local = self._recycled
+        if getattr(local, 'generation', None) != self._recycled_generation:
+            local.generation = self._recycled_generation
+            local.sessions = []
+        sessions: list[RequestSession] = local.sessions
+        return sessions
+
+    def _recycle(self, session: Session) -> None:
+        """Return a closed request session to the thread's free list."""
+        # NOTE(vytas): Only reuse sessions whose state we know how to reset,
+        #   and that have been fully cleaned up by close().
+        if (
+            not isinstance(session, RequestSession)
+            or session.in_transaction()
+            or session.identity_map
+            or session.new
+        ):
+            return
+
+        recycled = self._get_recycled()
+        if len(recycled) < self.session_options.recycle_sessions:
+            session.reset_request_state()
+            recycled.append(session)
+
     def close_session(
         self,
         session: Session,
@@ -191,7 +1002,9 @@ class Manager:
 
         try:
             if attempt_commit or session_cleanup == COMMIT:
-                session.commit()
+                if not self._can_skip_commit(session):
+                    with tracing.span('commit'):
+                        session.commit()
             elif session_cleanup != CLOSE_ONLY:
                 session.rollback()
         except Exception:
@@ -199,23 +1012,584 @@ class Manager:
                 session.rollback()
             raise
         finally:
+            if self._guard is not None and req:
+                route = (
+                    f'{req.method} {req.uri_template}'
+                    if req.uri_template
+                    else None
+                )
+                usage = self._guard.finish(session, route)
+                if usage is not None:
+                    req.context.identity_map_usage = usage
             if req and resp:
                 # NOTE(vytas): Break circular references between the request
                 #   and session in case the latter was stored in req.context.
                 del session.info['req']
                 del session.info['resp']
             session.close()
+            if req and resp and self.session_options.recycle_sessions:
+                self._recycle(session)
+
+    def monitor_compiled_cache(
+        self, record_path: Optional[str] = None
+    ) -> cache.CompiledCacheMonitor:
+        """Start tracking compiled cache hits & misses of all engines.
+
+        The statistics are available via :attr:`compiled_cache_stats`.
+        Calling this method again returns the existing monitor.
+
+        Args:
+            record_path (str, optional): A path of a file to record the names
+                of :attr:`statements` that missed the compiled cache to. See
+                also :meth:`warm_recorded_statements`.
+        """
+        if self._cache_monitor is None:
+            self._cache_monitor = cache.CompiledCacheMonitor(
+                self._statements, record_path
+            )
+            self._add_engine_hook(
+                self._cache_monitor.attach, self._cache_monitor.detach
+            )
+        return self._cache_monitor
+
+    @property
+    def compiled_cache_stats(
+        self,
+    ) -> dict[Engine, cache.CompiledCacheStats]:
+        """Compiled cache statistics per engine.
+
+        The returned dictionary is empty unless
+        :meth:`monitor_compiled_cache` has been called.
+        """
+        if self._cache_monitor is None:
+            return {}
+        return self._cache_monitor.stats
+
+    def warm_compiled_cache(self, statements: Iterable[ClauseElement]) -> int:
+        """Compile the provided statements for every registered engine.
+
+        This method is meant to be called at application startup in order to
+        populate SQLAlchemy's compiled cache of each engine, so that the first
+        requests do not pay the price of compiling the statements they use.
+
+        Bind parameters that do not have a value (such as
+        ``bindparam('name')``) are assumed to be supplied at execution time,
+        mirroring how the cache key is constructed upon execution.
+
+        Note:
+            Only statements that are later executed as-is benefit from
+            warming, so the statements to warm need to be defined in code,
+            and shared with the code executing them. Such statements can be
+            registered by name in :attr:`statements`, so that the ones
+            missing the cache in production can be recorded using
+            :meth:`monitor_compiled_cache`, and warmed upon the next startup
+            using :meth:`warm_recorded_statements`.
+
+        Args:
+            statements: An iterable of SQLAlchemy statements to compile.
+
+        Returns:
+            int: The number of newly compiled cache entries.
+        """
+        statements = tuple(statements)
+        return sum(cache.warm(engine, statements) for engine in self._engines)
+
+    @property
+    def statements(self) -> cache.StatementRegistry:
+        """The registry of named statements that can be warmed by name."""
+        return self._statements
+
+    def warm_recorded_statements(self, path: str) -> int:
+        """Warm the :attr:`statements` recorded to the given file.
+
+        The file is recorded by the compiled cache monitor (see also
+        :meth:`monitor_compiled_cache`). Names that are not registered (for
+        instance, statements that have since been removed from the code) are
+        skipped, as is a file that does not exist yet.
+
+        Args:
+            path (str): The path of the recorded file.
+
+        Returns:
+            int: The number of newly compiled cache entries.
+        """
+        recorded = (
+            self._statements.get(name) for name in cache.read_recorded(path)
+        )
+        return self.warm_compiled_cache(
+            statement for statement in recorded if statement is not None
+        )
+
+    def _get_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        """Return the manager's worker thread pool (created on first use)."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.session_options.executor_workers,
+                    thread_name_prefix='falcon-sqla',
+                )
+            return self._executor
+
+    def hedged_execute(
+        self,
+        req: Request,
+        statement: Any,
+        params: Any = None,
+        delay: Optional[float] = None,
+    ) -> Sequence[Row[Any]]:
+        """Execute an idempotent read, hedging it on a second engine.
+
+        The statement is sent to a randomly chosen engine (using the same role
+        and engine group rules as :func:`get_bind`). If no result arrives
+        within the hedging delay, the statement is also sent to a second
+        engine, and the rows of whichever query completes successfully first
+        are returned; the other query is cancelled (if it has not started
+        yet), or its result is discarded.
+
+        The hedging delay adapts to the 95th percentile of recent latencies.
+        Each query is executed in its own short-lived session on a worker
+        thread of the manager (see also
+        :attr:`~.SessionOptions.executor_workers`), so the request session (if
+        any) is not involved. Hedging statistics are available via
+        :attr:`hedging_stats`.
+
+        Warning:
+            Only idempotent ``SELECT`` statements should be hedged, since the
+            statement may be executed twice.
+
+        Args:
+            req (Request): The current request.
+            statement: The statement to execute.
+            params: Optional statement parameters.
+            delay (float, optional): Override the adaptive hedging delay (in
+                seconds).
+
+        Returns:
+            A sequence of result rows.
+        """
+        write = req.method not in self.session_options.safe_methods
+        # NOTE(vytas): Resolve the mapper of ORM statements in the same way
+        #   as Session.execute() does when passing it to get_bind().
+        subject = getattr(statement, '_propagate_attrs', {}).get(
+            'plugin_subject'
+        )
+        mapper = getattr(subject, 'mapper', None)
+        routed = self._routed_engines(write, mapper, statement)
+        if isinstance(routed, Engine):
+            engines: Sequence[Engine] = (routed,)
+        else:
+            engines = random.sample(routed, min(2, len(routed)))
+
+        return self._hedger.execute(
+            self._get_executor(), engines, statement, params, delay
+        )
+
+    def gather(
+        self,
+        req: Request,
+        *statements: Any,
+        resp: Optional[Response] = None,
+    ) -> list[Sequence[Row[Any]]]:
+        """Execute independent read statements concurrently.
+
+        Each statement is executed in its own short-lived session (and hence
+        on its own connection), using the same routing rules as
+        :func:`get_bind`, i.e., the statements are spread among the read
+        engines in the case of safe request methods. The first statement is
+        executed on the calling thread, and the rest on the worker thread
+        pool of the manager (see also
+        :attr:`~.SessionOptions.executor_workers`). Thus, the latency
+        approaches that of the slowest statement rather than the sum of all
+        of them.
+
+        The request session (if any) is not involved, so the statements do
+        not see its uncommitted changes. The short-lived sessions are rolled
+        back after reading the rows.
+
+        Warning:
+            Only ``SELECT`` statements should be gathered, since any changes
+            made by the statements are discarded.
+
+        Args:
+            req (Request): The current request.
+            *statements: The statements to execute.
+            resp (Response, optional): The current response (passed to the
+                sessions alongside ``req``).
+
+        Returns:
+            A list containing a sequence of result rows for each statement,
+            in the order of ``statements``.
+        """
+        if not statements:
+            return []
+
+        executor = self._get_executor()
+        futures = [
+            executor.submit(self._gather_one, req, resp, statement)
+            for statement in statements[1:]
+        ]
+        try:
+            results = [self._gather_one(req, resp, statements[0])]
+            results.extend(future.result() for future in futures)
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+        return results
+
+    def _gather_one(
+        self, req: Request, resp: Optional[Response], statement: Any
+    ) -> Sequence[Row[Any]]:
+        session = self._Session(
+            info={'req': req, 'resp': resp}, **self._session_kwargs
+        )
+        with session:
+            return session.execute(statement).all()
+
+    @property
+    def hedging_stats(self) -> hedging.HedgingStats:
+        """Statistics of hedged reads performed by this manager."""
+        return self._hedger.stats
+
+    def enable_adaptive_pre_ping(
+        self, idle_threshold: float = 30.0, error_window: float = 60.0
+    ) -> ping.AdaptivePrePing:
+        """Validate pooled connections of all engines only when needed.
+
+        A connection is pinged upon checkout only if it has been idle for
+        longer than ``idle_threshold``, or if its engine has recently
+        encountered a disconnect error; see also
+        :class:`~falcon_sqla.ping.AdaptivePrePing`.
+        Statistics (including the number of pings saved) are available via
+        :attr:`pre_ping_stats`. Calling this method again returns the existing
+        instance.
+
+        Note:
+            This is meant as a replacement for SQLAlchemy's
+            ``pool_pre_ping``, hence engines should be created without it.
+
+        Args:
+            idle_threshold (float): The idle time (in seconds) after which a
+                connection is validated. Defaults to ``30.0``.
+            error_window (float): For how long (in seconds) after a disconnect
+                error all checkouts are validated. Defaults to ``60.0``.
+        """
+        if self._pre_ping is None:
+            self._pre_ping = ping.AdaptivePrePing(idle_threshold, error_window)
+            self._add_engine_hook(self._pre_ping.attach, self._pre_ping.detach)
+        return self._pre_ping
+
+    @property
+    def pre_ping_stats(self) -> dict[Engine, ping.PrePingStats]:
+        """Adaptive pre-ping statistics per engine.
+
+        The returned dictionary is empty unless
+        :meth:`enable_adaptive_pre_ping` has been called.
+        """
+        if self._pre_ping is None:
+            return {}
+        return self._pre_ping.stats
+
+    def enable_tracing(
+        self, sink: Callable[[tracing.Trace], Any], sample_rate: float = 1.0
+    ) -> tracing.Tracer:
+        """Record traces of the database activity of sampled requests.
+
+        The middleware records a span tree for each sampled request, nesting
+        the request session, connection checkouts, statements (along with the
+        engine and its role), and the final commit; see also
+        :class:`~falcon_sqla.tracing.Tracer`. Finished traces are handed over
+        to ``sink``, for instance, an instance of
+        :class:`~falcon_sqla.tracing.JSONLinesExporter`. Calling this method
+        again updates the sink and the sample rate of the existing tracer.
+
+        Args:
+            sink (callable): A non-blocking callable that receives each
+                finished :class:`~falcon_sqla.tracing.Trace`.
+            sample_rate (float): The fraction of requests to trace. Defaults
+                to ``1.0``.
+        """
+        if self._tracer is None:
+            # NOTE(vytas): self._engines is copied upon any change of engines.
+            self._tracer = tracing.Tracer(
+                sink,
+                sample_rate,
+                engine_role=lambda engine: self._engines.get(engine),
+            )
+            self._add_engine_hook(self._tracer.attach, self._tracer.detach)
+        else:
+            self._tracer.sink = sink
+            self._tracer.sample_rate = sample_rate
+        return self._tracer
+
+    def enable_profiling(
+        self,
+        directory: str,
+        token: Optional[str] = None,
+        header: str = 'X-Profile-Token',
+        sample_rate: float = 0.0,
+        rule: Optional[Callable[[Request], bool]] = None,
+    ) -> profiling.RequestProfiler:
+        """Profile selected requests on demand.
+
+        The middleware runs selected requests under :mod:`cProfile`, records
+        the statements executed by their sessions, and writes combined
+        reports to ``directory``; see also
+        :class:`~falcon_sqla.profiling.RequestProfiler`. Requests that are
+        not selected incur no profiling overhead. Calling this method again
+        updates the settings of the existing profiler.
+
+        Args:
+            directory (str): The directory to write reports to.
+            token (str): The secret value of the trigger header. If ``None``
+                (the default), requests cannot be profiled on demand.
+            header (str): The name of the trigger header. Defaults to
+                ``'X-Profile-Token'``.
+            sample_rate (float): The fraction of requests to profile at
+                random. Defaults to ``0.0``.
+            rule (callable): A callable that receives the Falcon request, and
+                returns ``True`` if it should be profiled. Defaults to
+                ``None``.
+        """
+        if self._profiler is None:
+            self._profiler = profiling.RequestProfiler(
+                directory, token, header, sample_rate, rule
+            )
+        else:
+            self._profiler.directory = directory
+            self._profiler.token = token
+            self._profiler.header = header
+            self._profiler.sample_rate = sample_rate
+            self._profiler.rule = rule
+        return self._profiler
+
+    def enable_shared_stats(
+        self, path: str, max_workers: int = 64, max_engines: int = 16
+    ) -> sharedstats.SharedStats:
+        """Publish statistics to a file shared among worker processes.
+
+        The number of times each engine has been chosen, connection checkouts
+        (and the time spent procuring connections), statements, database
+        time, and errors are recorded per worker process and engine in a
+        memory-mapped file; see also
+        :class:`~falcon_sqla.sharedstats.SharedStats`. Any worker can then
+        serve the statistics aggregated across all workers, e.g., using
+        :class:`~falcon_sqla.sharedstats.SharedStatsResource`.
+
+        Calling this method again returns the existing instance.
+
+        Args:
+            path (str): The path of the file shared by all workers.
+            max_workers (int): The maximum number of worker processes.
+                Defaults to ``64``.
+            max_engines (int): The maximum number of engines. Defaults to
+                ``16``.
+        """
+        with self._listen_lock:
+            if self._shared_stats is None:
+                self._shared_stats = sharedstats.SharedStats(
+                    path, max_workers, max_engines
+                )
+                self._add_engine_hook(
+                    self._shared_stats.attach, self._shared_stats.detach
+                )
+                if issubclass(self._session_cls, RequestSession):
+                    self._session_kwargs = {
+                        **self._session_kwargs,
+                        '_manager_on_checkout': (
+                            self._shared_stats.record_checkout
+                        ),
+                    }
+                    self._recycled_generation += 1
+            return self._shared_stats
+
+    def enable_shadow_traffic(
+        self,
+        engine: Engine,
+        sample_rate: float = 0.01,
+        max_pending: int = 1000,
+    ) -> shadow.ShadowMirror:
+        """Mirror a sample of reads to a shadow (candidate) engine.
+
+        A fraction of ``SELECT`` statements executed by request sessions in
+        safe requests is re-executed on ``engine`` in a background worker
+        thread; the results are discarded, and the execution times are
+        compared against the engines that actually served the requests (see
+        :attr:`shadow_stats`). The request path never waits on the shadow
+        engine: should it fall behind, the excess samples are dropped.
+        See also :class:`~falcon_sqla.shadow.ShadowMirror`.
+
+        Calling this method again returns the existing instance.
+
+        Note:
+            The shadow engine does not need to be (and should not be) added
+            to the manager.
+
+        Args:
+            engine (Engine): The shadow engine, e.g., running on new hardware
+                or a new version of the database server.
+            sample_rate (float): The fraction of reads to mirror. Defaults to
+                ``0.01``.
+            max_pending (int): The maximum number of reads waiting to be
+                mirrored. Defaults to ``1000``.
+        """
+        with self._listen_lock:
+            if self._shadow is None:
+                self._shadow = shadow.ShadowMirror(
+                    engine, sample_rate, max_pending
+                )
+                self._add_engine_hook(self._shadow.attach, self._shadow.detach)
+                event.listen(
+                    self._Session, 'do_orm_execute', self._on_shadow_execute
+                )
+            return self._shadow
+
+    def _on_shadow_execute(self, orm_execute_state: ORMExecuteState) -> None:
+        req = orm_execute_state.session.info.get('req')
+        if (
+            req is not None
+            and req.method in self.session_options.safe_methods
+            and orm_execute_state.is_select
+        ):
+            assert self._shadow is not None
+            self._shadow.sample(orm_execute_state)
+
+    @property
+    def shadow_stats(self) -> dict[Engine, shadow.ShadowStats]:
+        """Shadow traffic statistics per (primary) engine.
+
+        The returned dictionary is empty unless :meth:`enable_shadow_traffic`
+        has been called.
+        """
+        if self._shadow is None:
+            return {}
+        return self._shadow.stats
+
+    def enable_workload_capture(
+        self, path: str, redact: bool = False, sample_rate: float = 1.0
+    ) -> workload.WorkloadRecorder:
+        """Capture the statements executed by requests to a file.
+
+        The statements executed while serving sampled requests (using the
+        middleware), along with their parameters, engine roles and timing,
+        are appended to ``path`` as JSON lines; see also
+        :class:`~falcon_sqla.workload.WorkloadRecorder`. The captured workload
+        can then be replayed against a given set of engines using
+        :func:`~falcon_sqla.workload.replay`, or the command line tool of the
+        :mod:`falcon_sqla.workload` module.
+
+        Calling this method again returns the existing instance.
+
+        Args:
+            path (str): The path of the file to append to.
+            redact (bool): Whether to replace all parameter values with
+                ``None``. Defaults to ``False``.
+            sample_rate (float): The fraction of requests to capture.
+                Defaults to ``1.0``.
+        """
+        with self._listen_lock:
+            if self._recorder is None:
+                self._recorder = workload.WorkloadRecorder(
+                    path,
+                    redact,
+                    sample_rate,
+                    engine_role=lambda engine: self._engines.get(engine),
+                )
+                self._add_engine_hook(
+                    self._recorder.attach, self._recorder.detach
+                )
+            return self._recorder
+
+    def enable_identity_map_guard(
+        self,
+        limit: Optional[int] = None,
+        action: IdentityMapAction = IdentityMapAction.WARN,
+        track_memory: bool = False,
+    ) -> memory.IdentityMapGuard:
+        """Account for (and optionally limit) identity map growth.
+
+        The peak size of the identity map of each request session is recorded
+        (see also :class:`~falcon_sqla.memory.IdentityMapGuard`), and stored
+        as ``req.context.identity_map_usage`` upon closing the session. Peak
+        values per route are available via :attr:`identity_map_peaks`.
+        Calling this method again updates the settings of the existing guard.
+
+        Args:
+            limit (int): The maximum number of objects in the identity map of
+                a request session. Defaults to ``None`` (no limit).
+            action (IdentityMapAction): What to do when the limit is
+                exceeded: warn, expunge unmodified objects, or abort the
+                request. Defaults to
+                :attr:`~falcon_sqla.IdentityMapAction.WARN`.
+            track_memory (bool): Also approximate the growth of memory
+                allocations of each request using :mod:`tracemalloc`.
+                Defaults to ``False``.
+        """
+        with self._listen_lock:
+            if self._guard is None:
+                self._guard = memory.IdentityMapGuard(
+                    limit, action, track_memory
+                )
+                self._guard.attach(self._Session)
+            else:
+                self._guard.configure(limit, action, track_memory)
+        return self._guard
+
+    @property
+    def identity_map_peaks(self) -> dict[str, memory.IdentityMapUsage]:
+        """Peak identity map usage per route (``'METHOD /uri/template'``).
+
+        The returned dictionary is empty unless
+        :meth:`enable_identity_map_guard` has been called.
+        """
+        if self._guard is None:
+            return {}
+        return self._guard.peaks
+
+    @property
+    def tracer(self) -> Optional[tracing.Tracer]:
+        """The tracer set up by :meth:`enable_tracing` (or ``None``)."""
+        return self._tracer
+
+    @property
+    def profiler(self) -> Optional[profiling.RequestProfiler]:
+        """The profiler set up by :meth:`enable_profiling` (or ``None``)."""
+        return self._profiler
+
+    @property
+    def workload_recorder(self) -> Optional[workload.WorkloadRecorder]:
+        """The workload recorder (see :meth:`enable_workload_capture`)."""
+        return self._recorder
+
+    @property
+    def shared_stats(self) -> Optional[sharedstats.SharedStats]:
+        """The statistics set up by :meth:`enable_shared_stats` (or
+        ``None``)."""
+        return self._shared_stats
 
     @property
     def read_engines(self) -> tuple[Engine, ...]:
-        """A tuple of read capable engines."""
+        """A tuple of read capable engines (not belonging to any group)."""
         return self._read_engines
 
     @property
     def write_engines(self) -> tuple[Engine, ...]:
-        """A tuple of write capable engines."""
+        """A tuple of write capable engines (not belonging to any group)."""
         return self._write_engines
 
+    def group_engines(
+        self, group: str
+    ) -> tuple[tuple[Engine, ...], tuple[Engine, ...]]:
+        """Return the read & write capable engines of an engine group.
+
+        Args:
+            group (str): The name of the group.
+
+        Returns:
+            tuple: A tuple of read engines, and a tuple of write engines.
+        """
+        return self._group_routing.get(group, ((), ()))
+
     @contextlib.contextmanager
     def session_scope(
         self, req: Optional[Request] = None, resp: Optional[Response] = None
@@ -239,6 +1613,127 @@ class Manager:
         finally:
             self.close_session(session, succeeded, req, resp)
 
+    def get_connection(
+        self,
+        req: Optional[Request] = None,
+        resp: Optional[Response] = None,
+        group: Optional[str] = None,
+    ) -> Connection:
+        """Get a Core connection for the given request (if any).
+
+        Unlike a request session, a plain
+        :class:`~sqlalchemy.engine.Connection` has no identity map or unit of
+        work, which makes it cheaper for handlers that only execute Core
+        statements. The engine is chosen using the same role-based logic as
+        :func:`get_bind`: a read engine for
+        :attr:`~.SessionOptions.safe_methods`, and a write engine otherwise.
+        Without a request, the main engine is used.
+
+        A connection is not tied to any entity, hence the engines of an
+        engine group (see also :meth:`add_engine`) are only considered if the
+        ``group`` is specified explicitly. Without a request, the first write
+        engine of the group is used in that case.
+
+        The :attr:`~.SessionOptions.read_only_mode` is also honoured for safe
+        methods.
+
+        Args:
+            req (Request): The Falcon request object (optional).
+            resp (Response): The Falcon response object (optional).
+            group (str): The name of the engine group to choose an engine
+                from (optional). Defaults to ``None`` (the engines that do
+                not belong to any group).
+        """
+        if req is None:
+            if group is None:
+                return self._main_engine.connect()
+            return self._routed_group_engines(group, True)[0].connect()
+
+        write = req.method not in self.session_options.safe_methods
+        if group is None:
+            engines = self._write_engines if write else self._read_engines
+        else:
+            engines = self._routed_group_engines(group, write)
+        engine = self._choose_engine(req, engines)
+
+        shared_stats = self._shared_stats
+        if shared_stats is None:
+            connection = engine.connect()
+        else:
+            shared_stats.record(engine, sharedstats.SELECTIONS)
+            start = time.perf_counter_ns()
+            connection = engine.connect()
+            shared_stats.record_checkout(
+                engine, time.perf_counter_ns() - start
+            )
+
+        mode = self._read_only_mode(req)
+        if mode is not None:
+            connection.execution_options(
+                **readonly.execution_options(mode, engine.dialect.name)
+            )
+            if mode is ReadOnlyMode.READ_ONLY_TRANSACTION:
+                connection.begin()
+                readonly.begin_read_only(connection)
+
+        return connection
+
+    def close_connection(
+        self, connection: Connection, succeeded: bool
+    ) -> None:
+        """Finalize a connection obtained via :func:`get_connection`.
+
+        The transaction in progress (if any) is committed or rolled back
+        according to the :attr:`~.SessionOptions.session_cleanup` option, in
+        the same way as :func:`close_session` finalizes sessions, and the
+        connection is returned to the pool.
+
+        .. note:: There is no need to invoke this method manually if you are
+                  using the :func:`connection_scope` context manager, or if
+                  you are using the
+                  :class:`~falcon_sqla.middleware.ConnectionMiddleware`.
+        """
+        session_cleanup = self.session_options.session_cleanup
+        attempt_commit = session_cleanup == COMMIT_ON_SUCCESS and succeeded
+
+        try:
+            if connection.in_transaction():
+                if attempt_commit or session_cleanup == COMMIT:
+                    with tracing.span('commit'):
+                        connection.commit()
+                elif session_cleanup != CLOSE_ONLY:
+                    connection.rollback()
+        except Exception:
+            if attempt_commit:
+                connection.rollback()
+            raise
+        finally:
+            connection.close()
+
+    @contextlib.contextmanager
+    def connection_scope(
+        self,
+        req: Optional[Request] = None,
+        resp: Optional[Response] = None,
+        group: Optional[str] = None,
+    ) -> Iterator[Connection]:
+        """Provide a Core connection scope around a series of operations.
+
+        The connection is obtained via :func:`get_connection` (optionally,
+        from the given engine ``group``), and finalized using
+        :func:`close_connection` upon exiting the context manager.
+        """
+        connection = self.get_connection(req, resp, group)
+        succeeded = True
+
+        try:
+            yield connection
+        except Exception:
+            succeeded = False
+            raise
+        finally:
+            self.close_connection(connection, succeeded)
+
     @property
     def middleware(self) -> Middleware:
         """Create a new :class:`~falcon_sqla.middleware.Middleware` instance
@@ -246,6 +1741,21 @@ class Manager:
         """
         return Middleware(self)
 
+    @property
+    def connection_middleware(self) -> ConnectionMiddleware:
+        """Create a new
+        :class:`~falcon_sqla.middleware.ConnectionMiddleware` instance
+        connected to this manager.
+        """
+        return ConnectionMiddleware(self)
+
+    @property
+    def asgi_middleware(self) -> asgi.Middleware:
+        """Create a new :class:`ASGI middleware <falcon_sqla.asgi.Middleware>`
+        instance connected to this manager.
+        """
+        return asgi.Middleware(self)
+
 
 class SessionOptions:
     """Defines a set of configurable options for the session.
@@ -280,11 +1790,128 @@ class SessionOptions:
             id for to each session. The returned object must be hashable.
             Only used when :attr:`SessionOptions.sticky_binds` is ``True``.
             Defaults to ``uuid.uuid4``.
+        sticky_key_func (callable): A callable that, given a request, returns
+            a key (such as the user, tenant, or session cookie) to stick
+            requests to engines by across requests, rather than only within
+            a request. The key is mapped to an engine using a consistent-hash
+            ring (see also :class:`~falcon_sqla.hashring.HashRing`), so that
+            only a small fraction of keys move to another engine when engines
+            are added or removed. Requests without a key (i.e., if ``None`` is
+            returned) fall back to sticking by ``req.context.request_id``.
+            See also :func:`~falcon_sqla.hashring.context_key`,
+            :func:`~falcon_sqla.hashring.header_key`, and
+            :func:`~falcon_sqla.hashring.cookie_key`.
+            Only used when :attr:`SessionOptions.sticky_binds` is ``True``.
+            Defaults to ``None``.
+        sticky_vnodes (int): The number of virtual nodes per engine on the
+            consistent-hash ring used with :attr:`sticky_key_func`.
+            Defaults to ``100``.
         wrap_response_stream (bool): When ``True`` (default), and the response
             stream is set, it is wrapped with an instance
             :class:`~falcon_sqla.util.ClosingStreamWrapper` in order to
             postpone SQLAlchemy session commit & cleanup after the response has
             finished streaming.
+        recycle_sessions (int): The maximum number of closed request sessions
+            to keep in a per-thread free list in order to reuse them for
+            subsequent requests instead of constructing new ones.
+            Only instances of :class:`~falcon_sqla.session.RequestSession`
+            (and its subclasses) are recycled. Their identity map and
+            ``info`` are cleared upon recycling, see also
+            :meth:`RequestSession.reset_request_state()
+            <falcon_sqla.session.RequestSession.reset_request_state>`.
+
+            Note:
+                A recycled session object is handed out to another request,
+                so any references to it (such as ``req.context.session``)
+                must not be used after the request has been finalized.
+
+            Defaults to ``0`` (recycling is disabled).
+        release_after_read (bool): When ``True``, request sessions of
+            :attr:`safe_methods` release their connections back to the pool
+            as soon as each ORM ``SELECT`` statement has been executed
+            (unless the session contains any changes), instead of holding
+            them until the session is finalized. The next statement then
+            acquires a connection anew, possibly from another engine chosen
+            by :func:`~falcon_sqla.Manager.get_bind`.
+
+            Each statement therefore runs in its own transaction, and
+            results are fully buffered. Streaming statements (``yield_per``
+            or ``stream_results``), as well as statements issued within a
+            nested transaction, are exempt.
+            Only sessions derived from
+            :class:`~falcon_sqla.session.RequestSession` are supported.
+            See also
+            :meth:`RequestSession.release()
+            <falcon_sqla.session.RequestSession.release>` for releasing
+            connections explicitly.
+
+            Defaults to ``False``.
+        retry_attempts (int): The maximum number of times to retry reads that
+            failed with a transient error (see also
+            :func:`Manager.is_transient_error()
+            <falcon_sqla.Manager.is_transient_error>`), such as a failover,
+            deadlock, or serialization failure.
+
+            For request sessions of :attr:`safe_methods`, each ORM ``SELECT``
+            statement is retried transparently (provided the session has no
+            changes), after rolling back the failed transaction, and
+            preferring another engine than the one that failed.
+            Whole units of work can be retried using
+            :func:`Manager.run_in_session()
+            <falcon_sqla.Manager.run_in_session>`.
+            Only sessions derived from
+            :class:`~falcon_sqla.session.RequestSession` are able to fail over
+            to another engine.
+
+            Defaults to ``0`` (retries are disabled).
+        retry_backoff (float): The base delay (in seconds) for the randomized
+            exponential backoff between retry attempts. Before the ``n``-th
+            retry, the manager sleeps for a random duration between zero and
+            ``retry_backoff * 2 ** (n - 1)``. Defaults to ``0.05``.
+        latency_aware_binds (bool): When ``True``, the engine for each
+            database operation is chosen preferring engines with a lower
+            latency estimate, instead of uniformly at random. The latency of
+            each engine is tracked as an exponentially weighted moving average
+            of its statement execution time (see also
+            :class:`~falcon_sqla.latency.LatencyTracker` and
+            :attr:`Manager.engine_latencies
+            <falcon_sqla.Manager.engine_latencies>`).
+            Only used if more than one engine with the required capabilities
+            is defined in the :class:`Manager`, and
+            :attr:`sticky_binds` is ``False``. Defaults to ``False``.
+        latency_exploration (float): The probability of choosing an engine
+            uniformly at random even when :attr:`latency_aware_binds` is
+            enabled, so that slow engines that have recovered eventually get
+            traffic again. Defaults to ``0.1``.
+        read_only_mode (ReadOnlyMode): When set, request sessions of
+            :attr:`safe_methods` execute statements in the specified
+            :class:`~falcon_sqla.ReadOnlyMode`, i.e., either using the
+            ``AUTOCOMMIT`` isolation level, or in a read-only transaction.
+            Moreover, committing such sessions upon cleanup is skipped unless
+            they contain changes, or have also used a regular transaction
+            (e.g., for flushing to a write engine).
+
+            The mode can also be overridden per request by setting
+            ``req.context.read_only_mode`` (e.g., in a Falcon ``before`` hook
+            of a specific route) before the first statement is executed;
+            ``None`` disables the mode for the request in question.
+            Only sessions derived from
+            :class:`~falcon_sqla.session.RequestSession` are supported.
+
+            Defaults to ``None`` (regular transactions are used).
+        data_loader (bool): When ``True``, the middleware also provides a
+            :class:`~falcon_sqla.loader.DataLoader` bound to the request
+            session as ``req.context.loader``, which can be used to batch
+            primary key lookups. Defaults to ``False``.
+        executor_workers (int): The maximum number of worker threads used by
+            the manager to run queries in parallel, e.g., for
+            :func:`Manager.hedged_execute()
+            <falcon_sqla.Manager.hedged_execute>` or
+            :func:`Manager.gather() <falcon_sqla.Manager.gather>`. This also
+            bounds the number of concurrently used connections. The thread
+            pool is created
+            upon first use. Defaults to ``None`` (the default of
+            :class:`concurrent.futures.ThreadPoolExecutor`).
     """
 
     NO_SESSION_METHODS = frozenset(['OPTIONS', 'TRACE'])
@@ -305,7 +1932,18 @@ class SessionOptions:
         'write_engine_if_flushing',
         'sticky_binds',
         'request_id_func',
+        'sticky_key_func',
+        'sticky_vnodes',
         'wrap_response_stream',
+        'recycle_sessions',
+        'release_after_read',
+        'retry_attempts',
+        'retry_backoff',
+        'latency_aware_binds',
+        'latency_exploration',
+        'read_only_mode',
+        'data_loader',
+        'executor_workers',
     ]
 
     session_cleanup: SessionCleanup
@@ -316,7 +1954,18 @@ class SessionOptions:
     write_engine_if_flushing: bool
     sticky_binds: bool
     request_id_func: Callable[[], Hashable]
+    sticky_key_func: Optional[Callable[[Request], Optional[Hashable]]]
+    sticky_vnodes: int
     wrap_response_stream: bool
+    recycle_sessions: int
+    release_after_read: bool
+    retry_attempts: int
+    retry_backoff: float
+    latency_aware_binds: bool
+    latency_exploration: float
+    read_only_mode: Optional[ReadOnlyMode]
+    data_loader: bool
+    executor_workers: Optional[int]
 
     def __init__(self) -> None:
         self.session_cleanup = SessionCleanup.COMMIT_ON_SUCCESS
@@ -330,5 +1979,22 @@ class SessionOptions:
 
         self.sticky_binds = False
         self.request_id_func = uuid.uuid4
+        self.sticky_key_func = None
+        self.sticky_vnodes = 100
 
         self.wrap_response_stream = True
+
+        self.recycle_sessions = 0
+        self.release_after_read = False
+
+        self.retry_attempts = 0
+        self.retry_backoff = 0.05
+
+        self.latency_aware_binds = False
+        self.latency_exploration = 0.1
+
+        self.read_only_mode = None
+
+        self.data_loader = False
+
+        self.executor_workers = None
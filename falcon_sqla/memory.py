@@ -0,0 +1,249 @@
+#  Copyright 2020-2025 Vytautas Liuolia
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Accounting and limits of request session identity maps."""
+
+from __future__ import annotations
+
+import threading
+import tracemalloc
+from typing import Any, Optional
+import warnings
+
+from sqlalchemy import event
+from sqlalchemy.orm import InstanceState
+from sqlalchemy.orm import ORMExecuteState
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import instance_state
+
+from .constants import IdentityMapAction
+
+__all__ = [
+    'IdentityMapGuard',
+    'IdentityMapLimitExceeded',
+    'IdentityMapUsage',
+    'IdentityMapWarning',
+]
+
+
+class IdentityMapWarning(UserWarning):
+    """A request session has exceeded its identity map limit."""
+
+
+class IdentityMapLimitExceeded(Exception):
+    """A request session has been aborted for exceeding its identity map limit.
+
+    Attributes:
+        limit (int): The configured limit.
+        size (int): The number of objects in the identity map.
+    """
+
+    def __init__(self, limit: int, size: int) -> None:
+        super().__init__(
+            f'identity map size {size} exceeds the limit of {limit} objects'
+        )
+        self.limit = limit
+        self.size = size
+
+
+class IdentityMapUsage:
+    """Identity map accounting of a request session (or peaks of a route).
+
+    Attributes:
+        objects (int): The peak number of objects in the identity map.
+        memory (int): The peak growth of memory allocations (in bytes) as
+            sampled using :mod:`tracemalloc`, or ``None`` if memory is not
+            tracked. Since allocations are traced process-wide, the figure is
+            only approximate when requests are served concurrently.
+        exceeded (bool): Whether the limit was exceeded.
+        expunged (int): The number of objects expunged due to the limit.
+    """
+
+    __slots__ = ['objects', 'memory', 'exceeded', 'expunged', '_baseline']
+
+    def __init__(self) -> None:
+        self.objects = 0
+        self.memory: Optional[int] = None
+        self.exceeded = False
+        self.expunged = 0
+        self._baseline = 0
+
+    def _merge(self, other: IdentityMapUsage) -> None:
+        self.objects = max(self.objects, other.objects)
+        if other.memory is not None:
+            self.memory = max(self.memory or 0, other.memory)
+        self.exceeded = self.exceeded or other.exceeded
+        self.expunged = max(self.expunged, other.expunged)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable snapshot of this accounting."""
+        return {
+            'objects': self.objects,
+            'memory': self.memory,
+            'exceeded': self.exceeded,
+            'expunged': self.expunged,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f'{type(self).__name__}(objects={self.objects}, '
+            f'memory={self.memory}, exceeded={self.exceeded})'
+        )
+
+
+class IdentityMapGuard:
+    """Tracks (and optionally limits) identity map growth of sessions.
+
+    The size of the identity map of each tracked session is checked whenever
+    an object is loaded, and the peak is recorded. Upon finishing a session,
+    its peak usage is merged into the peaks of the respective route (see also
+    :attr:`peaks`).
+
+    Args:
+        limit (int): The maximum number of objects in the identity map of a
+            session. Defaults to ``None`` (only accounting is performed).
+        action (IdentityMapAction): What to do when the limit is exceeded.
+            Defaults to :attr:`~falcon_sqla.IdentityMapAction.WARN`.
+        track_memory (bool): Also sample the growth of memory allocations
+            using :mod:`tracemalloc` (which is started if not tracing yet).
+            Note that tracing allocations slows down the whole application
+            considerably. Defaults to ``False``.
+        memory_interval (int): Sample memory every ``memory_interval``
+            loaded objects (and upon finishing the session).
+            Defaults to ``1000``.
+    """
+
+    def __init__(
+        self,
+        limit: Optional[int] = None,
+        action: IdentityMapAction = IdentityMapAction.WARN,
+        track_memory: bool = False,
+        memory_interval: int = 1000,
+    ) -> None:
+        self.memory_interval = memory_interval
+        self.configure(limit, action, track_memory)
+
+        self._usages: dict[Session, IdentityMapUsage] = {}
+        self._peaks: dict[str, IdentityMapUsage] = {}
+        self._lock = threading.Lock()
+
+    def configure(
+        self,
+        limit: Optional[int],
+        action: IdentityMapAction,
+        track_memory: bool,
+    ) -> None:
+        """Update the limit, action, and memory tracking settings."""
+        self.limit = limit
+        self.action = action
+        self.track_memory = track_memory
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @property
+    def peaks(self) -> dict[str, IdentityMapUsage]:
+        """Peak usage per route (a copy)."""
+        with self._lock:
+            return dict(self._peaks)
+
+    def attach(self, session_factory: Any) -> None:
+        """Listen to loading events of the given session (factory)."""
+        event.listen(session_factory, 'loaded_as_persistent', self._on_loaded)
+        event.listen(session_factory, 'do_orm_execute', self._on_orm_execute)
+
+    def begin(self, session: Session) -> None:
+        """Start tracking the given session."""
+        usage = IdentityMapUsage()
+        if self.track_memory:
+            usage.memory = 0
+            usage._baseline = tracemalloc.get_traced_memory()[0]
+        self._usages[session] = usage
+
+    def finish(
+        self, session: Session, route: Optional[str] = None
+    ) -> Optional[IdentityMapUsage]:
+        """Stop tracking the given session, and return its usage.
+
+        Unless ``route`` is ``None``, the usage is merged into the peaks of
+        the given route.
+        """
+        usage = self._usages.pop(session, None)
+        if usage is None:
+            return None
+
+        self._observe(session, usage)
+        if usage.memory is not None:
+            self._sample_memory(usage)
+
+        if route is not None:
+            with self._lock:
+                peak = self._peaks.get(route)
+                if peak is None:
+                    peak = self._peaks[route] = IdentityMapUsage()
+                peak._merge(usage)
+
+        return usage
+
+    def _sample_memory(self, usage: IdentityMapUsage) -> None:
+        growth = tracemalloc.get_traced_memory()[0] - usage._baseline
+        usage.memory = max(usage.memory or 0, growth)
+
+    def _observe(self, session: Session, usage: IdentityMapUsage) -> int:
+        size = len(session.identity_map)
+        usage.objects = max(usage.objects, size)
+        return size
+
+    def _on_loaded(self, session: Session, state: InstanceState[Any]) -> None:
+        usage = self._usages.get(session)
+        if usage is None:
+            return
+
+        size = self._observe(session, usage)
+        if usage.memory is not None and size % self.memory_interval == 0:
+            self._sample_memory(usage)
+
+        if self.limit is None or size <= self.limit:
+            return
+
+        if self.action is IdentityMapAction.ABORT:
+            usage.exceeded = True
+            raise IdentityMapLimitExceeded(self.limit, size)
+        if not usage.exceeded:
+            usage.exceeded = True
+            if self.action is IdentityMapAction.WARN:
+                warnings.warn(
+                    f'identity map size {size} exceeds the limit of '
+                    f'{self.limit} objects',
+                    IdentityMapWarning,
+                    stacklevel=2,
+                )
+
+    def _on_orm_execute(self, orm_execute_state: ORMExecuteState) -> None:
+        if self.action is not IdentityMapAction.EXPUNGE or self.limit is None:
+            return
+
+        session = orm_execute_state.session
+        usage = self._usages.get(session)
+        if usage is None or len(session.identity_map) <= self.limit:
+            return
+
+        # NOTE(vytas): Objects pending deletion must stay in the session,
+        #   since expunging them would cancel the deletion.
+        deleted = session.deleted
+        for instance in session.identity_map.values():
+            if (
+                not instance_state(instance).modified
+                and instance not in deleted
+            ):
+                session.expunge(instance)
+                usage.expunged += 1
@@ -15,8 +15,9 @@
 from __future__ import annotations
 
 import functools
-from typing import Optional, TYPE_CHECKING
+from typing import Any, Optional, TYPE_CHECKING
 
+from .loader import DataLoader
 from .util import ClosingStreamWrapper
 
 if TYPE_CHECKING:
@@ -24,6 +25,9 @@ if TYPE_CHECKING:
     from falcon import Response
 
     from .manager import Manager
+    from .profiling import RequestProfile
+    from .tracing import Trace
+    from .workload import CapturedRequest
 
 
 class Middleware:
@@ -33,6 +37,8 @@ class Middleware:
         manager (Manager): Manager instance to use in this middleware.
     """
 
+    _context_attr = 'session'
+
     def __init__(self, manager: Manager) -> None:
         self._manager = manager
         self._options = manager.session_options
@@ -43,19 +49,75 @@ class Middleware:
 
         The session object is stored as ``req.context.session``.
 
+        When the :attr:`~.SessionOptions.data_loader` option is set to
+        ``True``, a :class:`~falcon_sqla.loader.DataLoader` bound to the
+        session is stored as ``req.context.loader``.
+
         When the :attr:`~.SessionOptions.sticky_binds` option is set to
         ``True``, a ``req.context.request_id`` identifier is created (if not
         already present) by calling the
         :attr:`~.SessionOptions.request_id_func` function.
+
+        When tracing is enabled (see also
+        :meth:`Manager.enable_tracing() <falcon_sqla.Manager.enable_tracing>`),
+        and the request is sampled, the
+        :class:`~falcon_sqla.tracing.Trace` being recorded is stored as
+        ``req.context.trace``.
+
+        When profiling is enabled (see also
+        :meth:`Manager.enable_profiling()
+        <falcon_sqla.Manager.enable_profiling>`), and the request is selected
+        for profiling, the :class:`~falcon_sqla.profiling.RequestProfile`
+        being recorded is stored as ``req.context.profile``.
+
+        When workload capture is enabled (see also
+        :meth:`Manager.enable_workload_capture()
+        <falcon_sqla.Manager.enable_workload_capture>`), and the request is
+        sampled, the :class:`~falcon_sqla.workload.CapturedRequest` being
+        recorded is stored as ``req.context.workload``.
         """
+        tracer = self._manager.tracer
+        trace = None
+        if tracer is not None:
+            trace = tracer.start_trace(
+                f'{req.method} {req.path}',
+                **{'http.method': req.method, 'http.target': req.path},
+            )
+            if trace is not None:
+                req.context.trace = trace
+
         if req.method not in self._options.no_session_methods:
-            req.context.session = self._manager.get_session(req, resp)
-            if self._options.sticky_binds and not getattr(
-                req.context, 'request_id', None
-            ):
-                req.context.request_id = self._options.request_id_func()
+            if trace is not None:
+                trace.start_span(self._context_attr)
+            self._open(req, resp)
+
+            profiler = self._manager.profiler
+            if profiler is not None and profiler.should_profile(req):
+                profile = profiler.start(
+                    req, getattr(req.context, self._context_attr)
+                )
+                if profile is not None:
+                    req.context.profile = profile
+
+            recorder = self._manager.workload_recorder
+            if recorder is not None:
+                captured = recorder.start(req)
+                if captured is not None:
+                    req.context.workload = captured
         else:
-            req.context.session = None
+            setattr(req.context, self._context_attr, None)
+
+    def _open(self, req: Request, resp: Response) -> None:
+        req.context.session = self._manager.get_session(req, resp)
+        if self._options.data_loader:
+            req.context.loader = DataLoader(req.context.session)
+        self._ensure_request_id(req)
+
+    def _ensure_request_id(self, req: Request) -> None:
+        if self._options.sticky_binds and not getattr(
+            req.context, 'request_id', None
+        ):
+            req.context.request_id = self._options.request_id_func()
 
     def process_response(
         self,
@@ -70,19 +132,127 @@ class Middleware:
         This response hook finalizes the session by calling the manager's
         :func:`~falcon_sqla.Manager.close_session` method.
         """
-        session = getattr(req.context, 'session', None)
+        held = getattr(req.context, self._context_attr, None)
+        trace = getattr(req.context, 'trace', None)
+        profile: Optional[RequestProfile] = getattr(
+            req.context, 'profile', None
+        )
+        if profile is not None:
+            profile.stop()
+        captured: Optional[CapturedRequest] = getattr(
+            req.context, 'workload', None
+        )
 
-        if session:
+        if held is not None:
             if resp.stream is not None and self._options.wrap_response_stream:
                 resp.stream = ClosingStreamWrapper(
                     resp.stream,
                     functools.partial(
-                        self._manager.close_session,
-                        session,
+                        self._finalize,
+                        held,
                         req_succeeded,
                         req,
                         resp,
+                        trace,
+                        profile,
+                        captured,
                     ),
                 )
             else:
-                self._manager.close_session(session, req_succeeded, req, resp)
+                self._finalize(
+                    held,
+                    req_succeeded,
+                    req,
+                    resp,
+                    trace,
+                    profile,
+                    captured,
+                )
+        elif trace is not None:
+            self._finish_trace(trace, resp)
+
+    def _close(
+        self, session: Any, req_succeeded: bool, req: Request, resp: Response
+    ) -> None:
+        self._manager.close_session(session, req_succeeded, req, resp)
+
+    def _finalize(
+        self,
+        resource: Any,
+        req_succeeded: bool,
+        req: Request,
+        resp: Response,
+        trace: Optional[Trace],
+        profile: Optional[RequestProfile],
+        captured: Optional[CapturedRequest],
+    ) -> None:
+        try:
+            self._close_traced(resource, req_succeeded, req, resp, trace)
+        finally:
+            if profile is not None:
+                profile.profiler.finish(profile, resp)
+            if captured is not None:
+                recorder = self._manager.workload_recorder
+                assert recorder is not None
+                recorder.finish(captured)
+
+    def _close_traced(
+        self,
+        resource: Any,
+        req_succeeded: bool,
+        req: Request,
+        resp: Response,
+        trace: Optional[Trace],
+    ) -> None:
+        if trace is None:
+            self._close(resource, req_succeeded, req, resp)
+            return
+
+        span = trace.spans[1]
+        try:
+            self._close(resource, req_succeeded, req, resp)
+        except Exception as ex:
+            trace.end_span(span, str(ex))
+            raise
+        else:
+            trace.end_span(span)
+        finally:
+            self._finish_trace(trace, resp)
+
+    def _finish_trace(self, trace: Trace, resp: Response) -> None:
+        trace.tracer.finish_trace(
+            trace, **{'http.status_code': resp.status_code}
+        )
+
+
+class ConnectionMiddleware(Middleware):
+    """Falcon middleware providing a Core connection instead of a session.
+
+    The connection is obtained via the manager's
+    :func:`~falcon_sqla.Manager.get_connection` method, and stored as
+    ``req.context.connection`` (``req.context.session`` is not set).
+    It is finalized using :func:`~falcon_sqla.Manager.close_connection`
+    upon processing the response (or once the response has finished
+    streaming), honouring the :attr:`~.SessionOptions.session_cleanup` option.
+
+    This middleware avoids the overhead of ORM sessions for handlers that
+    only execute Core statements.
+
+    Args:
+        manager (Manager): Manager instance to use in this middleware.
+    """
+
+    _context_attr = 'connection'
+
+    def _open(self, req: Request, resp: Response) -> None:
+        self._ensure_request_id(req)
+        req.context.connection = self._manager.get_connection(req, resp)
+
+    def _close(
+        self,
+        connection: Any,
+        req_succeeded: bool,
+        req: Request,
+        resp: Response,
+    ) -> None:
+        self._manager.close_connection(connection, req_succeeded)
@@ -0,0 +1,296 @@
+#  Copyright 2020-2025 Vytautas Liuolia
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""Keyset (a.k.a. cursor) pagination of collection endpoints."""
+
+from __future__ import annotations
+
+import base64
+import binascii
+from collections.abc import Sequence
+import datetime
+import decimal
+import json
+from typing import Any, Optional, TYPE_CHECKING, Union
+import uuid
+
+import falcon
+from sqlalchemy import and_
+from sqlalchemy import ColumnExpressionArgument
+from sqlalchemy import Connection
+from sqlalchemy import or_
+from sqlalchemy import Select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import ColumnElement
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import UnaryExpression
+
+if TYPE_CHECKING:
+    from falcon import Request
+    from falcon import Response
+
+__all__ = ['KeysetPage', 'KeysetPaginator', 'decode_token', 'encode_token']
+
+_SCALARS = (str, int, float, bool)
+
+_ISO_TYPES = (datetime.date, datetime.datetime, datetime.time)
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, _ISO_TYPES):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    raise TypeError(f'{type(value).__name__} is not supported in tokens')
+
+
+def _decode_value(column: Any, value: Any) -> Any:
+    """Convert a decoded token value to the Python type of its column."""
+    try:
+        python_type = column.type.python_type
+    except (AttributeError, NotImplementedError):
+        return value
+
+    if value is None or isinstance(value, python_type):
+        return value
+    if python_type in _ISO_TYPES:
+        if not isinstance(value, str):
+            raise ValueError(f'{value!r} is not an ISO 8601 string')
+        return python_type.fromisoformat(value)
+    try:
+        return python_type(value)
+    except (AttributeError, TypeError, ArithmeticError) as ex:
+        raise ValueError(f'{value!r} is not a {python_type.__name__}') from ex
+
+
+def encode_token(values: Sequence[Any]) -> str:
+    """Encode the sort key values of the last item as an opaque token.
+
+    Dates and times are encoded as ISO 8601 strings, and decimals and UUIDs
+    as strings.
+    """
+    data = json.dumps(
+        list(values), default=_encode_value, separators=(',', ':')
+    ).encode()
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode()
+
+
+def decode_token(token: str) -> list[Any]:
+    """Decode a token created by :func:`encode_token`.
+
+    Raises:
+        ValueError: The token is malformed, or contains values other than
+            strings, numbers, booleans, or ``None``.
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeError, ValueError) as ex:
+        raise ValueError('malformed pagination token') from ex
+    # NOTE(vytas): The values are bound into the query as is, so only JSON
+    #   scalars are accepted (a client could forge any JSON otherwise).
+    if not isinstance(values, list) or not all(
+        value is None or isinstance(value, _SCALARS) for value in values
+    ):
+        raise ValueError('malformed pagination token')
+    return values
+
+
+class KeysetPage:
+    """A page of results returned by :meth:`KeysetPaginator.paginate`.
+
+    Attributes:
+        items (list): The items of the page. If the statement selects a
+            single entity or column, these are scalars (like
+            :meth:`~sqlalchemy.engine.Result.scalars`); otherwise, tuples.
+        next_token (str): The token of the next page, or ``None`` if this is
+            the last page.
+        next_url (str): The relative URL of the next page, or ``None`` if
+            this is the last page.
+    """
+
+    __slots__ = ['items', 'next_token', 'next_url']
+
+    def __init__(
+        self,
+        items: list[Any],
+        next_token: Optional[str],
+        next_url: Optional[str],
+    ) -> None:
+        self.items = items
+        self.next_token = next_token
+        self.next_url = next_url
+
+    def __repr__(self) -> str:
+        return (
+            f'{type(self).__name__}(items={len(self.items)}, '
+            f'next_token={self.next_token!r})'
+        )
+
+
+class KeysetPaginator:
+    """Paginates ``SELECT`` statements by the values of unique sort keys.
+
+    Instead of skipping the rows of previous pages with ``OFFSET`` (which
+    the database still has to scan), each page continues right after the
+    sort key of the last item of the previous page, which is passed around
+    in an opaque token. Given an index on the sort columns, fetching any page
+    costs the same as fetching the first one.
+
+    Args:
+        columns (list): The columns to sort by; ascending unless wrapped in
+            ``.desc()``. The combination of the columns must be unique for
+            every row (e.g., append the primary key), and the columns must
+            not be ``NULL``. The values of the columns must be numbers,
+            strings, dates and times, decimals, or UUIDs; the values passed
+            back in tokens are converted to the Python types of the columns.
+        page_size (int): The default number of items per page.
+            Defaults to ``50``.
+        max_page_size (int): The maximum number of items per page that can
+            be requested using the ``limit_param``. Defaults to ``500``.
+        token_param (str): The name of the query parameter carrying the
+            token. Defaults to ``'cursor'``.
+        limit_param (str): The name of the query parameter specifying the
+            page size. Defaults to ``'limit'``.
+        token_header (str): The name of the response header to set to the
+            token of the next page (or ``None`` to only set the ``Link``
+            header). Defaults to ``'X-Next-Cursor'``.
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[ColumnExpressionArgument[Any]],
+        page_size: int = 50,
+        max_page_size: int = 500,
+        token_param: str = 'cursor',
+        limit_param: str = 'limit',
+        token_header: Optional[str] = 'X-Next-Cursor',
+    ) -> None:
+        if not columns:
+            raise ValueError('at least one sort column is required')
+
+        self.page_size = page_size
+        self.max_page_size = max_page_size
+        self.token_param = token_param
+        self.limit_param = limit_param
+        self.token_header = token_header
+
+        self._order_by = tuple(columns)
+        self._keys: list[tuple[Any, bool]] = []
+        for column in columns:
+            descending = False
+            if isinstance(column, UnaryExpression) and column.modifier in (
+                operators.asc_op,
+                operators.desc_op,
+            ):
+                descending = column.modifier is operators.desc_op
+                column = column.element
+            self._keys.append((column, descending))
+
+    def where(self, values: Sequence[Any]) -> ColumnElement[bool]:
+        """Build the criterion selecting rows that follow the given key.
+
+        For instance, for ascending columns ``a`` and ``b``, the criterion
+        is ``a > :a OR (a = :a AND b > :b)``.
+        """
+        clauses = []
+        for index, (column, descending) in enumerate(self._keys):
+            equal = [
+                key == value
+                for (key, _), value in zip(self._keys[:index], values)
+            ]
+            value = values[index]
+            following = column < value if descending else column > value
+            clauses.append(and_(*equal, following))
+        return or_(*clauses)
+
+    def paginate(
+        self,
+        executor: Union[Session, Connection],
+        stmt: Select[Any],
+        req: Request,
+        resp: Response,
+    ) -> KeysetPage:
+        """Fetch the page of ``stmt`` requested by ``req``.
+
+        The statement is ordered by the sort columns (replacing any existing
+        ``ORDER BY``), filtered by the key of the token passed in the query
+        string (if any), and limited to the requested page size. If more
+        items follow, a ``Link`` header with ``rel="next"`` (and the
+        ``token_header``, if set) is added to ``resp``.
+
+        Args:
+            executor: A session (or a connection) to execute the statement.
+            stmt (Select): The statement to paginate.
+            req (Request): The Falcon request.
+            resp (Response): The Falcon response.
+
+        Raises:
+            falcon.HTTPInvalidParam: The token or page size is invalid.
+        """
+        limit = req.get_param_as_int(
+            self.limit_param,
+            min_value=1,
+            max_value=self.max_page_size,
+            default=self.page_size,
+        )
+
+        token = req.get_param(self.token_param)
+        if token is not None:
+            try:
+                values = decode_token(token)
+                if len(values) != len(self._keys):
+                    raise ValueError('wrong number of values')
+                values = [
+                    _decode_value(column, value)
+                    for (column, _), value in zip(self._keys, values)
+                ]
+            except ValueError:
+                raise falcon.HTTPInvalidParam(
+                    'The pagination token is invalid.', self.token_param
+                )
+            stmt = stmt.where(self.where(values))
+
+        width = len(stmt.column_descriptions)
+        keys = [
+            column.label(f'falcon_sqla_key{index}')
+            for index, (column, _) in enumerate(self._keys)
+        ]
+        stmt = (
+            stmt.add_columns(*keys)
+            .order_by(None)
+            .order_by(*self._order_by)
+            .limit(limit + 1)
+        )
+        rows = executor.execute(stmt).all()
+
+        next_token = next_url = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_token = encode_token(rows[-1][width:])
+            params = {**req.params, self.token_param: next_token}
+            next_url = (
+                req.root_path
+                + req.path
+                + falcon.to_query_str(params, comma_delimited_lists=False)
+            )
+            resp.append_link(next_url, 'next')
+            if self.token_header:
+                resp.set_header(self.token_header, next_token)
+
+        if width == 1:
+            items = [row[0] for row in rows]
+        else:
+            items = [tuple(row[:width]) for row in rows]
+        return KeysetPage(items, next_token, next_url)
@@ -0,0 +1,166 @@
+#  Copyright 2020-2025 Vytautas Liuolia
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""Adaptive validation of pooled connections upon checkout."""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Optional
+
+from sqlalchemy import Engine
+from sqlalchemy import exc
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.pool import ConnectionPoolEntry
+
+from .util import EngineListeners
+
+__all__ = ['AdaptivePrePing', 'PrePingStats']
+
+_CHECKIN_KEY = 'falcon_sqla.checkin'
+
+
+class PrePingStats:
+    """Statistics of adaptive connection validation.
+
+    Attributes:
+        checkouts (int): Number of checkouts of previously used connections,
+            i.e., checkouts that would have been pinged by ``pool_pre_ping``.
+        pings (int): Number of connections that were actually pinged.
+        saved (int): Number of pings that were skipped.
+        failed (int): Number of pings that failed.
+    """
+
+    __slots__ = ['checkouts', 'pings', 'saved', 'failed']
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.pings = 0
+        self.saved = 0
+        self.failed = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable snapshot of these statistics."""
+        return {
+            'checkouts': self.checkouts,
+            'pings': self.pings,
+            'saved': self.saved,
+            'failed': self.failed,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f'{type(self).__name__}(checkouts={self.checkouts}, '
+            f'pings={self.pings}, saved={self.saved}, failed={self.failed})'
+        )
+
+
+class AdaptivePrePing:
+    """Validates pooled connections only when they are likely stale.
+
+    Unlike SQLAlchemy's ``pool_pre_ping``, which incurs a round trip upon
+    every checkout, a connection is only pinged if it has been idle in the
+    pool for longer than ``idle_threshold``, or if its engine has encountered
+    a disconnect error within the last ``error_window`` seconds. Otherwise,
+    the connection is used optimistically; should it turn out to be dead,
+    SQLAlchemy invalidates it (as well as other connections of the pool that
+    were checked in before the error) upon the resulting disconnect error.
+    Such errors can be retried transparently using
+    :attr:`~falcon_sqla.manager.SessionOptions.retry_attempts`.
+
+    A failed ping invalidates the whole pool, and the checkout is attempted
+    anew with a fresh connection.
+
+    An instance of this class is created by
+    :meth:`Manager.enable_adaptive_pre_ping()
+    <falcon_sqla.Manager.enable_adaptive_pre_ping>`.
+
+    Args:
+        idle_threshold (float): The idle time (in seconds) after which a
+            connection is validated upon checkout. Defaults to ``30.0``.
+        error_window (float): For how long (in seconds) after a disconnect
+            error all checkouts of the engine in question are validated.
+            Defaults to ``60.0``.
+    """
+
+    def __init__(
+        self, idle_threshold: float = 30.0, error_window: float = 60.0
+    ) -> None:
+        self.idle_threshold = idle_threshold
+        self.error_window = error_window
+        self._stats: dict[Engine, PrePingStats] = {}
+        self._listeners = EngineListeners()
+        self._disconnected: dict[Engine, float] = {}
+
+    @property
+    def stats(self) -> dict[Engine, PrePingStats]:
+        """Pre-ping statistics keyed by engine."""
+        return self._stats
+
+    def attach(self, engine: Engine) -> None:
+        """Start validating connections of the given engine."""
+        if engine in self._stats:
+            return
+
+        stats = self._stats[engine] = PrePingStats()
+        dialect = engine.dialect
+
+        def checkin(
+            dbapi_connection: Any, connection_record: ConnectionPoolEntry
+        ) -> None:
+            connection_record.info[_CHECKIN_KEY] = time.monotonic()
+
+        def checkout(
+            dbapi_connection: Any,
+            connection_record: ConnectionPoolEntry,
+            connection_proxy: Any,
+        ) -> None:
+            checked_in = connection_record.info.pop(_CHECKIN_KEY, None)
+            if checked_in is None:
+                # NOTE(vytas): A fresh connection does not need validation.
+                return
+
+            stats.checkouts += 1
+            now = time.monotonic()
+            disconnected = self._disconnected.get(engine)
+            if now - checked_in <= self.idle_threshold and (
+                disconnected is None or now - disconnected > self.error_window
+            ):
+                stats.saved += 1
+                return
+
+            stats.pings += 1
+            try:
+                dialect.do_ping(dbapi_connection)
+            except dialect.loaded_dbapi.Error as error:
+                stats.failed += 1
+                if dialect.is_disconnect(error, dbapi_connection, None):
+                    self._disconnected[engine] = time.monotonic()
+                    raise exc.InvalidatePoolError() from error
+                raise
+
+        def handle_error(context: ExceptionContext) -> Optional[Exception]:
+            if context.is_disconnect:
+                self._disconnected[engine] = time.monotonic()
+            return None
+
+        self._listeners.listen(engine, engine.pool, 'checkin', checkin)
+        self._listeners.listen(engine, engine.pool, 'checkout', checkout)
+        self._listeners.listen(engine, engine, 'handle_error', handle_error)
+
+    def detach(self, engine: Engine) -> None:
+        """Stop validating connections of the given engine."""
+        self._listeners.remove(engine)
+        self._stats.pop(engine, None)
+        self._disconnected.pop(engine, None)
@@ -0,0 +1,424 @@
+#  Copyright 2020-2025 Vytautas Liuolia
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""On-demand profiling of individual requests."""
+
+from __future__ import annotations
+
+import cProfile
+import hmac
+import json
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from typing import Any, Callable, Optional, TYPE_CHECKING, Union
+import uuid
+import warnings
+
+from sqlalchemy import Connection
+from sqlalchemy import event
+from sqlalchemy.engine import ExecutionContext
+from sqlalchemy.orm import Session
+from sqlalchemy.orm import SessionTransaction
+
+if TYPE_CHECKING:
+    from falcon import Request
+    from falcon import Response
+
+__all__ = ['ProfiledStatement', 'RequestProfile', 'RequestProfiler']
+
+_INTERNAL_MODULES = ('falcon_sqla.', 'sqlalchemy.')
+
+# NOTE(vytas): Python 3.12+ profiles all threads of the interpreter at once.
+_INTERPRETER_WIDE = sys.version_info >= (3, 12)
+
+
+def _caller() -> str:
+    """Describe the innermost frame outside of SQLAlchemy & this library."""
+    frame = sys._getframe(2)
+    while frame.f_back is not None and frame.f_globals.get(
+        '__name__', ''
+    ).startswith(_INTERNAL_MODULES):
+        frame = frame.f_back
+
+    code = frame.f_code
+    return f'{code.co_filename}:{frame.f_lineno} ({code.co_name})'
+
+
+class ProfiledStatement:
+    """A statement executed during a profiled request.
+
+    Attributes:
+        statement (str): The SQL statement.
+        caller (str): The innermost call site (``file:line (function)``)
+            outside of SQLAlchemy and this library that executed the
+            statement.
+        engine (str): The URL of the engine (with the password masked).
+        duration (float): The time (in seconds) spent executing the
+            statement, or ``None`` if it failed.
+    """
+
+    __slots__ = ['statement', 'caller', 'engine', 'duration']
+
+    def __init__(self, statement: str, caller: str, engine: str) -> None:
+        self.statement = statement
+        self.caller = caller
+        self.engine = engine
+        self.duration: Optional[float] = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable snapshot of this statement."""
+        return {
+            'statement': self.statement,
+            'caller': self.caller,
+            'engine': self.engine,
+            'duration': self.duration,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f'{type(self).__name__}(statement={self.statement!r}, '
+            f'duration={self.duration})'
+        )
+
+
+class RequestProfile:
+    """The profile of a single request being recorded.
+
+    An instance of this class is stored as ``req.context.profile`` by the
+    middleware for profiled requests.
+
+    Attributes:
+        profiler (RequestProfiler): The profiler recording this profile.
+        method (str): The HTTP method of the request.
+        path (str): The path of the request.
+        statements (list): The :class:`ProfiledStatement` instances executed
+            by the request session (or connection), in the execution order.
+        wall_time (float): The elapsed time (in seconds) from setting up the
+            session until it was closed, or ``None`` if not finished yet.
+        report_path (str): The path of the written JSON report, or ``None``
+            if not written yet.
+    """
+
+    def __init__(self, profiler: RequestProfiler, req: Request) -> None:
+        self.profiler = profiler
+        self.method = req.method
+        self.path = req.path
+        self.statements: list[ProfiledStatement] = []
+        self.wall_time: Optional[float] = None
+        self.report_path: Optional[str] = None
+
+        self._profile: Optional[cProfile.Profile] = cProfile.Profile()
+        self._profiling = False
+        self._start = time.perf_counter()
+        self._statement_start = 0.0
+        self._connections: list[Connection] = []
+        self._session: Optional[Session] = None
+
+    @property
+    def db_time(self) -> float:
+        """The total time (in seconds) spent executing statements."""
+        return sum(item.duration or 0.0 for item in self.statements)
+
+    def _before_cursor_execute(
+        self,
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Optional[ExecutionContext],
+        executemany: bool,
+    ) -> None:
+        self.statements.append(
+            ProfiledStatement(
+                statement, _caller(), conn.engine.url.render_as_string()
+            )
+        )
+        self._statement_start = time.perf_counter()
+
+    def _after_cursor_execute(
+        self,
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Optional[ExecutionContext],
+        executemany: bool,
+    ) -> None:
+        elapsed = time.perf_counter() - self._statement_start
+        self.statements[-1].duration = elapsed
+
+    def _listen(self, connection: Connection) -> None:
+        event.listen(
+            connection, 'before_cursor_execute', self._before_cursor_execute
+        )
+        event.listen(
+            connection, 'after_cursor_execute', self._after_cursor_execute
+        )
+        self._connections.append(connection)
+
+    def _after_begin(
+        self,
+        session: Session,
+        transaction: SessionTransaction,
+        connection: Connection,
+    ) -> None:
+        self._listen(connection)
+
+    def _watch(self, resource: Union[Session, Connection]) -> None:
+        if isinstance(resource, Session):
+            self._session = resource
+            event.listen(resource, 'after_begin', self._after_begin)
+        else:
+            self._listen(resource)
+
+    def _unwatch(self) -> None:
+        if self._session is not None:
+            event.remove(self._session, 'after_begin', self._after_begin)
+            self._session = None
+
+        # NOTE(vytas): Connections are discarded upon closing the session,
+        #   but the same Connection might still be used elsewhere.
+        for connection in self._connections:
+            event.remove(
+                connection,
+                'before_cursor_execute',
+                self._before_cursor_execute,
+            )
+            event.remove(
+                connection,
+                'after_cursor_execute',
+                self._after_cursor_execute,
+            )
+        self._connections.clear()
+
+    def stop(self) -> None:
+        """Stop profiling Python code.
+
+        This method is called by the middleware once the responder has
+        returned. Statements (such as the final commit) are still recorded
+        until the request session (or connection) is closed.
+        """
+        if self._profiling:
+            self._profiling = False
+            self._profile.disable()  # type: ignore[union-attr]
+            self.profiler._release()
+
+    def functions(self, limit: int) -> list[dict[str, Any]]:
+        """Return the top ``limit`` functions by cumulative time."""
+        if self._profile is None:
+            return []
+
+        stats = pstats.Stats(self._profile).stats  # type: ignore[attr-defined]
+        items = sorted(
+            stats.items(), key=lambda item: item[1][3], reverse=True
+        )
+        return [
+            {
+                'function': f'{filename}:{line} ({name})',
+                'calls': calls,
+                'primitive_calls': primitive_calls,
+                'tottime': tottime,
+                'cumtime': cumtime,
+            }
+            for (filename, line, name), (
+                primitive_calls,
+                calls,
+                tottime,
+                cumtime,
+                _,
+            ) in items[:limit]
+        ]
+
+    def as_dict(self, limit: int = 40) -> dict[str, Any]:
+        """Return a JSON-serializable report combining the Python profile
+        with the statements executed by the request.
+
+        Statements are also aggregated by their call site, which makes it
+        easy to correlate the database time with the profiled functions.
+        """
+        callers: dict[str, dict[str, Any]] = {}
+        for item in self.statements:
+            summary = callers.setdefault(
+                item.caller, {'statements': 0, 'db_time': 0.0}
+            )
+            summary['statements'] += 1
+            summary['db_time'] += item.duration or 0.0
+
+        db_time = self.db_time
+        wall_time = self.wall_time
+        return {
+            'method': self.method,
+            'path': self.path,
+            'wall_time': wall_time,
+            'db_time': db_time,
+            'db_share': db_time / wall_time if wall_time else None,
+            'callers': dict(
+                sorted(
+                    callers.items(),
+                    key=lambda item: item[1]['db_time'],
+                    reverse=True,
+                )
+            ),
+            'statements': [item.as_dict() for item in self.statements],
+            'functions': self.functions(limit),
+        }
+
+
+class RequestProfiler:
+    """Profiles selected requests, and writes reports to a directory.
+
+    A request is profiled if it carries the trigger ``header`` whose value
+    matches ``token``, if it matches the ``rule``, or if it is randomly
+    sampled. The responder (along with any other middleware hooks executed
+    in between) is then run under :mod:`cProfile`, and the statements
+    executed by the request session (or connection) are recorded, including
+    the call site of each statement.
+
+    Upon closing the session, a JSON report is written to ``directory`` (see
+    also :meth:`RequestProfile.as_dict`), along with the raw profile data
+    (``.prof``) that can be inspected using :mod:`pstats` or visualization
+    tools.
+
+    Other requests are not affected in any way, i.e., no event listeners are
+    registered unless a request is being profiled.
+
+    Note:
+        Only one request is profiled at a time; requests selected while
+        another one is being profiled are served as usual.
+
+    Warning:
+        On Python 3.12+, :mod:`cProfile` profiles all threads of the
+        interpreter, which would also slow down requests served concurrently
+        by other threads. Therefore, Python code is only profiled if the
+        process runs a single thread (e.g., a single-threaded WSGI worker);
+        otherwise, only the statements of the request are recorded.
+
+    Args:
+        directory (str): The directory to write reports to. It is created if
+            it does not exist.
+        token (str): The secret value of the trigger header. If ``None``
+            (the default), requests cannot be profiled on demand.
+        header (str): The name of the trigger header. Defaults to
+            ``'X-Profile-Token'``.
+        sample_rate (float): The fraction of requests to profile at random.
+            Defaults to ``0.0``.
+        rule (callable): A callable that receives the Falcon request, and
+            returns ``True`` if it should be profiled. Defaults to ``None``.
+        limit (int): The number of top functions (by cumulative time) to
+            include in reports. Defaults to ``40``.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        token: Optional[str] = None,
+        header: str = 'X-Profile-Token',
+        sample_rate: float = 0.0,
+        rule: Optional[Callable[[Request], bool]] = None,
+        limit: int = 40,
+    ) -> None:
+        self.directory = directory
+        self.token = token
+        self.header = header
+        self.sample_rate = sample_rate
+        self.rule = rule
+        self.limit = limit
+
+        self._lock = threading.Lock()
+
+    def should_profile(self, req: Request) -> bool:
+        """Check whether the given request should be profiled."""
+        if self.token is not None:
+            value = req.get_header(self.header)
+            if value is not None and hmac.compare_digest(
+                value.encode(), self.token.encode()
+            ):
+                return True
+
+        if self.rule is not None and self.rule(req):
+            return True
+
+        return self.sample_rate > 0.0 and random.random() < self.sample_rate
+
+    def start(
+        self, req: Request, resource: Union[Session, Connection]
+    ) -> Optional[RequestProfile]:
+        """Start profiling a request using the given session (or connection).
+
+        Returns ``None`` if another request is already being profiled.
+        """
+        if not self._lock.acquire(blocking=False):
+            return None
+
+        profile = RequestProfile(self, req)
+        if _INTERPRETER_WIDE and threading.active_count() > 1:
+            # NOTE(vytas): On Python 3.12+, cProfile is implemented using
+            #   sys.monitoring, which would also profile (and slow down) the
+            #   requests served by other threads.
+            warnings.warn(
+                'Python code cannot be profiled per thread on Python 3.12+, '
+                'only statements are recorded in multithreaded servers',
+                RuntimeWarning,
+            )
+            profile._profile = None
+            self._release()
+        else:
+            try:
+                profile._profile.enable()  # type: ignore[union-attr]
+            except ValueError:
+                # NOTE(vytas): Another profiler is already active (Python
+                #   3.12+ only allows one at a time); only record statements.
+                profile._profile = None
+                self._release()
+            else:
+                profile._profiling = True
+
+        profile._watch(resource)
+        return profile
+
+    def _release(self) -> None:
+        self._lock.release()
+
+    def finish(self, profile: RequestProfile, resp: Response) -> str:
+        """Finish the given profile, and write its report.
+
+        Returns the path of the JSON report.
+        """
+        profile.stop()
+        profile._unwatch()
+        profile.wall_time = time.perf_counter() - profile._start
+
+        os.makedirs(self.directory, exist_ok=True)
+        name = '{}-{}-{}'.format(
+            time.strftime('%Y%m%dT%H%M%S'),
+            profile.method.lower(),
+            uuid.uuid4().hex[:8],
+        )
+        base = os.path.join(self.directory, name)
+
+        report = profile.as_dict(self.limit)
+        report['status'] = resp.status_code
+        if profile._profile is not None:
+            profile._profile.dump_stats(base + '.prof')
+            report['profile'] = base + '.prof'
+
+        with open(base + '.json', 'w') as fp:
+            json.dump(report, fp, indent=2)
+
+        profile.report_path = base + '.json'
+        return profile.report_path
@@ -0,0 +1,95 @@
+#  Copyright 2020-2025 Vytautas Liuolia
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""Autocommit & read-only transaction support for safe requests."""
+
+from __future__ import annotations
+
+import threading
+from typing import Any
+
+from sqlalchemy import Connection
+from sqlalchemy import event
+from sqlalchemy.pool import ConnectionPoolEntry
+
+from .constants import ReadOnlyMode
+
+__all__ = ['READ_ONLY_EXECUTION_OPTIONS', 'READ_ONLY_STATEMENTS']
+
+MODE_OPTION = 'falcon_sqla_read_only_mode'
+"""A custom execution option marking connections prepared by this module."""
+
+READ_ONLY_EXECUTION_OPTIONS: dict[str, dict[str, Any]] = {
+    'postgresql': {'postgresql_readonly': True},
+}
+"""Execution options that start a read-only transaction, keyed by dialect."""
+
+READ_ONLY_STATEMENTS: dict[str, str] = {
+    'mariadb': 'SET TRANSACTION READ ONLY',
+    'mysql': 'SET TRANSACTION READ ONLY',
+    'sqlite': 'PRAGMA query_only = ON',
+}
+"""Statements issued upon beginning a read-only transaction, keyed by dialect.
+
+Dialects that can start read-only transactions using execution options (see
+:data:`READ_ONLY_EXECUTION_OPTIONS`) should not be listed here.
+"""
+
+_QUERY_ONLY_KEY = 'falcon_sqla.query_only'
+_reset_lock = threading.Lock()
+
+
+def execution_options(mode: ReadOnlyMode, dialect_name: str) -> dict[str, Any]:
+    """Return connection execution options implementing ``mode``."""
+    if mode is ReadOnlyMode.AUTOCOMMIT:
+        return {'isolation_level': 'AUTOCOMMIT', MODE_OPTION: mode}
+    return {
+        **READ_ONLY_EXECUTION_OPTIONS.get(dialect_name, {}),
+        MODE_OPTION: mode,
+    }
+
+
+def _reset_query_only(
+    dbapi_connection: Any, connection_record: ConnectionPoolEntry
+) -> None:
+    query_only = connection_record.info.pop(_QUERY_ONLY_KEY, False)
+    if query_only and dbapi_connection is not None:
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute('PRAGMA query_only = OFF')
+        finally:
+            cursor.close()
+
+
+def begin_read_only(connection: Connection) -> None:
+    """Make the transaction that has just begun on ``connection`` read-only.
+
+    Only issues statements listed in :data:`READ_ONLY_STATEMENTS`, if any.
+    """
+    dialect_name = connection.dialect.name
+    statement = READ_ONLY_STATEMENTS.get(dialect_name)
+    if statement is None:
+        return
+
+    connection.exec_driver_sql(statement)
+
+    # NOTE(vytas): Unlike transaction characteristics, PRAGMA query_only
+    #   persists on the SQLite connection, so it is reset upon checkin.
+    if dialect_name == 'sqlite':
+        connection.info[_QUERY_ONLY_KEY] = True
+
+        pool = connection.engine.pool
+        with _reset_lock:
+            if not event.contains(pool, 'checkin', _reset_query_only):
+                event.listen(pool, 'checkin', _reset_query_only)
@@ -0,0 +1,159 @@
+#  Copyright 2020-2025 Vytautas Liuolia
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""Transient database error classification and retry statistics."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+import random
+from typing import Any, Callable
+
+from sqlalchemy.exc import DBAPIError
+
+__all__ = ['RetryStats', 'TRANSIENT_ERROR_CLASSIFIERS', 'is_transient_error']
+
+POSTGRESQL_TRANSIENT_SQLSTATES = frozenset(
+    [
+        '40001',  # serialization_failure
+        '40P01',  # deadlock_detected
+        '55P03',  # lock_not_available
+        '57P01',  # admin_shutdown
+        '57P02',  # crash_shutdown
+        '57P03',  # cannot_connect_now
+        '08000',  # connection_exception
+        '08001',  # sqlclient_unable_to_establish_sqlconnection
+        '08003',  # connection_does_not_exist
+        '08004',  # sqlserver_rejected_establishment_of_sqlconnection
+        '08006',  # connection_failure
+    ]
+)
+
+MYSQL_TRANSIENT_ERRORS = frozenset(
+    [
+        1040,  # ER_CON_COUNT_ERROR
+        1205,  # ER_LOCK_WAIT_TIMEOUT
+        1213,  # ER_LOCK_DEADLOCK
+        2002,  # CR_CONNECTION_ERROR
+        2003,  # CR_CONN_HOST_ERROR
+        2006,  # CR_SERVER_GONE_ERROR
+        2013,  # CR_SERVER_LOST
+    ]
+)
+
+
+def _is_transient_postgresql(orig: Any) -> bool:
+    # NOTE(vytas): psycopg2 exposes pgcode, while psycopg (3) uses sqlstate.
+    code = getattr(orig, 'pgcode', None) or getattr(orig, 'sqlstate', None)
+    if code:
+        return code in POSTGRESQL_TRANSIENT_SQLSTATES
+    return 'could not connect to server' in str(orig)
+
+
+def _is_transient_mysql(orig: Any) -> bool:
+    args: tuple[Any, ...] = getattr(orig, 'args', ())
+    return bool(args) and args[0] in MYSQL_TRANSIENT_ERRORS
+
+
+def _is_transient_sqlite(orig: Any) -> bool:
+    message = str(orig)
+    return 'database is locked' in message or 'table is locked' in message
+
+
+TRANSIENT_ERROR_CLASSIFIERS: dict[str, Callable[[Any], bool]] = {
+    'mariadb': _is_transient_mysql,
+    'mysql': _is_transient_mysql,
+    'postgresql': _is_transient_postgresql,
+    'sqlite': _is_transient_sqlite,
+}
+"""Transient error classifiers keyed by SQLAlchemy dialect name.
+
+Each classifier is called with the original DBAPI exception (i.e.,
+``DBAPIError.orig``), and should return ``True`` if the error is transient.
+New dialects can be supported by adding classifiers to this dictionary.
+"""
+
+
+def is_transient_error(
+    error: BaseException,
+    dialect_names: Iterable[str] = tuple(TRANSIENT_ERROR_CLASSIFIERS),
+) -> bool:
+    """Check whether the given exception is likely transient.
+
+    An error is considered transient if SQLAlchemy has determined that the
+    connection was invalidated (e.g., the database server went away during a
+    failover), or if a classifier of any of the specified dialects recognizes
+    the underlying DBAPI error as transient (such as a deadlock, serialization
+    failure, or a locked SQLite database).
+
+    Args:
+        error (BaseException): The exception to check.
+        dialect_names: Names of dialects whose classifiers to consult.
+            Defaults to all dialects in :data:`TRANSIENT_ERROR_CLASSIFIERS`.
+    """
+    if not isinstance(error, DBAPIError):
+        return False
+    if error.connection_invalidated:
+        return True
+
+    for name in dialect_names:
+        classifier = TRANSIENT_ERROR_CLASSIFIERS.get(name)
+        if classifier and classifier(error.orig):
+            return True
+    return False
+
+
+def backoff_delay(attempt: int, base: float) -> float:
+    """Return a randomized exponential backoff delay ("full jitter")."""
+    return random.uniform(0, base * 2**attempt)
+
+
+class RetryStats:
+    """Statistics of retrying units of work on transient errors.
+
+    Attributes:
+        retries (int): Total number of retry attempts.
+        recovered (int): Number of operations that succeeded after being
+            retried at least once (i.e., errors that were spared).
+        exhausted (int): Number of operations that failed with a transient
+            error even after all retry attempts.
+        backoff (float): Total time spent sleeping between attempts (in
+            seconds).
+
+    The counters are updated under the retry lock of the owning
+    :class:`~falcon_sqla.Manager`.
+    """
+
+    __slots__ = ['retries', 'recovered', 'exhausted', 'backoff']
+
+    def __init__(self) -> None:
+        self.retries = 0
+        self.recovered = 0
+        self.exhausted = 0
+        self.backoff = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable snapshot of these statistics."""
+        return {
+            'retries': self.retries,
+            'recovered': self.recovered,
+            'exhausted': self.exhausted,
+            'backoff': self.backoff,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f'{type(self).__name__}(retries={self.retries}, '
+            f'recovered={self.recovered}, exhausted={self.exhausted})'
+        )
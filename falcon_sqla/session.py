@@ -14,12 +14,16 @@
 
 from __future__ import annotations
 
+from collections.abc import Mapping
+import time
 from typing import Any, Callable, Optional, Union
 
 from sqlalchemy import Connection
 from sqlalchemy import Engine
 import sqlalchemy.orm
 
+from . import tracing
+
 
 class RequestSession(sqlalchemy.orm.Session):
     """
@@ -33,6 +37,15 @@ class RequestSession(sqlalchemy.orm.Session):
         self._manager_get_bind: Optional[
             Callable[..., Union[Engine, Connection]]
         ] = kwargs.pop('_manager_get_bind', None)
+        self._manager_connection_options: Optional[
+            Callable[..., Optional[dict[str, Any]]]
+        ] = kwargs.pop('_manager_connection_options', None)
+        self._manager_on_checkout: Optional[Callable[[Engine, int], None]] = (
+            kwargs.pop('_manager_on_checkout', None)
+        )
+        self._last_bind: Optional[Union[Engine, Connection]] = None
+        self._excluded_binds: set[Union[Engine, Connection]] = set()
+        self._retrying_unit = False
         super().__init__(*args, **kwargs)
 
     def get_bind(
@@ -48,7 +61,91 @@ class RequestSession(sqlalchemy.orm.Session):
         This method is called by SQLAlchemy.
         """
         if self._manager_get_bind:
-            return self._manager_get_bind(
+            bind = self._manager_get_bind(
                 session=self, mapper=mapper, clause=clause, **self.info
             )
+            self._last_bind = bind
+            return bind
         return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+    def _connection_for_bind(
+        self,
+        engine: Any,
+        execution_options: Optional[Mapping[str, Any]] = None,
+        **kw: Any,
+    ) -> Connection:
+        transaction = self._transaction
+        if transaction is not None and engine in transaction._connections:
+            return super()._connection_for_bind(
+                engine, execution_options, **kw
+            )
+
+        # NOTE(vytas): Let the manager supply execution options (such as the
+        #   isolation level) for connections that are about to be procured.
+        if self._manager_connection_options:
+            options = self._manager_connection_options(
+                session=self, bind=engine, **self.info
+            )
+            if options:
+                execution_options = {**options, **(execution_options or {})}
+
+        trace = tracing.current_trace()
+        on_checkout = self._manager_on_checkout
+        if trace is None and on_checkout is None:
+            return super()._connection_for_bind(
+                engine, execution_options, **kw
+            )
+
+        start = time.perf_counter_ns()
+        if trace is None:
+            connection = super()._connection_for_bind(
+                engine, execution_options, **kw
+            )
+        else:
+            with trace.span('checkout', **trace.engine_attributes(engine)):
+                connection = super()._connection_for_bind(
+                    engine, execution_options, **kw
+                )
+
+        if on_checkout is not None:
+            on_checkout(engine, time.perf_counter_ns() - start)
+        return connection
+
+    def release(self) -> None:
+        """
+        Release this session's connections back to the pool.
+
+        The current transaction (if any) is committed, however, unlike
+        :meth:`~sqlalchemy.orm.Session.commit`, loaded instances are not
+        expired, so they can still be used without reloading them from the
+        database. The next statement will begin a new transaction, using a
+        connection obtained anew (possibly from another engine).
+
+        This method is useful in long-running handlers that have finished
+        their database work, e.g., in order to release the connection after
+        the writes have been committed, but before calling external services
+        or rendering a large response.
+        """
+        if not self.in_transaction():
+            return
+
+        expire_on_commit = self.expire_on_commit
+        self.expire_on_commit = False
+        try:
+            self.commit()
+        finally:
+            self.expire_on_commit = expire_on_commit
+
+    def reset_request_state(self) -> None:
+        """
+        Reset any per-request state in order to reuse this session.
+
+        This method is called by the manager when recycling a closed session,
+        see also :attr:`~falcon_sqla.manager.SessionOptions.recycle_sessions`.
+        Subclasses storing additional per-request state should override this
+        method, and call ``super().reset_request_state()``.
+        """
+        self.info.clear()
+        self._last_bind = None
+        self._excluded_binds.clear()
+        self._retrying_unit = False
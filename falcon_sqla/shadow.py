@@ -0,0 +1,288 @@
+#  Copyright 2020-2025 Vytautas Liuolia
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""Mirroring of sampled reads to a shadow engine."""
+
+from __future__ import annotations
+
+import queue
+import random
+import threading
+import time
+from typing import Any, Optional
+
+from sqlalchemy import Connection
+from sqlalchemy import Engine
+from sqlalchemy import event
+from sqlalchemy.engine import ExecutionContext
+from sqlalchemy.orm import ORMExecuteState
+
+from .util import EngineListeners
+
+__all__ = ['SAMPLE_OPTION', 'ShadowMirror', 'ShadowStats']
+
+SAMPLE_OPTION = 'falcon_sqla_shadow'
+"""The execution option marking sampled statements."""
+
+_START_KEY = 'falcon_sqla.shadow_start'
+
+
+class ShadowStats:
+    """Comparison of a primary engine against the shadow engine.
+
+    Attributes:
+        mirrored (int): Number of reads (served by the primary engine in
+            question) that have been re-executed on the shadow engine.
+        dropped (int): Number of sampled reads that were dropped because the
+            queue of pending reads was full.
+        errors (int): Number of mirrored reads that failed on the shadow
+            engine.
+        primary_time (float): Total execution time (in seconds) of the
+            successfully mirrored reads on the primary engine.
+        shadow_time (float): Total execution time (in seconds) of the same
+            reads on the shadow engine.
+    """
+
+    __slots__ = [
+        'mirrored',
+        'dropped',
+        'errors',
+        'primary_time',
+        'shadow_time',
+    ]
+
+    def __init__(self) -> None:
+        self.mirrored = 0
+        self.dropped = 0
+        self.errors = 0
+        self.primary_time = 0.0
+        self.shadow_time = 0.0
+
+    @property
+    def slowdown(self) -> Optional[float]:
+        """How many times slower the shadow engine is (or ``None``).
+
+        A value below ``1.0`` means that the shadow engine is faster.
+        """
+        if not self.primary_time:
+            return None
+        return self.shadow_time / self.primary_time
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable snapshot of these statistics."""
+        return {
+            'mirrored': self.mirrored,
+            'dropped': self.dropped,
+            'errors': self.errors,
+            'primary_time': self.primary_time,
+            'shadow_time': self.shadow_time,
+            'slowdown': self.slowdown,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f'{type(self).__name__}(mirrored={self.mirrored}, '
+            f'dropped={self.dropped}, errors={self.errors})'
+        )
+
+
+class _Sample:
+    __slots__ = ['statement', 'parameters', 'shadow_time']
+
+    def __init__(self, statement: Any, parameters: Any) -> None:
+        self.statement = statement
+        self.parameters = parameters
+        self.shadow_time = 0.0
+
+
+def _before_cursor_execute(
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Optional[ExecutionContext],
+    executemany: bool,
+) -> None:
+    if SAMPLE_OPTION in getattr(context, 'execution_options', ()):
+        conn.info[_START_KEY] = time.perf_counter()
+
+
+def _after_shadow_execute(
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Optional[ExecutionContext],
+    executemany: bool,
+) -> None:
+    sample = getattr(context, 'execution_options', {}).get(SAMPLE_OPTION)
+    if sample is not None:
+        sample.shadow_time += time.perf_counter() - conn.info.pop(_START_KEY)
+
+
+class ShadowMirror:
+    """Re-executes a sample of reads on a shadow engine in the background.
+
+    Sampled statements are tagged with the :data:`SAMPLE_OPTION` execution
+    option. Once such a statement has been executed on one of the attached
+    (primary) engines, it is queued for re-execution on the shadow engine by
+    a background worker thread, which discards the results, and compares the
+    execution times of the statement (as measured around the cursor
+    execution) on both engines. All statistics are updated under a lock.
+    Should the queue be full, the sample is
+    dropped, so the request path never waits on the shadow engine.
+
+    An instance of this class is created by
+    :meth:`Manager.enable_shadow_traffic()
+    <falcon_sqla.Manager.enable_shadow_traffic>`.
+
+    Args:
+        engine (Engine): The shadow engine.
+        sample_rate (float): The fraction of reads to mirror. Defaults to
+            ``0.01``.
+        max_pending (int): The maximum number of reads waiting to be
+            mirrored. Defaults to ``1000``.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        sample_rate: float = 0.01,
+        max_pending: int = 1000,
+    ) -> None:
+        self.engine = engine
+        self.sample_rate = sample_rate
+
+        self._queue: queue.Queue[Optional[tuple[Engine, _Sample, float]]] = (
+            queue.Queue(max_pending)
+        )
+        self._stats: dict[Engine, ShadowStats] = {}
+        self._listeners = EngineListeners()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+        # NOTE(vytas): Time mirrored statements using the same cursor events
+        #   as on the primary engines, so that connecting to the shadow
+        #   engine, and fetching the results, are not taken into account.
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_shadow_execute)
+
+    @property
+    def stats(self) -> dict[Engine, ShadowStats]:
+        """Shadow statistics keyed by primary engine."""
+        return self._stats
+
+    def sample(self, orm_execute_state: ORMExecuteState) -> bool:
+        """Decide whether to mirror the given statement, and tag it if so."""
+        if random.random() >= self.sample_rate:
+            return False
+
+        sample = _Sample(
+            orm_execute_state.statement, orm_execute_state.parameters
+        )
+        orm_execute_state.update_execution_options(**{SAMPLE_OPTION: sample})
+        return True
+
+    def attach(self, engine: Engine) -> None:
+        """Start mirroring sampled statements executed on the given engine."""
+        if engine in self._stats:
+            return
+
+        stats = self._stats[engine] = ShadowStats()
+
+        def after_cursor_execute(
+            conn: Connection,
+            cursor: Any,
+            statement: str,
+            parameters: Any,
+            context: Optional[ExecutionContext],
+            executemany: bool,
+        ) -> None:
+            sample = getattr(context, 'execution_options', {}).get(
+                SAMPLE_OPTION
+            )
+            if sample is None:
+                return
+
+            latency = time.perf_counter() - conn.info.pop(_START_KEY)
+            try:
+                self._queue.put_nowait((engine, sample, latency))
+            except queue.Full:
+                with self._lock:
+                    stats.dropped += 1
+                return
+            self._start()
+
+        self._listeners.listen(
+            engine, engine, 'before_cursor_execute', _before_cursor_execute
+        )
+        self._listeners.listen(
+            engine, engine, 'after_cursor_execute', after_cursor_execute
+        )
+
+    def detach(self, engine: Engine) -> None:
+        """Stop mirroring statements executed on the given engine."""
+        self._listeners.remove(engine)
+        self._stats.pop(engine, None)
+
+    def _start(self) -> None:
+        # NOTE(vytas): This is only called for sampled statements, so the
+        #   lock is not worth avoiding.
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._work, name='falcon-sqla-shadow', daemon=True
+                )
+                self._thread.start()
+
+    def _work(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            engine, sample, primary_time = item
+            stats = self._stats.get(engine)
+            if stats is None:
+                # NOTE(vytas): The engine has been removed in the meantime.
+                continue
+            try:
+                with self.engine.connect() as conn:
+                    conn.execute(
+                        sample.statement,
+                        sample.parameters,
+                        execution_options={SAMPLE_OPTION: sample},
+                    ).close()
+            except Exception:
+                with self._lock:
+                    stats.errors += 1
+                continue
+
+            with self._lock:
+                stats.mirrored += 1
+                stats.primary_time += primary_time
+                stats.shadow_time += sample.shadow_time
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Stop the background worker after mirroring the pending reads.
+
+        Args:
+            timeout (float): How long to wait for the worker (in seconds).
+                Defaults to ``None`` (wait until the queue is drained).
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
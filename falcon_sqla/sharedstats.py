@@ -0,0 +1,386 @@
+#  Copyright 2020-2025 Vytautas Liuolia
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""Statistics shared among worker processes via a memory-mapped file."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+import contextlib
+import functools
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Any, Optional, TYPE_CHECKING
+import warnings
+import weakref
+
+from sqlalchemy import Engine
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.engine import ExecutionContext
+
+from .util import EngineListeners
+
+if TYPE_CHECKING:
+    from falcon import Request
+    from falcon import Response
+
+__all__ = ['COUNTERS', 'SharedStats', 'SharedStatsResource']
+
+COUNTERS = (
+    'selections',
+    'checkouts',
+    'checkout_time',
+    'statements',
+    'db_time',
+    'errors',
+)
+"""The counters recorded per worker and engine.
+
+* ``selections``: the number of times the engine was chosen by the manager
+  (see also :meth:`Manager.get_bind() <falcon_sqla.Manager.get_bind>`).
+* ``checkouts``: the number of connections procured by request sessions and
+  connections.
+* ``checkout_time``: the time (in nanoseconds) spent procuring connections,
+  including waiting for the pool.
+* ``statements``: the number of executed statements.
+* ``db_time``: the time (in nanoseconds) spent executing statements.
+* ``errors``: the number of failed statements.
+"""
+
+SELECTIONS, CHECKOUTS, CHECKOUT_TIME, STATEMENTS, DB_TIME, ERRORS = range(
+    len(COUNTERS)
+)
+
+_MAGIC = b'FSQS'
+_VERSION = 1
+_HEADER = struct.Struct('<4sIII')
+_HEADER_SIZE = 64
+_NAME_SIZE = 256
+_START_KEY = 'falcon_sqla.shared_stats_start'
+
+
+class SharedStats:
+    """Per-worker & per-engine counters in a shared memory-mapped file.
+
+    Every process (e.g., a Gunicorn worker) opening the same ``path`` claims
+    a worker slot in the file, and only ever writes to its own slot; reading
+    the aggregated view from any process thus needs neither IPC nor locks.
+    The file has a fixed layout:
+
+    * a header (the magic number, the layout version, and the dimensions),
+    * a table of engine names,
+    * a table of worker PIDs,
+    * and ``max_workers * max_engines`` slots of :data:`COUNTERS` (unsigned
+      64-bit integers each).
+
+    Engines are identified across processes by their URL (with the password
+    masked) and the order of engines with the same URL, so all workers should
+    add their engines in the same order. Claiming worker slots and engine
+    names is serialized using an advisory file lock.
+
+    Recording counters takes no locks at all, since it happens on the hot
+    path of every statement. Counters are thus best-effort: should two
+    threads of the same process increment the same counter at exactly the
+    same time, one of the increments might occasionally be lost.
+
+    The slots of exited workers are reused by new workers, and the counters
+    are never reset, i.e., they accumulate over the lifetime of the file.
+    Remove the file (before starting the workers) in order to start afresh.
+
+    Note:
+        This class is only supported on POSIX platforms.
+
+    Args:
+        path (str): The path of the file (created if it does not exist).
+        max_workers (int): The maximum number of worker processes.
+            Defaults to ``64``.
+        max_engines (int): The maximum number of engines. Defaults to ``16``.
+    """
+
+    def __init__(
+        self, path: str, max_workers: int = 64, max_engines: int = 16
+    ) -> None:
+        self.path = path
+        self.max_workers = max_workers
+        self.max_engines = max_engines
+
+        self._names_offset = _HEADER_SIZE
+        self._workers_offset = self._names_offset + max_engines * _NAME_SIZE
+        self._slots_offset = self._workers_offset + max_workers * 8
+        size = self._slots_offset + (
+            max_workers * max_engines * len(COUNTERS) * 8
+        )
+
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        with self._file_lock():
+            if os.fstat(self._fd).st_size == 0:
+                os.ftruncate(self._fd, size)
+                os.pwrite(
+                    self._fd,
+                    _HEADER.pack(_MAGIC, _VERSION, max_workers, max_engines),
+                    0,
+                )
+            header = os.pread(self._fd, _HEADER.size, 0)
+
+        if os.fstat(self._fd).st_size != size or header != _HEADER.pack(
+            _MAGIC, _VERSION, max_workers, max_engines
+        ):
+            os.close(self._fd)
+            raise ValueError(
+                f'{path} does not match the layout of max_workers='
+                f'{max_workers} and max_engines={max_engines}'
+            )
+
+        self._mmap = mmap.mmap(self._fd, size)
+        self._counters = memoryview(self._mmap).cast('Q')
+        self._lock = threading.Lock()
+        self._engines: dict[Engine, Optional[int]] = {}
+        self._listeners = EngineListeners()
+        self._base: Optional[int] = None
+        self._claim_worker()
+
+        os.register_at_fork(
+            after_in_child=functools.partial(_after_fork, weakref.ref(self))
+        )
+
+    @contextlib.contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        # NOTE(vytas): fcntl is only available on POSIX platforms.
+        import fcntl
+
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _pid_offset(self, worker: int) -> int:
+        return self._workers_offset // 8 + worker
+
+    def _claim_worker(self) -> None:
+        """Claim a vacant worker slot (or the slot of an exited worker)."""
+        pid = os.getpid()
+        self._base = None
+
+        with self._file_lock():
+            for worker in range(self.max_workers):
+                other = self._counters[self._pid_offset(worker)]
+                if other == 0 or other == pid or not _is_alive(other):
+                    self._counters[self._pid_offset(worker)] = pid
+                    self._base = (
+                        self._slots_offset // 8
+                        + worker * self.max_engines * len(COUNTERS)
+                    )
+                    break
+
+        if self._base is None:
+            warnings.warn(
+                f'all {self.max_workers} worker slots of {self.path} are '
+                f'taken, statistics of process {pid} are not recorded',
+                RuntimeWarning,
+            )
+
+    def _raw_name(self, index: int) -> bytes:
+        start = self._names_offset + index * _NAME_SIZE
+        return self._mmap[start : start + _NAME_SIZE].rstrip(b'\0')
+
+    def _name(self, index: int) -> str:
+        return self._raw_name(index).decode(errors='replace')
+
+    def _register(self, engine: Engine) -> Optional[int]:
+        url = engine.url.render_as_string()
+        occurrence = sum(
+            1 for other in self._engines if other.url.render_as_string() == url
+        )
+        name = f'{url}#{occurrence}'
+        encoded = name.encode()[:_NAME_SIZE]
+
+        with self._file_lock():
+            for index in range(self.max_engines):
+                # NOTE(vytas): Compare the stored (possibly truncated) name.
+                existing = self._raw_name(index)
+                if existing == encoded:
+                    return index
+                if not existing:
+                    start = self._names_offset + index * _NAME_SIZE
+                    self._mmap[start : start + len(encoded)] = encoded
+                    return index
+
+        warnings.warn(
+            f'all {self.max_engines} engine slots of {self.path} are taken, '
+            f'statistics of {name} are not recorded',
+            RuntimeWarning,
+        )
+        return None
+
+    def record(self, engine: Engine, counter: int, value: int = 1) -> None:
+        """Add ``value`` to the given counter of ``engine`` (best-effort)."""
+        index = self._engines.get(engine)
+        base = self._base
+        if index is None or base is None:
+            return
+
+        # NOTE(vytas): This is not atomic, see the class docstring.
+        self._counters[base + index * len(COUNTERS) + counter] += value
+
+    def attach(self, engine: Engine) -> None:
+        """Start recording the statements executed on the given engine."""
+        if engine in self._engines:
+            return
+        self._engines[engine] = self._register(engine)
+
+        def before_cursor_execute(
+            conn: Any,
+            cursor: Any,
+            statement: str,
+            parameters: Any,
+            context: Optional[ExecutionContext],
+            executemany: bool,
+        ) -> None:
+            conn.info[_START_KEY] = time.perf_counter_ns()
+
+        def after_cursor_execute(
+            conn: Any,
+            cursor: Any,
+            statement: str,
+            parameters: Any,
+            context: Optional[ExecutionContext],
+            executemany: bool,
+        ) -> None:
+            end = time.perf_counter_ns()
+            self.record(engine, STATEMENTS)
+            self.record(engine, DB_TIME, end - conn.info.pop(_START_KEY, end))
+
+        def handle_error(context: ExceptionContext) -> None:
+            connection = context.connection
+            if connection is not None:
+                connection.info.pop(_START_KEY, None)
+            self.record(engine, ERRORS)
+
+        self._listeners.listen(
+            engine, engine, 'before_cursor_execute', before_cursor_execute
+        )
+        self._listeners.listen(
+            engine, engine, 'after_cursor_execute', after_cursor_execute
+        )
+        self._listeners.listen(engine, engine, 'handle_error', handle_error)
+
+    def detach(self, engine: Engine) -> None:
+        """Stop recording the statements executed on the given engine."""
+        self._listeners.remove(engine)
+        self._engines.pop(engine, None)
+
+    def record_checkout(self, engine: Engine, elapsed: int) -> None:
+        """Record procuring a connection that took ``elapsed`` nanoseconds."""
+        self.record(engine, CHECKOUTS)
+        self.record(engine, CHECKOUT_TIME, elapsed)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Read the counters of all workers.
+
+        Returns a JSON-serializable dictionary with the ``engines`` key
+        mapping engine names to their :data:`COUNTERS` aggregated across all
+        workers (including exited ones), and the ``workers`` key mapping the
+        PIDs of live workers to their counters per engine.
+        """
+        counters = self._counters
+        width = len(COUNTERS)
+        names = {
+            index: name
+            for index, name in (
+                (index, self._name(index)) for index in range(self.max_engines)
+            )
+            if name
+        }
+
+        engines = {name: dict.fromkeys(COUNTERS, 0) for name in names.values()}
+        workers: dict[int, dict[str, dict[str, int]]] = {}
+        for worker in range(self.max_workers):
+            pid = counters[self._pid_offset(worker)]
+            if pid == 0:
+                continue
+
+            base = self._slots_offset // 8 + worker * self.max_engines * width
+            per_engine = {}
+            for index, name in names.items():
+                start = base + index * width
+                values = dict(zip(COUNTERS, counters[start : start + width]))
+                for key, value in values.items():
+                    engines[name][key] += value
+                per_engine[name] = values
+
+            if _is_alive(pid):
+                workers[pid] = per_engine
+
+        return {'engines': engines, 'workers': workers}
+
+    def close(self) -> None:
+        """Release the worker slot, and unmap the file.
+
+        The counters recorded by this process are retained.
+        """
+        if self._mmap.closed:
+            return
+
+        with self._lock:
+            if self._base is not None:
+                worker = (self._base - self._slots_offset // 8) // (
+                    self.max_engines * len(COUNTERS)
+                )
+                self._counters[self._pid_offset(worker)] = 0
+                self._base = None
+
+        self._counters.release()
+        self._mmap.close()
+        os.close(self._fd)
+
+
+def _after_fork(ref: weakref.ref[SharedStats]) -> None:
+    # NOTE(vytas): A forked worker must claim a worker slot of its own.
+    stats = ref()
+    if stats is not None and not stats._mmap.closed:
+        stats._lock = threading.Lock()
+        stats._claim_worker()
+
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except OSError as ex:
+        # NOTE(vytas): EPERM means that the process exists, but belongs to
+        #   another user.
+        return not isinstance(ex, ProcessLookupError)
+    return True
+
+
+class SharedStatsResource:
+    """A Falcon resource serving the aggregated view of :class:`SharedStats`.
+
+    For instance::
+
+        app.add_route('/metrics/db', SharedStatsResource(stats))
+
+    Args:
+        stats (SharedStats): The shared statistics to serve.
+    """
+
+    def __init__(self, stats: SharedStats) -> None:
+        self._stats = stats
+
+    def on_get(self, req: Request, resp: Response) -> None:
+        """Serve :meth:`SharedStats.snapshot` as JSON."""
+        resp.media = self._stats.snapshot()
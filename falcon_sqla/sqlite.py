@@ -0,0 +1,148 @@
+#  Copyright 2020-2025 Vytautas Liuolia
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""Engine factories for running on SQLite in production."""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Optional, Union
+import urllib.parse
+
+from sqlalchemy import create_engine
+from sqlalchemy import Engine
+from sqlalchemy import event
+from sqlalchemy.engine import URL
+from sqlalchemy.pool import ConnectionPoolEntry
+from sqlalchemy.pool import QueuePool
+
+__all__ = [
+    'PRAGMAS',
+    'WRITER_PRAGMAS',
+    'create_reader_engine',
+    'create_writer_engine',
+    'set_pragmas',
+]
+
+PRAGMAS: dict[str, Any] = {
+    'busy_timeout': 5000,
+    'cache_size': -16384,
+    'mmap_size': 268435456,
+    'synchronous': 'NORMAL',
+}
+"""Pragmas applied to every connection by default.
+
+* ``busy_timeout``: wait up to 5 seconds for locks held by other processes
+  instead of failing with ``database is locked`` right away.
+* ``cache_size``: use up to 16 MiB of page cache per connection.
+* ``mmap_size``: memory-map up to 256 MiB of the database file.
+* ``synchronous``: ``NORMAL`` is durable enough in WAL mode, and avoids
+  syncing the WAL on every commit.
+"""
+
+WRITER_PRAGMAS: dict[str, Any] = {
+    'journal_mode': 'WAL',
+}
+"""Pragmas applied to writer connections on top of :data:`PRAGMAS`."""
+
+
+def _merge_pragmas(
+    *defaults: dict[str, Any], overrides: Optional[dict[str, Any]]
+) -> dict[str, Any]:
+    pragmas: dict[str, Any] = {}
+    for item in defaults + (overrides or {},):
+        pragmas.update(item)
+    return {
+        name: value for name, value in pragmas.items() if value is not None
+    }
+
+
+def set_pragmas(engine: Engine, pragmas: dict[str, Any]) -> None:
+    """Issue ``PRAGMA <name> = <value>`` upon every new connection."""
+
+    def on_connect(
+        dbapi_connection: Any, connection_record: ConnectionPoolEntry
+    ) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name} = {value}')
+        finally:
+            cursor.close()
+
+    event.listen(engine, 'connect', on_connect)
+
+
+def create_writer_engine(
+    path: Union[str, os.PathLike[str]],
+    pragmas: Optional[dict[str, Any]] = None,
+    **kwargs: Any,
+) -> Engine:
+    """Create an engine for writing to the SQLite database at ``path``.
+
+    The database is switched to WAL mode, which lets readers proceed
+    concurrently with the writer. Since SQLite only allows one writer at a
+    time anyway, the engine's pool is limited to a single connection, so that
+    writers in this process queue up in the pool instead of retrying on
+    ``database is locked`` errors.
+
+    Args:
+        path (str): Path to the database file.
+        pragmas (dict, optional): Pragmas to apply on top of
+            :data:`PRAGMAS` and :data:`WRITER_PRAGMAS`. A value of ``None``
+            disables the respective default pragma.
+        **kwargs: Additional arguments for ``create_engine()``, for
+            instance, ``pool_timeout`` (the maximum time in seconds to wait
+            for the writer connection; defaults to ``30``).
+    """
+    kwargs.setdefault('poolclass', QueuePool)
+    kwargs.setdefault('pool_size', 1)
+    kwargs.setdefault('max_overflow', 0)
+    engine = create_engine(
+        URL.create('sqlite', database=os.fspath(path)), **kwargs
+    )
+    set_pragmas(
+        engine, _merge_pragmas(PRAGMAS, WRITER_PRAGMAS, overrides=pragmas)
+    )
+    return engine
+
+
+def create_reader_engine(
+    path: Union[str, os.PathLike[str]],
+    pragmas: Optional[dict[str, Any]] = None,
+    **kwargs: Any,
+) -> Engine:
+    """Create a read-only engine for the SQLite database at ``path``.
+
+    The database is opened in the read-only mode (``mode=ro``), and any
+    attempt to write fails with ``attempt to write a readonly database``.
+
+    Note:
+        The database must already exist (e.g., created by connecting to a
+        writer engine created with :func:`create_writer_engine`).
+
+    Args:
+        path (str): Path to the database file.
+        pragmas (dict, optional): Pragmas to apply on top of
+            :data:`PRAGMAS`. A value of ``None`` disables the respective
+            default pragma.
+        **kwargs: Additional arguments for ``create_engine()``.
+    """
+    database = 'file:' + urllib.parse.quote(os.path.abspath(path))
+    url = URL.create(
+        'sqlite', database=database, query={'mode': 'ro', 'uri': 'true'}
+    )
+    engine = create_engine(url, **kwargs)
+    set_pragmas(engine, _merge_pragmas(PRAGMAS, overrides=pragmas))
+    return engine
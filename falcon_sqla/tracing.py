@@ -0,0 +1,408 @@
+#  Copyright 2020-2025 Vytautas Liuolia
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Per-request tracing of database activity."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+import contextlib
+import contextvars
+import json
+import queue
+import random
+import threading
+import time
+from typing import Any, Callable, Optional, Union
+
+from sqlalchemy import Connection
+from sqlalchemy import Engine
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.engine import ExecutionContext
+
+from .constants import EngineRole
+from .util import EngineListeners
+
+__all__ = ['JSONLinesExporter', 'Span', 'Trace', 'Tracer', 'current_trace']
+
+_START_KEY = 'falcon_sqla.trace_start'
+
+_current: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar(
+    'falcon_sqla_trace', default=None
+)
+
+
+def current_trace() -> Optional[Trace]:
+    """Return the trace being recorded in the current context (if any)."""
+    return _current.get()
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Record a span of the current trace (if any) around a block of code."""
+    trace = _current.get()
+    if trace is None:
+        yield None
+        return
+
+    with trace.span(name, **attributes) as current:
+        yield current
+
+
+class Span:
+    """A timed operation within a :class:`Trace`.
+
+    Attributes:
+        name (str): The name of the operation, e.g., ``'statement'``.
+        span_id (str): A random 64-bit identifier (in hex).
+        parent_id (str): The identifier of the parent span, or ``None`` for
+            the root span.
+        start_time (int): The start time in nanoseconds since the epoch.
+        end_time (int): The end time in nanoseconds since the epoch, or
+            ``None`` if the span has not ended yet.
+        attributes (dict): Key-value attributes of the span.
+        error (str): The error message if the operation failed, or ``None``.
+    """
+
+    __slots__ = [
+        'name',
+        'span_id',
+        'parent_id',
+        'start_time',
+        'end_time',
+        'attributes',
+        'error',
+    ]
+
+    def __init__(
+        self,
+        name: str,
+        parent_id: Optional[str],
+        attributes: dict[str, Any],
+        start_time: Optional[int] = None,
+    ) -> None:
+        self.name = name
+        self.span_id = f'{random.getrandbits(64):016x}'
+        self.parent_id = parent_id
+        self.start_time = time.time_ns() if start_time is None else start_time
+        self.end_time: Optional[int] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    @property
+    def duration(self) -> Optional[float]:
+        """The duration of the span in seconds (or ``None`` if not ended)."""
+        if self.end_time is None:
+            return None
+        return (self.end_time - self.start_time) / 1e9
+
+    def as_dict(self, trace_id: str) -> dict[str, Any]:
+        """Return a JSON-serializable representation of this span.
+
+        The keys follow the naming of OpenTelemetry's JSON encoding of spans.
+        """
+        return {
+            'traceId': trace_id,
+            'spanId': self.span_id,
+            'parentSpanId': self.parent_id,
+            'name': self.name,
+            'startTimeUnixNano': self.start_time,
+            'endTimeUnixNano': self.end_time,
+            'attributes': self.attributes,
+            'status': (
+                {'code': 'ERROR', 'message': self.error}
+                if self.error is not None
+                else {'code': 'OK'}
+            ),
+        }
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self.name!r}, {self.span_id})'
+
+
+class Trace:
+    """A tree of spans recorded for a single request.
+
+    Spans are nested under the innermost span that is still open; see also
+    :meth:`span`.
+
+    Attributes:
+        trace_id (str): A random 128-bit identifier (in hex).
+        spans (list): All spans recorded so far, in the order of their start.
+        tracer (Tracer): The tracer that started this trace.
+    """
+
+    __slots__ = ['trace_id', 'spans', 'tracer', '_stack', '_token']
+
+    def __init__(self, tracer: Tracer) -> None:
+        self.trace_id = f'{random.getrandbits(128):032x}'
+        self.spans: list[Span] = []
+        self.tracer = tracer
+        self._stack: list[Span] = []
+        self._token: Optional[contextvars.Token[Optional[Trace]]] = None
+
+    def start_span(self, name: str, **attributes: Any) -> Span:
+        """Start a new span nested under the current one."""
+        parent_id = self._stack[-1].span_id if self._stack else None
+        current = Span(name, parent_id, attributes)
+        self.spans.append(current)
+        self._stack.append(current)
+        return current
+
+    def end_span(self, current: Span, error: Optional[str] = None) -> None:
+        """End the given open span (and any spans still open inside it)."""
+        end_time = time.time_ns()
+        index = self._stack.index(current)
+        for item in self._stack[index:]:
+            item.end_time = end_time
+        del self._stack[index:]
+        current.error = error
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        """Record a span around a block of code."""
+        current = self.start_span(name, **attributes)
+        try:
+            yield current
+        except Exception as ex:
+            self.end_span(current, str(ex))
+            raise
+        self.end_span(current)
+
+    def add_span(
+        self,
+        name: str,
+        start_time: int,
+        error: Optional[str] = None,
+        **attributes: Any,
+    ) -> Span:
+        """Add a span that has already ended, nested under the current one."""
+        parent_id = self._stack[-1].span_id if self._stack else None
+        current = Span(name, parent_id, attributes, start_time)
+        current.end_time = time.time_ns()
+        current.error = error
+        self.spans.append(current)
+        return current
+
+    def engine_attributes(
+        self, bind: Union[Engine, Connection]
+    ) -> dict[str, Any]:
+        """Describe the given engine (or connection) as span attributes."""
+        return self.tracer.engine_attributes(bind)
+
+    def as_dicts(self) -> list[dict[str, Any]]:
+        """Return JSON-serializable representations of all spans."""
+        return [item.as_dict(self.trace_id) for item in self.spans]
+
+
+class Tracer:
+    """Records request traces, and hands the finished ones to a sink.
+
+    A trace is started by the middleware for a random sample of requests. It
+    contains a root span for the request itself, a ``session`` span covering
+    the lifetime of the request session, and nested ``checkout`` (procuring a
+    connection for the session), ``statement``, and ``commit`` spans.
+
+    Note:
+        Statements are attributed to the trace of the current context (see
+        also :func:`current_trace`), i.e., statements executed in other
+        threads (such as the manager's executor) are not traced.
+
+    Args:
+        sink (callable): A callable that receives each finished
+            :class:`Trace`, e.g., an instance of :class:`JSONLinesExporter`.
+            The sink is called synchronously upon finishing the request,
+            hence it should not block.
+        sample_rate (float): The fraction of requests to trace. Defaults to
+            ``1.0``.
+        engine_role (callable): A callable returning the
+            :class:`~falcon_sqla.EngineRole` of a given engine (or ``None``).
+    """
+
+    def __init__(
+        self,
+        sink: Callable[[Trace], Any],
+        sample_rate: float = 1.0,
+        engine_role: Optional[Callable[[Engine], Optional[EngineRole]]] = None,
+    ) -> None:
+        self.sink = sink
+        self.sample_rate = sample_rate
+        self._engine_role = engine_role
+        self._listeners = EngineListeners()
+
+    def attach(self, engine: Engine) -> None:
+        """Start recording statements executed on the given engine."""
+        if engine in self._listeners:
+            return
+
+        def before_cursor_execute(
+            conn: Any,
+            cursor: Any,
+            statement: str,
+            parameters: Any,
+            context: Optional[ExecutionContext],
+            executemany: bool,
+        ) -> None:
+            if _current.get() is not None:
+                conn.info[_START_KEY] = time.time_ns()
+
+        def after_cursor_execute(
+            conn: Any,
+            cursor: Any,
+            statement: str,
+            parameters: Any,
+            context: Optional[ExecutionContext],
+            executemany: bool,
+        ) -> None:
+            self._record_statement(conn, statement)
+
+        def handle_error(context: ExceptionContext) -> None:
+            connection = context.connection
+            if connection is not None and context.statement is not None:
+                self._record_statement(
+                    connection,
+                    context.statement,
+                    str(context.original_exception),
+                )
+
+        self._listeners.listen(
+            engine, engine, 'before_cursor_execute', before_cursor_execute
+        )
+        self._listeners.listen(
+            engine, engine, 'after_cursor_execute', after_cursor_execute
+        )
+        self._listeners.listen(engine, engine, 'handle_error', handle_error)
+
+    def detach(self, engine: Engine) -> None:
+        """Stop recording statements executed on the given engine."""
+        self._listeners.remove(engine)
+
+    def _record_statement(
+        self, conn: Any, statement: str, error: Optional[str] = None
+    ) -> None:
+        start_time = conn.info.pop(_START_KEY, None)
+        trace = _current.get()
+        if trace is None or start_time is None:
+            return
+
+        trace.add_span(
+            'statement',
+            start_time,
+            error,
+            **self.engine_attributes(conn.engine),
+            **{'db.statement': statement},
+        )
+
+    def engine_attributes(
+        self, bind: Union[Engine, Connection]
+    ) -> dict[str, Any]:
+        """Describe the given engine (or connection) as span attributes."""
+        engine = bind.engine
+        role = self._engine_role(engine) if self._engine_role else None
+        return {
+            'db.system': engine.dialect.name,
+            'falcon_sqla.engine': engine.url.render_as_string(),
+            'falcon_sqla.engine_id': id(engine),
+            'falcon_sqla.engine_role': role.name if role else None,
+        }
+
+    def start_trace(self, name: str, **attributes: Any) -> Optional[Trace]:
+        """Start a trace (unless the request is not sampled).
+
+        The trace becomes current in this context, and its root span is
+        started with the given ``name`` and ``attributes``. The trace must be
+        finished (using :meth:`finish_trace`) in the same context.
+
+        If the request is not sampled, no trace is current in this context.
+        """
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            _current.set(None)
+            return None
+
+        trace = Trace(self)
+        trace.start_span(name, **attributes)
+        trace._token = _current.set(trace)
+        return trace
+
+    def finish_trace(self, trace: Trace, **attributes: Any) -> None:
+        """End the trace, add ``attributes`` to its root, and export it."""
+        root = trace.spans[0]
+        root.attributes.update(attributes)
+        trace.end_span(root)
+        if trace._token is not None:
+            token, trace._token = trace._token, None
+            _current.reset(token)
+        self.sink(trace)
+
+
+class JSONLinesExporter:
+    """Appends finished traces to a file as JSON lines, one span per line.
+
+    Each line is an object produced by :meth:`Span.as_dict`. Traces are
+    queued, and written by a background thread, so exporting never blocks the
+    request. Should the queue fill up, new traces are dropped instead.
+
+    Args:
+        path (str): The path of the file to append to.
+        max_queue_size (int): The maximum number of traces awaiting export.
+            Defaults to ``1024``.
+
+    Attributes:
+        dropped (int): The number of traces dropped due to a full queue.
+    """
+
+    _STOP = object()
+
+    def __init__(self, path: str, max_queue_size: int = 1024) -> None:
+        self.path = path
+        self.dropped = 0
+        self._queue: queue.Queue[Any] = queue.Queue(max_queue_size)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def __call__(self, trace: Trace) -> None:
+        """Queue a finished trace for export."""
+        if self._thread is None:
+            self._start()
+
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='falcon-sqla-tracing', daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        with open(self.path, 'a', encoding='utf-8') as output:
+            while True:
+                item = self._queue.get()
+                if item is self._STOP:
+                    break
+                for data in item.as_dicts():
+                    output.write(json.dumps(data, default=str) + '\n')
+                output.flush()
+
+    def close(self) -> None:
+        """Write out the queued traces, and stop the background thread."""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            self._queue.put(self._STOP)
+            thread.join()
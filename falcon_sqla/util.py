@@ -14,11 +14,15 @@
 
 from __future__ import annotations
 
+from collections.abc import AsyncIterator
+from collections.abc import Awaitable
 from collections.abc import Iterable
 from collections.abc import Iterator
-from typing import Callable, cast, Union
+from typing import Any, Callable, cast, Union
 
 from falcon.typing import ReadableIO
+from sqlalchemy import Engine
+from sqlalchemy import event
 
 
 class ClosingStreamWrapper:
@@ -29,6 +33,9 @@ class ClosingStreamWrapper:
 
     If the provided response stream is file-like, i.e., it has a ``read``
     attribute, that attribute is copied to the wrapped instance too.
+    Likewise, if the stream has a ``fileno`` attribute, it is also copied in
+    order to let the WSGI server's ``wsgi.file_wrapper`` serve the underlying
+    file using zero-copy mechanisms such as ``sendfile()``.
 
     Args:
         stream (object): Readable file-like stream object.
@@ -48,6 +55,10 @@ class ClosingStreamWrapper:
         if read:
             self.read = read
 
+        fileno = getattr(stream, 'fileno', None)
+        if fileno:
+            self.fileno = fileno
+
     def __iter__(self) -> Iterator[bytes]:
         return cast('Iterator[bytes]', self._stream)
 
@@ -58,3 +69,72 @@ class ClosingStreamWrapper:
             close_stream = getattr(self._stream, 'close', None)
             if close_stream:
                 close_stream()
+
+
+class AsyncClosingStreamWrapper:
+    """Async iterator that wraps an ASGI response stream with close().
+
+    This class is the ASGI counterpart of :class:`ClosingStreamWrapper`: the
+    provided coroutine function is awaited when the application server closes
+    the stream after the response has finished streaming.
+
+    If the provided response stream is an async file-like object, i.e., it has
+    a ``read`` attribute, that attribute is copied to the wrapped instance too.
+
+    Args:
+        stream (object): Async iterable or async file-like stream object.
+        close (callable): A coroutine function that is awaited before the
+            stream is closed.
+    """
+
+    def __init__(
+        self, stream: Any, close: Callable[[], Awaitable[None]]
+    ) -> None:
+        self._stream = stream
+        self._close = close
+
+        read = getattr(stream, 'read', None)
+        if read:
+            self.read = read
+
+    def __aiter__(self) -> AsyncIterator[bytes]:
+        return cast('AsyncIterator[bytes]', self._stream.__aiter__())
+
+    async def close(self) -> None:
+        try:
+            await self._close()
+        finally:
+            close_stream = getattr(self._stream, 'close', None)
+            if close_stream:
+                await close_stream()
+
+
+class EngineListeners:
+    """Event listeners registered on behalf of engines.
+
+    This class keeps track of the listeners that the manager's monitors
+    register for each engine, so that they can be removed once the engine is
+    removed from the manager.
+    """
+
+    def __init__(self) -> None:
+        self._listeners: dict[Engine, list[tuple[Any, str, Any]]] = {}
+
+    def __contains__(self, engine: Engine) -> bool:
+        return engine in self._listeners
+
+    def listen(
+        self,
+        engine: Engine,
+        target: Any,
+        identifier: str,
+        fn: Callable[..., Any],
+    ) -> None:
+        """Register a listener (on ``target``) on behalf of ``engine``."""
+        event.listen(target, identifier, fn)
+        self._listeners.setdefault(engine, []).append((target, identifier, fn))
+
+    def remove(self, engine: Engine) -> None:
+        """Remove all listeners registered on behalf of ``engine``."""
+        for target, identifier, fn in self._listeners.pop(engine, ()):
+            event.remove(target, identifier, fn)
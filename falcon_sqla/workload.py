@@ -0,0 +1,573 @@
+#  Copyright 2020-2025 Vytautas Liuolia
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""Capture and offline replay of SQL workloads.
+
+A captured workload can be replayed using the command line tool::
+
+    $ python -m falcon_sqla.workload workload.jsonl --write URL [--read URL]
+          [--speed SPEED] [--concurrency N] [--pool-size N] [--commit]
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections.abc import Iterable
+from collections.abc import Sequence
+import concurrent.futures
+import contextvars
+import json
+import queue
+import random
+import statistics
+import threading
+import time
+from typing import Any, Callable, Optional, TYPE_CHECKING
+
+from sqlalchemy import Connection
+from sqlalchemy import create_engine
+from sqlalchemy import Engine
+from sqlalchemy.engine import ExecutionContext
+
+from .constants import EngineRole
+from .util import EngineListeners
+
+if TYPE_CHECKING:
+    from falcon import Request
+
+__all__ = [
+    'CapturedRequest',
+    'ReplayStats',
+    'WorkloadRecorder',
+    'main',
+    'read_workload',
+    'replay',
+]
+
+_START_KEY = 'falcon_sqla.workload_start'
+
+_current: contextvars.ContextVar[Optional[CapturedRequest]] = (
+    contextvars.ContextVar('falcon_sqla_workload', default=None)
+)
+
+
+def _redact(parameters: Any, executemany: bool) -> Any:
+    """Replace parameter values with ``None``, retaining their shape."""
+    if executemany:
+        return [_redact(item, False) for item in parameters]
+    if isinstance(parameters, dict):
+        return dict.fromkeys(parameters)
+    return [None] * len(parameters)
+
+
+def _driver_parameters(parameters: Any, executemany: bool) -> Any:
+    """Restore DBAPI parameters that were serialized as JSON arrays."""
+    if executemany:
+        return [_driver_parameters(item, False) for item in parameters]
+    return tuple(parameters) if isinstance(parameters, list) else parameters
+
+
+class CapturedRequest:
+    """The statements executed during a single captured request.
+
+    An instance of this class is stored as ``req.context.workload`` by the
+    middleware for captured requests.
+
+    Attributes:
+        method (str): The HTTP method of the request.
+        path (str): The path of the request.
+        start (float): The start time of the request (seconds since the
+            epoch).
+        duration (float): The elapsed time (in seconds) from setting up the
+            session until it was closed, or ``None`` if not finished yet.
+        statements (list): The executed statements, in the execution order.
+            Each statement is a list of ``[offset, duration, role, statement,
+            parameters, executemany]``, where ``offset`` is the time (in
+            seconds) since the start of the request, ``role`` is the value of
+            the :class:`~falcon_sqla.EngineRole` of the engine (if known),
+            and ``parameters`` are the DBAPI parameters.
+    """
+
+    __slots__ = [
+        'method',
+        'path',
+        'start',
+        'duration',
+        'statements',
+        '_ref',
+        '_token',
+    ]
+
+    def __init__(
+        self, method: str, path: str, start: Optional[float] = None
+    ) -> None:
+        self.method = method
+        self.path = path
+        self.start = time.time() if start is None else start
+        self.duration: Optional[float] = None
+        self.statements: list[list[Any]] = []
+        self._ref = time.perf_counter()
+        self._token: Optional[contextvars.Token[Optional[CapturedRequest]]] = (
+            None
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> CapturedRequest:
+        """Load a request from a dictionary created by :meth:`as_dict`."""
+        captured = cls(data['method'], data['path'], data['start'])
+        captured.duration = data['duration']
+        captured.statements = data['statements']
+        return captured
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable representation of this request."""
+        return {
+            'method': self.method,
+            'path': self.path,
+            'start': self.start,
+            'duration': self.duration,
+            'statements': self.statements,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f'{type(self).__name__}(method={self.method!r}, '
+            f'path={self.path!r}, statements={len(self.statements)})'
+        )
+
+
+class WorkloadRecorder:
+    """Captures the statements executed by requests to a file.
+
+    The statements executed on the attached engines while serving a
+    captured request, along with their parameters, the role of the engine,
+    and timing, are appended to ``path`` as a single JSON line per request
+    (see also :meth:`CapturedRequest.as_dict`). The file can be replayed
+    using :func:`replay` (or the command line tool of this module).
+
+    Captured requests are queued, and written by a background thread, so
+    capturing never blocks the request. Should the queue fill up, new
+    requests are dropped instead.
+
+    An instance of this class is created by
+    :meth:`Manager.enable_workload_capture()
+    <falcon_sqla.Manager.enable_workload_capture>`.
+
+    Note:
+        Parameter values that are not JSON-serializable (e.g., dates) are
+        recorded as strings.
+
+    Args:
+        path (str): The path of the file to append to.
+        redact (bool): Whether to replace all parameter values with
+            ``None`` (retaining the number of parameters). Defaults to
+            ``False``.
+        sample_rate (float): The fraction of requests to capture. Defaults to
+            ``1.0``.
+        max_queue_size (int): The maximum number of requests awaiting
+            writing. Defaults to ``1024``.
+        engine_role (callable): A callable returning the
+            :class:`~falcon_sqla.EngineRole` of a given engine (or ``None``).
+
+    Attributes:
+        dropped (int): The number of requests dropped due to a full queue.
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        path: str,
+        redact: bool = False,
+        sample_rate: float = 1.0,
+        max_queue_size: int = 1024,
+        engine_role: Optional[Callable[[Engine], Optional[EngineRole]]] = None,
+    ) -> None:
+        self.path = path
+        self.redact = redact
+        self.sample_rate = sample_rate
+        self.dropped = 0
+        self._engine_role = engine_role
+        self._listeners = EngineListeners()
+        self._queue: queue.Queue[Any] = queue.Queue(max_queue_size)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def attach(self, engine: Engine) -> None:
+        """Start capturing statements executed on the given engine."""
+        if engine in self._listeners:
+            return
+
+        def before_cursor_execute(
+            conn: Connection,
+            cursor: Any,
+            statement: str,
+            parameters: Any,
+            context: Optional[ExecutionContext],
+            executemany: bool,
+        ) -> None:
+            if _current.get() is not None:
+                conn.info[_START_KEY] = time.perf_counter()
+
+        def after_cursor_execute(
+            conn: Connection,
+            cursor: Any,
+            statement: str,
+            parameters: Any,
+            context: Optional[ExecutionContext],
+            executemany: bool,
+        ) -> None:
+            start = conn.info.pop(_START_KEY, None)
+            captured = _current.get()
+            if captured is None or start is None:
+                return
+
+            role = self._engine_role(engine) if self._engine_role else None
+            if self.redact:
+                parameters = _redact(parameters, executemany)
+            captured.statements.append(
+                [
+                    start - captured._ref,
+                    time.perf_counter() - start,
+                    role.value if role else None,
+                    statement,
+                    parameters,
+                    executemany,
+                ]
+            )
+
+        self._listeners.listen(
+            engine, engine, 'before_cursor_execute', before_cursor_execute
+        )
+        self._listeners.listen(
+            engine, engine, 'after_cursor_execute', after_cursor_execute
+        )
+
+    def detach(self, engine: Engine) -> None:
+        """Stop capturing statements executed on the given engine."""
+        self._listeners.remove(engine)
+
+    def start(self, req: Request) -> Optional[CapturedRequest]:
+        """Start capturing a request (unless it is not sampled).
+
+        The captured request becomes current in this context, and it must be
+        finished (using :meth:`finish`) in the same context.
+
+        If the request is not sampled, no request is captured in this
+        context.
+        """
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            _current.set(None)
+            return None
+
+        captured = CapturedRequest(req.method, req.path)
+        captured._token = _current.set(captured)
+        return captured
+
+    def finish(self, captured: CapturedRequest) -> None:
+        """Stop capturing the given request, and queue it for writing."""
+        captured.duration = time.perf_counter() - captured._ref
+        if captured._token is not None:
+            token, captured._token = captured._token, None
+            _current.reset(token)
+
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(captured)
+        except queue.Full:
+            self.dropped += 1
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='falcon-sqla-workload', daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        with open(self.path, 'a', encoding='utf-8') as output:
+            while True:
+                item = self._queue.get()
+                if item is self._STOP:
+                    break
+                output.write(
+                    json.dumps(
+                        item.as_dict(), default=str, separators=(',', ':')
+                    )
+                    + '\n'
+                )
+                output.flush()
+
+    def close(self) -> None:
+        """Write out the queued requests, and stop the background thread."""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            self._queue.put(self._STOP)
+            thread.join()
+
+
+def read_workload(path: str) -> list[CapturedRequest]:
+    """Read a captured workload, ordered by the start time of requests."""
+    with open(path, encoding='utf-8') as source:
+        requests = [
+            CapturedRequest.from_dict(json.loads(line))
+            for line in source
+            if line.strip()
+        ]
+    requests.sort(key=lambda captured: captured.start)
+    return requests
+
+
+class ReplayStats:
+    """Statistics of a replayed workload.
+
+    Attributes:
+        requests (int): Number of replayed requests.
+        statements (int): Number of successfully executed statements.
+        errors (int): Number of failed requests. The remaining statements of
+            a failed request are skipped.
+        elapsed (float): The duration (in seconds) of the replay.
+        original_db_time (float): The total execution time (in seconds) of
+            the replayed statements when they were captured.
+        db_time (float): The total execution time (in seconds) of the
+            replayed statements.
+        latencies (list): The durations (in seconds) of the replayed
+            requests.
+    """
+
+    __slots__ = [
+        'requests',
+        'statements',
+        'errors',
+        'elapsed',
+        'original_db_time',
+        'db_time',
+        'latencies',
+    ]
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.statements = 0
+        self.errors = 0
+        self.elapsed = 0.0
+        self.original_db_time = 0.0
+        self.db_time = 0.0
+        self.latencies: list[float] = []
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable summary of these statistics."""
+        summary: dict[str, Any] = {
+            'requests': self.requests,
+            'statements': self.statements,
+            'errors': self.errors,
+            'elapsed': self.elapsed,
+            'throughput_rps': (
+                self.requests / self.elapsed if self.elapsed else None
+            ),
+            'original_db_time': self.original_db_time,
+            'db_time': self.db_time,
+            'p50': None,
+            'p99': None,
+        }
+        if len(self.latencies) >= 2:
+            percentiles = statistics.quantiles(self.latencies, n=100)
+            summary.update(p50=percentiles[49], p99=percentiles[98])
+        return summary
+
+    def __repr__(self) -> str:
+        return (
+            f'{type(self).__name__}(requests={self.requests}, '
+            f'statements={self.statements}, errors={self.errors})'
+        )
+
+
+def _replay_request(
+    captured: CapturedRequest,
+    read_engines: Sequence[Engine],
+    write_engines: Sequence[Engine],
+    commit: bool,
+    stats: ReplayStats,
+    lock: threading.Lock,
+) -> None:
+    connections: dict[bool, Connection] = {}
+    statements = 0
+    original_db_time = db_time = 0.0
+    failed = False
+    start = time.perf_counter()
+
+    try:
+        for (
+            _,
+            duration,
+            role,
+            statement,
+            parameters,
+            executemany,
+        ) in captured.statements:
+            read = role == EngineRole.READ.value and bool(read_engines)
+            conn = connections.get(read)
+            if conn is None:
+                engine = random.choice(read_engines if read else write_engines)
+                conn = connections[read] = engine.connect()
+
+            executed = time.perf_counter()
+            conn.exec_driver_sql(
+                statement, _driver_parameters(parameters, executemany)
+            )
+            db_time += time.perf_counter() - executed
+            original_db_time += duration
+            statements += 1
+    except Exception:
+        failed = True
+    finally:
+        for conn in connections.values():
+            if commit and not failed:
+                conn.commit()
+            conn.close()
+
+    latency = time.perf_counter() - start
+    with lock:
+        stats.requests += 1
+        stats.statements += statements
+        stats.errors += failed
+        stats.original_db_time += original_db_time
+        stats.db_time += db_time
+        stats.latencies.append(latency)
+
+
+def replay(
+    requests: Iterable[CapturedRequest],
+    write_engines: Sequence[Engine],
+    read_engines: Sequence[Engine] = (),
+    speed: float = 1.0,
+    concurrency: int = 8,
+    commit: bool = False,
+) -> ReplayStats:
+    """Re-execute a captured workload against the given engines.
+
+    The statements of each request are executed in order, using one
+    connection per engine role. Statements captured on
+    :attr:`~falcon_sqla.EngineRole.READ` engines are executed on a randomly
+    chosen engine of ``read_engines`` (if any), and the rest on one of
+    ``write_engines``. Requests are replayed concurrently, starting at their
+    original pace (scaled by ``speed``).
+
+    Warning:
+        Unless ``commit`` is set, the transactions of replayed requests are
+        rolled back. Nevertheless, statements are executed as captured, so
+        any other side effects are not reverted.
+
+    Args:
+        requests: The requests to replay, ordered by their start time (see
+            also :func:`read_workload`).
+        write_engines: The engines to replay writes on.
+        read_engines: The engines to replay reads on. Defaults to ``()``
+            (``write_engines`` are used for all statements).
+        speed (float): How many times faster than originally to start the
+            requests. ``0.0`` replays the requests as fast as possible.
+            Defaults to ``1.0``.
+        concurrency (int): The maximum number of requests being replayed at
+            once. Defaults to ``8``.
+        commit (bool): Whether to commit the transactions of successfully
+            replayed requests. Defaults to ``False``.
+    """
+    stats = ReplayStats()
+    lock = threading.Lock()
+    origin: Optional[float] = None
+    start = time.perf_counter()
+
+    with concurrent.futures.ThreadPoolExecutor(concurrency) as executor:
+        for captured in requests:
+            if origin is None:
+                origin = captured.start
+            if speed > 0.0:
+                due = start + (captured.start - origin) / speed
+                time.sleep(max(due - time.perf_counter(), 0.0))
+
+            executor.submit(
+                _replay_request,
+                captured,
+                read_engines,
+                write_engines,
+                commit,
+                stats,
+                lock,
+            )
+
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Replay a captured workload, and print a JSON summary."""
+    parser = argparse.ArgumentParser(
+        prog='python -m falcon_sqla.workload',
+        description='Replay a captured SQL workload.',
+    )
+    parser.add_argument('path', help='the captured workload file')
+    parser.add_argument(
+        '--write',
+        action='append',
+        required=True,
+        metavar='URL',
+        help='an engine URL to replay writes on (repeatable)',
+    )
+    parser.add_argument(
+        '--read',
+        action='append',
+        default=[],
+        metavar='URL',
+        help='an engine URL to replay reads on (repeatable)',
+    )
+    parser.add_argument(
+        '--speed',
+        type=float,
+        default=1.0,
+        help='the pace relative to the original one (0 = unthrottled)',
+    )
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument(
+        '--pool-size', type=int, help='the pool size of each engine'
+    )
+    parser.add_argument(
+        '--commit',
+        action='store_true',
+        help='commit replayed transactions instead of rolling them back',
+    )
+    args = parser.parse_args(argv)
+
+    options = {} if args.pool_size is None else {'pool_size': args.pool_size}
+    write_engines = [create_engine(url, **options) for url in args.write]
+    read_engines = [create_engine(url, **options) for url in args.read]
+
+    stats = replay(
+        read_workload(args.path),
+        write_engines,
+        read_engines,
+        speed=args.speed,
+        concurrency=args.concurrency,
+        commit=args.commit,
+    )
+    for engine in write_engines + read_engines:
+        engine.dispose()
+
+    print(json.dumps(stats.as_dict(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+import asyncio
+import os
+import threading
+import time
+
+import falcon
+import falcon.asgi
+import falcon.testing
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import StaticPool
+
+from falcon_sqla import Manager
+from falcon_sqla.asgi import DatabaseContext
+from falcon_sqla.asgi import default_max_workers
+from falcon_sqla.asgi import Middleware
+
+
+class Languages:
+    def __init__(self, db):
+        self.db = db
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def _list(self, session):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.active, self.max_active)
+        time.sleep(0.01)
+        with self.lock:
+            self.active -= 1
+
+        stmt = select(self.db.Language.name).order_by(self.db.Language.id)
+        return session.execute(stmt).scalars().all()
+
+    async def on_get(self, req, resp):
+        if req.get_param_as_bool('lazy'):
+            resp.media = {'session': req.context.db.session is not None}
+            return
+
+        first, second = await asyncio.gather(
+            req.context.db.run(self._list), req.context.db.run(self._list)
+        )
+        assert first == second
+        resp.media = {
+            'names': first,
+            'request_id': getattr(req.context, 'request_id', None),
+        }
+
+    async def on_post(self, req, resp):
+        def add(session, name):
+            session.add(self.db.Language(name=name))
+
+        media = await req.get_media()
+        await req.context.db.run(add, media['name'])
+        if media.get('fail'):
+            raise falcon.HTTPBadRequest()
+
+        resp.status = falcon.HTTP_CREATED
+
+    async def on_options(self, req, resp):
+        resp.media = {'db': req.context.db}
+
+    async def on_get_stream(self, req, resp):
+        async def stream():
+            yield b'['
+            names = await req.context.db.run(self._list)
+            yield ','.join(names).encode()
+            yield b']'
+
+        resp.stream = stream()
+
+
+class AsyncFile:
+    def __init__(self, data):
+        self.data = data
+        self.closed = False
+
+    async def read(self, size=-1):
+        data, self.data = self.data, b''
+        return data
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def manager(database):
+    # NOTE: The test read-only engine uses a custom SQLite creator whose
+    #   connections cannot be shared across threads.
+    return Manager(database.write_engine)
+
+
+@pytest.fixture
+def resource(database):
+    return Languages(database)
+
+
+@pytest.fixture
+def client(database, manager, resource):
+    app = falcon.asgi.App(middleware=[manager.asgi_middleware])
+    app.add_route('/languages', resource)
+    app.add_route('/stream', resource, suffix='stream')
+    return falcon.testing.TestClient(app)
+
+
+def count_languages(database):
+    with Session(database.write_engine) as session:
+        return len(session.execute(select(database.Language)).all())
+
+
+def test_run(client, database, resource):
+    resp = client.simulate_post('/languages', json={'name': 'Python'})
+    assert resp.status_code == 201
+
+    resp = client.simulate_get('/languages')
+    assert resp.status_code == 200
+    assert resp.json == {'names': ['Python'], 'request_id': None}
+
+    # NOTE: Work items of the same request are never run concurrently.
+    assert resource.max_active == 1
+
+    assert database.write_engine.pool.checkedout() == 0
+
+
+def test_rollback_on_failure(client, database):
+    resp = client.simulate_post(
+        '/languages', json={'name': 'Python', 'fail': True}
+    )
+    assert resp.status_code == 400
+    assert count_languages(database) == 0
+
+
+def test_lazy_session(client):
+    resp = client.simulate_get('/languages', params={'lazy': True})
+    assert resp.json == {'session': False}
+
+
+def test_no_session_methods(client):
+    resp = client.simulate_options('/languages')
+    assert resp.json == {'db': None}
+
+
+def test_sticky_binds(client, manager):
+    manager.session_options.sticky_binds = True
+    manager.session_options.request_id_func = lambda: 'req-1'
+
+    resp = client.simulate_get('/languages')
+    assert resp.json['request_id'] == 'req-1'
+
+
+@pytest.mark.parametrize('wrap', [True, False])
+def test_stream(client, database, manager, wrap):
+    manager.session_options.wrap_response_stream = wrap
+    client.simulate_post('/languages', json={'name': 'Python'})
+    client.simulate_post('/languages', json={'name': 'Rust'})
+
+    resp = client.simulate_get('/stream')
+    assert resp.status_code == 200
+    assert resp.text == '[Python,Rust]'
+
+
+def test_async_file_stream(database, manager):
+    stream = AsyncFile(b'data')
+
+    class Resource:
+        async def on_get(self, req, resp):
+            await req.context.db.run(lambda session: None)
+            resp.stream = stream
+
+    app = falcon.asgi.App(middleware=[manager.asgi_middleware])
+    app.add_route('/file', Resource())
+
+    resp = falcon.testing.TestClient(app).simulate_get('/file')
+    assert resp.text == 'data'
+    assert stream.closed
+
+
+def test_cancelled_run(database, manager):
+    executor = Middleware(manager, max_workers=2)._get_executor()
+    finished = threading.Event()
+
+    def slow(session):
+        time.sleep(0.05)
+        finished.set()
+
+    async def main():
+        req = falcon.testing.create_asgi_req()
+        db = DatabaseContext(manager, req, falcon.asgi.Response(), executor)
+
+        task = asyncio.create_task(db.run(slow))
+        await asyncio.sleep(0.01)
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert finished.is_set()
+
+        await db.close(True)
+        assert db.session is None
+
+    asyncio.run(main())
+
+
+def test_shutdown(manager):
+    middleware = Middleware(manager)
+    executor = middleware._get_executor()
+    assert middleware._get_executor() is executor
+
+    asyncio.run(middleware.process_shutdown({}, {}))
+    with pytest.raises(RuntimeError):
+        executor.submit(print)
+
+    # NOTE: Shutting down again is a no-op.
+    asyncio.run(middleware.process_shutdown({}, {}))
+    assert middleware._get_executor() is not executor
+
+
+@pytest.mark.parametrize(
+    'pools,expected',
+    [
+        ([{'pool_size': 5, 'max_overflow': 10}], 15),
+        (
+            [
+                {'pool_size': 5, 'max_overflow': 10},
+                {'pool_size': 2, 'max_overflow': 1},
+            ],
+            3,
+        ),
+        (
+            [
+                {'pool_size': 4, 'max_overflow': 0},
+                {'pool_size': 2, 'max_overflow': -1},
+            ],
+            4,
+        ),
+        ([{'poolclass': StaticPool}, {'poolclass': NullPool}], None),
+    ],
+)
+def test_default_max_workers(tmp_path, pools, expected):
+    uri = f'sqlite:///{tmp_path / "pools.db"}'
+    engines = [create_engine(uri, **kwargs) for kwargs in pools]
+
+    manager = Manager(engines[0])
+    for engine in engines[1:]:
+        manager.add_engine(engine, 'r')
+
+    assert default_max_workers(manager) == expected
+    executor = Middleware(manager)._get_executor()
+    assert executor._max_workers == (expected or min(32, os.cpu_count() + 4))
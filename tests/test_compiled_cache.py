@@ -0,0 +1,157 @@
+import pytest
+from sqlalchemy import bindparam
+from sqlalchemy import create_engine
+from sqlalchemy import select
+
+from falcon_sqla import cache
+from falcon_sqla import Manager
+from falcon_sqla.cache import CompiledCacheStats
+from falcon_sqla.cache import StatementRegistry
+
+
+@pytest.fixture
+def manager(database):
+    manager = Manager(database.write_engine)
+    manager.add_engine(database.read_engine, 'r')
+    return manager
+
+
+def test_stats_disabled(manager):
+    assert manager.compiled_cache_stats == {}
+
+
+def test_hits_and_misses(database, manager):
+    monitor = manager.monitor_compiled_cache()
+    assert manager.monitor_compiled_cache() is monitor
+
+    stmt = select(database.Language).where(database.Language.id == 1)
+
+    for _ in range(3):
+        with manager.session_scope() as session:
+            session.execute(stmt).all()
+            session.connection().exec_driver_sql('SELECT 1').all()
+
+    stats = manager.compiled_cache_stats[database.write_engine]
+    assert (stats.hits, stats.misses, stats.uncached) == (2, 1, 3)
+    assert stats.hit_ratio == pytest.approx(2 / 3)
+    assert stats.as_dict() == {
+        'hits': 2,
+        'misses': 1,
+        'uncached': 3,
+        'hit_ratio': stats.hit_ratio,
+    }
+    assert repr(stats) == 'CompiledCacheStats(hits=2, misses=1, uncached=3)'
+
+    assert manager.compiled_cache_stats[database.read_engine].hit_ratio is None
+
+    # NOTE: Clearing the compiled cache causes another miss.
+    database.write_engine._compiled_cache.clear()
+    with manager.session_scope() as session:
+        session.execute(stmt).all()
+    assert stats.misses == 2
+
+
+def test_engine_added_later(manager):
+    manager.monitor_compiled_cache()
+
+    replica = create_engine('sqlite://')
+    manager.add_engine(replica, 'r')
+    with replica.connect() as conn:
+        conn.execute(select(1)).all()
+
+    assert manager.compiled_cache_stats[replica].misses == 1
+
+    # NOTE: Attaching the same engine again is a no-op.
+    stats = manager.compiled_cache_stats[replica]
+    manager.monitor_compiled_cache().attach(replica)
+    assert manager.compiled_cache_stats[replica] is stats
+
+
+def test_warm_compiled_cache(database, manager):
+    monitor = manager.monitor_compiled_cache()
+    language = database.Language
+
+    statements = [
+        select(language).where(language.id == bindparam('id')),
+        select(language).order_by(language.name),
+    ]
+    assert manager.warm_compiled_cache(statements) == 4
+    assert manager.warm_compiled_cache(statements) == 0
+
+    with manager.session_scope() as session:
+        session.execute(statements[0], {'id': 1}).all()
+        session.execute(select(language).order_by(language.name)).all()
+
+    assert monitor.stats[database.write_engine].hits == 2
+    assert monitor.stats[database.write_engine].misses == 0
+
+
+def test_warm_caching_disabled():
+    engine = create_engine('sqlite://', query_cache_size=0)
+    manager = Manager(engine)
+
+    assert manager.warm_compiled_cache([select(1)]) == 0
+
+
+def test_stats_defaults():
+    stats = CompiledCacheStats()
+    assert stats.hit_ratio is None
+
+
+def test_statement_registry(database):
+    registry = StatementRegistry()
+    stmt = select(database.Language).where(
+        database.Language.name == bindparam('name')
+    )
+    assert registry.register('by_name', stmt) is stmt
+    assert 'by_name' in registry
+    assert list(registry) == ['by_name']
+    assert len(registry) == 1
+    assert registry.get('by_name') is stmt
+    assert registry.get('other') is None
+    assert registry.name_of(None) is None
+
+    with pytest.raises(ValueError, match='already registered'):
+        registry.register('by_name', select(1))
+
+    class Uncacheable:
+        def _generate_cache_key(self):
+            return None
+
+    with pytest.raises(ValueError, match='cannot be cached'):
+        registry.register('uncached', Uncacheable())
+
+
+def test_record_and_warm(database, tmp_path):
+    record_path = str(tmp_path / 'recorded.jsonl')
+    language = database.Language
+    by_name = select(language).where(language.name == bindparam('name'))
+    ordered = select(language).order_by(language.name)
+
+    def create_manager():
+        engine = create_engine(database.write_engine.url)
+        manager = Manager(engine)
+        manager.statements.register('by_name', by_name)
+        manager.statements.register('ordered', ordered)
+        return manager
+
+    manager = create_manager()
+    assert manager.warm_recorded_statements(record_path) == 0
+    manager.monitor_compiled_cache(record_path)
+    for _ in range(2):
+        with manager.session_scope() as session:
+            session.execute(by_name, {'name': 'Python'}).all()
+            session.execute(select(language.id)).all()
+        manager.write_engines[0]._compiled_cache.clear()
+
+    # NOTE: Only the missed registered statement is recorded (once).
+    assert cache.read_recorded(record_path) == ['by_name']
+    with open(record_path, 'a') as fp:
+        fp.write('{"name": "removed"}\n\n{"name": "by_name"}\n')
+
+    manager = create_manager()
+    monitor = manager.monitor_compiled_cache()
+    assert manager.warm_recorded_statements(record_path) == 1
+    with manager.session_scope() as session:
+        session.execute(by_name, {'name': 'Python'}).all()
+    assert monitor.stats[manager.write_engines[0]].hits == 1
@@ -0,0 +1,157 @@
+import falcon
+import falcon.testing
+import pytest
+from sqlalchemy import inspect
+from sqlalchemy import select
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from falcon_sqla import Manager
+
+
+class Languages:
+    def __init__(self, db):
+        self.db = db
+
+    def _query(self, req):
+        session = req.context.session
+        stmt = select(self.db.Language).order_by(self.db.Language.id)
+        if req.get_param_as_bool('yield_per'):
+            stmt = stmt.execution_options(yield_per=10)
+
+        if req.get_param_as_bool('nested'):
+            session.begin_nested()
+        if req.get_param_as_bool('add'):
+            session.add(self.db.Language(name='Added'))
+        if req.get_param_as_bool('text'):
+            session.execute(text('SELECT 1')).all()
+
+        languages = session.execute(stmt).scalars().all()
+        if req.get_param_as_bool('get') and languages:
+            assert session.get(self.db.Language, languages[0].id)
+
+        return languages
+
+    def _describe(self, req, languages):
+        session = req.context.session
+        return {
+            'in_transaction': session.in_transaction(),
+            'checked_out': [
+                self.db.write_engine.pool.checkedout(),
+                self.db.read_engine.pool.checkedout(),
+            ],
+            'expired': any(inspect(lang).expired for lang in languages),
+            'names': [lang.name for lang in languages],
+        }
+
+    def on_get(self, req, resp):
+        languages = self._query(req)
+        resp.media = self._describe(req, languages)
+
+    def on_post(self, req, resp):
+        session = req.context.session
+        session.add(self.db.Language(name=req.media['name']))
+        session.commit()
+
+        languages = self._query(req)
+        if req.get_param_as_bool('release'):
+            session.release()
+            # NOTE: Releasing again is a no-op.
+            session.release()
+
+        resp.media = self._describe(req, languages)
+
+
+@pytest.fixture
+def client(create_app, database):
+    def create(release_after_read=True, session_cls=None):
+        kwargs = {'session_cls': session_cls} if session_cls else {}
+        manager = Manager(database.write_engine, **kwargs)
+        manager.add_engine(database.read_engine, 'r')
+        manager.session_options.release_after_read = release_after_read
+
+        app = create_app(middleware=[manager.middleware])
+        app.add_route('/languages', Languages(database))
+        return falcon.testing.TestClient(app)
+
+    return create
+
+
+@pytest.fixture
+def populated(database):
+    with Session(database.write_engine) as session:
+        session.add(database.Language(name='Python'))
+        session.commit()
+
+
+@pytest.mark.usefixtures('populated')
+@pytest.mark.parametrize('query', ['', '?get', '?text'])
+def test_release_after_read(client, query):
+    resp = client().simulate_get('/languages' + query)
+
+    assert resp.json == {
+        'in_transaction': False,
+        'checked_out': [0, 0],
+        'expired': False,
+        'names': ['Python'],
+    }
+
+
+@pytest.mark.usefixtures('populated')
+@pytest.mark.parametrize(
+    'query',
+    ['?add', '?nested', '?yield_per'],
+)
+def test_not_released(client, query):
+    resp = client().simulate_get('/languages' + query)
+
+    assert resp.json['in_transaction'] is True
+    assert resp.json['checked_out'] != [0, 0]
+
+
+@pytest.mark.usefixtures('populated')
+def test_released_only_when_enabled(client):
+    test_client = client(release_after_read=False)
+
+    resp = test_client.simulate_get('/languages')
+    assert resp.json['in_transaction'] is True
+    assert sum(resp.json['checked_out']) == 1
+
+
+@pytest.mark.usefixtures('populated')
+def test_plain_session(client):
+    resp = client(session_cls=Session).simulate_get('/languages')
+    assert resp.json['in_transaction'] is True
+
+
+def test_unsafe_method(client):
+    test_client = client()
+
+    resp = test_client.simulate_post('/languages', json={'name': 'Rust'})
+    assert resp.json['in_transaction'] is True
+    assert resp.json['checked_out'] == [1, 0]
+
+    resp = test_client.simulate_post(
+        '/languages', json={'name': 'Go'}, params={'release': True}
+    )
+    assert resp.json == {
+        'in_transaction': False,
+        'checked_out': [0, 0],
+        'expired': False,
+        'names': ['Rust', 'Go'],
+    }
+
+
+def test_standalone_session(database):
+    manager = Manager(database.write_engine)
+    manager.session_options.release_after_read = True
+
+    req = falcon.testing.create_req()
+    resp = falcon.Response()
+    manager.get_session(req, resp).close()
+    # NOTE: The listeners are only registered once.
+    manager._listen_session_events()
+
+    with manager.session_scope() as session:
+        session.execute(select(database.Language)).all()
+        assert session.in_transaction()
@@ -0,0 +1,184 @@
+import json
+
+import falcon
+import falcon.testing
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy import insert
+from sqlalchemy import select
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from falcon_sqla import EngineRole
+from falcon_sqla import Manager
+from falcon_sqla import ReadOnlyMode
+from falcon_sqla import SessionCleanup
+
+
+@pytest.fixture
+def engine(database, tmp_path):
+    engine = create_engine(f'sqlite:///{tmp_path / "core.db"}')
+    database.Base.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture
+def replica(engine):
+    return engine.execution_options(replica=True)
+
+
+@pytest.fixture
+def manager(engine, replica):
+    manager = Manager(engine)
+    manager.session_options.read_from_rw_engines = False
+    manager.add_engine(replica, EngineRole.READ)
+    return manager
+
+
+def count(engine, database):
+    with engine.connect() as conn:
+        stmt = select(database.Language.id)
+        return len(conn.execute(stmt).all())
+
+
+def test_routing(engine, manager, replica):
+    for method, expected in (('GET', replica), ('POST', engine)):
+        req = falcon.testing.create_req(method=method)
+        with manager.connection_scope(req, falcon.Response()) as conn:
+            assert conn.engine is expected
+
+    with manager.connection_scope() as conn:
+        assert conn.engine is engine
+
+
+@pytest.mark.parametrize(
+    'cleanup,succeeded,expected',
+    [
+        (SessionCleanup.COMMIT_ON_SUCCESS, True, 1),
+        (SessionCleanup.COMMIT_ON_SUCCESS, False, 0),
+        (SessionCleanup.COMMIT, False, 1),
+        (SessionCleanup.ROLLBACK, True, 0),
+        (SessionCleanup.CLOSE_ONLY, True, 0),
+    ],
+)
+def test_cleanup(database, engine, manager, cleanup, succeeded, expected):
+    manager.session_options.session_cleanup = cleanup
+
+    conn = manager.get_connection(falcon.testing.create_req(method='POST'))
+    conn.execute(insert(database.Language).values(name='Python'))
+    manager.close_connection(conn, succeeded)
+
+    assert conn.closed
+    assert count(engine, database) == expected
+
+
+def test_no_transaction(manager):
+    conn = manager.get_connection()
+    manager.close_connection(conn, True)
+    assert conn.closed
+
+
+def test_failed_scope(database, engine, manager):
+    with pytest.raises(ValueError):
+        with manager.connection_scope() as conn:
+            conn.execute(insert(database.Language).values(name='Python'))
+            raise ValueError('something went wrong')
+
+    assert count(engine, database) == 0
+
+
+def test_failed_commit(manager, monkeypatch):
+    conn = manager.get_connection(falcon.testing.create_req(method='POST'))
+    conn.execute(text('SELECT 1'))
+
+    def commit():
+        raise OperationalError('COMMIT', (), Exception('database is locked'))
+
+    monkeypatch.setattr(conn, 'commit', commit)
+    with pytest.raises(OperationalError):
+        manager.close_connection(conn, True)
+    assert conn.closed
+
+
+@pytest.mark.parametrize(
+    'mode,autocommit,query_only',
+    [
+        (None, False, 0),
+        (ReadOnlyMode.AUTOCOMMIT, True, 0),
+        (ReadOnlyMode.READ_ONLY_TRANSACTION, False, 1),
+    ],
+)
+def test_read_only_mode(manager, mode, autocommit, query_only):
+    manager.session_options.read_only_mode = mode
+
+    req = falcon.testing.create_req()
+    with manager.connection_scope(req) as conn:
+        dbapi_connection = conn.connection.dbapi_connection
+        assert (dbapi_connection.isolation_level is None) is autocommit
+        assert conn.execute(text('PRAGMA query_only')).scalar() == query_only
+
+
+class Languages:
+    def __init__(self, db):
+        self.db = db
+
+    def on_get(self, req, resp):
+        assert not hasattr(req.context, 'session')
+        stmt = select(self.db.Language.name)
+        names = req.context.connection.execute(stmt).scalars().all()
+        if req.get_param_as_bool('stream'):
+            resp.stream = iter([json.dumps(names).encode()])
+        else:
+            resp.media = names
+
+    def on_post(self, req, resp):
+        stmt = insert(self.db.Language).values(name=req.media['name'])
+        req.context.connection.execute(stmt)
+
+    def on_options(self, req, resp):
+        assert req.context.connection is None
+
+
+@pytest.fixture
+def client(create_app, database, manager):
+    app = create_app(middleware=[manager.connection_middleware])
+    app.add_route('/languages', Languages(database))
+    return falcon.testing.TestClient(app)
+
+
+def test_middleware(client, manager):
+    manager.session_options.sticky_binds = True
+
+    resp = client.simulate_post('/languages', json={'name': 'Go'})
+    assert resp.status_code == 200
+    assert client.simulate_get('/languages').json == ['Go']
+    resp = client.simulate_get('/languages', params={'stream': True})
+    assert resp.json == ['Go']
+    assert client.simulate_options('/languages').status_code == 200
+
+
+def test_middleware_tracing(client, manager):
+    traces = []
+    manager.enable_tracing(traces.append)
+
+    client.simulate_post('/languages', json={'name': 'Go'})
+    (trace,) = traces
+    assert [span.name for span in trace.spans] == [
+        'POST /languages',
+        'connection',
+        'statement',
+        'commit',
+    ]
+
+
+def test_failed_rollback(manager, monkeypatch):
+    manager.session_options.session_cleanup = SessionCleanup.ROLLBACK
+    conn = manager.get_connection(falcon.testing.create_req(method='POST'))
+    conn.execute(text('SELECT 1'))
+
+    def rollback():
+        raise OperationalError('ROLLBACK', (), Exception('disk I/O error'))
+
+    monkeypatch.setattr(conn, 'rollback', rollback)
+    with pytest.raises(OperationalError):
+        manager.close_connection(conn, True)
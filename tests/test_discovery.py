@@ -0,0 +1,148 @@
+import json
+import logging
+import os
+
+import pytest
+from sqlalchemy import create_engine
+
+from falcon_sqla import EngineRole
+from falcon_sqla import Manager
+from falcon_sqla.discovery import ConfigFileWatcher
+
+
+@pytest.fixture
+def uri(tmp_path):
+    return f'sqlite:///{tmp_path / "discovery.db"}'
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    return tmp_path / 'engines.json'
+
+
+def write_config(path, engines, mtime=None):
+    path.write_text(json.dumps({'engines': engines}))
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def manager(uri):
+    return Manager(create_engine(uri))
+
+
+def test_reconcile(config_path, manager, tmp_path):
+    uri1 = f'sqlite:///{tmp_path / "r1.db"}'
+    uri2 = f'sqlite:///{tmp_path / "r2.db"}'
+    primary = manager.write_engines[0]
+    watcher = ConfigFileWatcher(manager, str(config_path), drain_timeout=0)
+
+    write_config(config_path, [{'url': uri1}, {'url': uri2, 'role': 'rw'}])
+    assert watcher.reconcile() is True
+    replica1 = watcher.engines[uri1]
+    replica2 = watcher.engines[uri2]
+    assert manager.read_engines == (primary, replica1, replica2)
+    assert manager.write_engines == (primary, replica2)
+
+    # NOTE: Unchanged definitions are left intact.
+    assert watcher.reconcile() is True
+    assert watcher.engines == {uri1: replica1, uri2: replica2}
+
+    write_config(
+        config_path,
+        [{'url': uri2, 'role': 'r', 'options': {'pool_size': 2}}],
+    )
+    assert watcher.reconcile() is True
+    replacement = watcher.engines[uri2]
+    assert replacement is not replica2
+    assert replacement.pool.size() == 2
+    assert manager.read_engines == (primary, replacement)
+    assert manager.write_engines == (primary,)
+
+
+@pytest.mark.parametrize(
+    'content',
+    [
+        None,
+        'not json',
+        '{"replicas": []}',
+        '{"engines": [{"url": 1}]}',
+        '{"engines": [{"url": "sqlite://", "options": []}]}',
+        '{"engines": [{"url": "sqlite://", "role": "x"}]}',
+    ],
+)
+def test_invalid_config(config_path, manager, content):
+    if content is not None:
+        config_path.write_text(content)
+
+    watcher = ConfigFileWatcher(manager, str(config_path))
+    assert watcher.reconcile() is False
+    assert watcher.engines == {}
+    assert len(manager.read_engines) == 1
+
+
+def test_poll(config_path, manager, uri):
+    watcher = ConfigFileWatcher(manager, str(config_path), drain_timeout=0)
+    assert watcher.poll() is False
+
+    write_config(config_path, [{'url': uri}], mtime=1000)
+    assert watcher.poll() is True
+    assert watcher.poll() is False
+
+    write_config(config_path, [], mtime=2000)
+    assert watcher.poll() is True
+    assert watcher.engines == {}
+
+
+def test_poll_retry(caplog, config_path, manager, uri):
+    watcher = ConfigFileWatcher(manager, str(config_path), drain_timeout=0)
+
+    # NOTE: A half-written file is retried upon the next poll.
+    config_path.write_text('{"engines": [')
+    os.utime(config_path, (1000, 1000))
+    with caplog.at_level(logging.WARNING, 'falcon_sqla.discovery'):
+        assert watcher.poll() is False
+    assert 'failed to load' in caplog.records[0].getMessage()
+
+    write_config(config_path, [{'url': uri}], mtime=1000)
+    assert watcher.poll() is True
+    assert list(watcher.engines) == [uri]
+
+
+def test_start_stop(caplog, config_path, manager, uri):
+    write_config(config_path, [{'url': uri, 'role': EngineRole.READ.value}])
+
+    created = []
+
+    def factory(url, **kwargs):
+        if url == 'broken://':
+            raise ValueError('cannot create engine')
+        engine = create_engine(url, **kwargs)
+        created.append(engine)
+        return engine
+
+    watcher = ConfigFileWatcher(
+        manager, str(config_path), interval=0.01, engine_factory=factory
+    )
+    assert watcher.start() is watcher
+    assert manager.read_engines[1:] == tuple(created)
+
+    # NOTE: The watcher thread survives (and logs) errors creating engines.
+    with caplog.at_level(logging.ERROR, 'falcon_sqla.discovery'):
+        write_config(config_path, [{'url': 'broken://'}], mtime=1)
+        for _ in range(500):
+            if caplog.records:
+                break
+            watcher._stopped.wait(0.01)
+    assert 'failed to reconcile' in caplog.records[0].getMessage()
+
+    write_config(config_path, [], mtime=2)
+    for _ in range(500):
+        if not watcher.engines:
+            break
+        watcher._stopped.wait(0.01)
+    watcher.stop()
+    watcher.stop()
+
+    assert watcher.engines == {}
+    assert len(manager.read_engines) == 1
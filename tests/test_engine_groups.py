@@ -0,0 +1,216 @@
+import falcon
+import falcon.testing
+import pytest
+from sqlalchemy import Column
+from sqlalchemy import create_engine
+from sqlalchemy import event
+from sqlalchemy import Integer
+from sqlalchemy import select
+from sqlalchemy import String
+from sqlalchemy import text
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.orm import Session
+
+from falcon_sqla import EngineRole
+from falcon_sqla import Manager
+
+AnalyticsBase = declarative_base()
+
+
+class Event(AnalyticsBase):
+    __tablename__ = 'events'
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+
+
+@pytest.fixture
+def executed():
+    return []
+
+
+@pytest.fixture
+def engines(database, tmp_path, executed):
+    engines = {}
+    for name, base in (('main', database.Base), ('analytics', AnalyticsBase)):
+        uri = f'sqlite:///{tmp_path / name}.db'
+        primary = create_engine(uri)
+        base.metadata.create_all(primary)
+        engines[name] = primary
+        engines[f'{name}_replica'] = create_engine(uri)
+
+    for name, engine in engines.items():
+
+        @event.listens_for(engine, 'before_cursor_execute')
+        def before_cursor_execute(conn, cursor, statement, *args, name=name):
+            executed.append((name, statement.split()[0]))
+
+    return engines
+
+
+def create_manager(engines, binds):
+    manager = Manager(engines['main'], binds=binds)
+    manager.session_options.read_from_rw_engines = False
+    manager.add_engine(engines['main_replica'], EngineRole.READ)
+    manager.add_engine(
+        engines['analytics'], EngineRole.READ_WRITE, 'analytics'
+    )
+    manager.add_engine(
+        engines['analytics_replica'], EngineRole.READ, group='analytics'
+    )
+    return manager
+
+
+@pytest.fixture
+def manager(engines):
+    return create_manager(engines, {AnalyticsBase: 'analytics'})
+
+
+class Resource:
+    def __init__(self, db):
+        self.db = db
+
+    def on_get(self, req, resp):
+        session = req.context.session
+        session.execute(select(self.db.Language)).all()
+        session.execute(select(Event)).all()
+        session.execute(text('SELECT 1'))
+
+    def on_post(self, req, resp):
+        session = req.context.session
+        session.add(self.db.Language(name='Python'))
+        session.add(Event(name='created'))
+
+
+def test_routing(create_app, database, engines, manager, executed):
+    assert manager.read_engines == (engines['main_replica'],)
+    assert manager.write_engines == (engines['main'],)
+    assert manager.group_engines('analytics') == (
+        (engines['analytics_replica'],),
+        (engines['analytics'],),
+    )
+    assert manager.group_engines('other') == ((), ())
+
+    app = create_app(middleware=[manager.middleware])
+    app.add_route('/', Resource(database))
+    client = falcon.testing.TestClient(app)
+
+    assert client.simulate_post('/').status_code == 200
+    assert sorted(executed) == [('analytics', 'INSERT'), ('main', 'INSERT')]
+
+    executed.clear()
+    assert client.simulate_get('/').status_code == 200
+    assert executed == [
+        ('main_replica', 'SELECT'),
+        ('analytics_replica', 'SELECT'),
+        ('main_replica', 'SELECT'),
+    ]
+
+
+def test_bind_resolution(database, engines, manager):
+    req = falcon.testing.create_req()
+    session = manager.get_session(req, falcon.Response())
+
+    assert session.get_bind(Event) is engines['analytics_replica']
+    assert session.get_bind(aliased(Event)) is engines['analytics_replica']
+    assert session.get_bind(database.Language) is engines['main_replica']
+    assert session.get_bind() is engines['main_replica']
+
+
+@pytest.mark.parametrize('key', ['table', 'class'])
+def test_core_statements(engines, key):
+    binds = {Event.__table__ if key == 'table' else Event: 'analytics'}
+    manager = create_manager(engines, binds)
+
+    req = falcon.testing.create_req()
+    with manager.session_scope(req, falcon.Response()) as session:
+        stmt = select(Event.__table__.c.name)
+        assert session.get_bind(clause=stmt) is engines['analytics_replica']
+        assert session.execute(stmt).all() == []
+        assert session.get_bind(Event) is engines['analytics_replica']
+
+
+def test_pinned_engine(database, engines):
+    binds = {AnalyticsBase: 'analytics', database.Language: engines['main']}
+    manager = create_manager(engines, binds)
+
+    req = falcon.testing.create_req()
+    session = manager.get_session(req, falcon.Response())
+    assert session.get_bind(database.Language) is engines['main']
+    assert session.get_bind(Event) is engines['analytics_replica']
+    assert session.get_bind(database.Snippet) is engines['main_replica']
+
+
+def test_sessions_without_request(database, engines, manager):
+    with manager.session_scope() as session:
+        assert session.get_bind(Event) is engines['analytics']
+        assert session.get_bind(database.Language) is engines['main']
+
+
+def test_missing_engines(engines):
+    manager = Manager(engines['main'], binds={Event: 'analytics'})
+    manager.add_engine(
+        engines['analytics_replica'], EngineRole.READ, 'analytics'
+    )
+    with manager.session_scope() as session:
+        assert session.get_bind(Event) is engines['analytics_replica']
+
+    manager.add_engine(engines['main_replica'], EngineRole.READ, 'other')
+    manager.remove_engine(engines['analytics_replica'])
+    with manager.session_scope() as session:
+        assert session.get_bind(Event) is engines['main']
+
+    req = falcon.testing.create_req(method='POST')
+    session = manager.get_session(req, falcon.Response())
+    with pytest.raises(ValueError, match="'analytics' has no write engines"):
+        session.get_bind(Event)
+
+
+def test_replace_grouped_engine(engines, manager):
+    replacement = create_engine(engines['analytics'].url)
+    manager.replace_engine(engines['analytics'], replacement)
+    assert manager.group_engines('analytics') == (
+        (engines['analytics_replica'],),
+        (replacement,),
+    )
+
+
+def test_plain_session(engines):
+    with pytest.raises(ValueError):
+        Manager(
+            engines['main'], session_cls=Session, binds={Event: 'analytics'}
+        )
+
+
+def test_hedged_execute(database, engines, executed):
+    binds = {AnalyticsBase: 'analytics', database.Language: engines['main']}
+    manager = create_manager(engines, binds)
+    req = falcon.testing.create_req()
+
+    assert manager.hedged_execute(req, select(Event.name)) == []
+    assert executed == [('analytics_replica', 'SELECT')]
+
+    executed.clear()
+    assert manager.hedged_execute(req, select(database.Language)) == []
+    assert executed == [('main', 'SELECT')]
+
+    executed.clear()
+    assert manager.hedged_execute(req, text('SELECT 1')) == [(1,)]
+    assert executed == [('main_replica', 'SELECT')]
+
+
+def test_connection_group(engines, manager, executed):
+    req = falcon.testing.create_req()
+    with manager.connection_scope(req, group='analytics') as connection:
+        assert connection.engine is engines['analytics_replica']
+        assert connection.execute(select(Event.name)).all() == []
+
+    with manager.connection_scope(group='analytics') as connection:
+        assert connection.engine is engines['analytics']
+
+    with manager.connection_scope(req) as connection:
+        assert connection.engine is engines['main_replica']
+
+    with pytest.raises(ValueError, match="'other' has no read engines"):
+        manager.get_connection(req, group='other')
@@ -0,0 +1,224 @@
+import concurrent.futures
+import sys
+import threading
+import time
+
+import falcon
+import falcon.testing
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy import text
+from sqlalchemy.pool import NullPool
+
+from falcon_sqla import EngineRole
+from falcon_sqla import Manager
+
+
+@pytest.fixture
+def uri(tmp_path):
+    return f'sqlite:///{tmp_path / "engines.db"}'
+
+
+@pytest.fixture
+def engines(uri):
+    return [create_engine(uri) for _ in range(3)]
+
+
+@pytest.fixture
+def manager(engines):
+    primary, replica1, replica2 = engines
+    manager = Manager(primary)
+    manager.add_engine(replica1, EngineRole.READ)
+    manager.add_engine(replica2, EngineRole.READ)
+    return manager
+
+
+def get_bind(manager, method='GET'):
+    req = falcon.testing.create_req(method=method)
+    resp = falcon.Response()
+    session = manager.get_session(req, resp)
+    return session.get_bind()
+
+
+def test_remove_engine(engines, manager):
+    primary, replica1, replica2 = engines
+
+    assert manager.remove_engine(replica1) is True
+    assert manager.read_engines == (primary, replica2)
+    assert manager.write_engines == (primary,)
+
+    assert manager.remove_engine(replica2) is True
+    assert manager.read_engines == (primary,)
+    assert get_bind(manager) is primary
+
+
+def test_remove_engine_read_only_replicas(engines):
+    primary, replica1, replica2 = engines
+    manager = Manager(primary)
+    manager.session_options.read_from_rw_engines = False
+    manager.add_engine(replica1, EngineRole.READ)
+    manager.add_engine(replica2, EngineRole.READ)
+    assert manager.read_engines == (replica1, replica2)
+
+    manager.remove_engine(replica1)
+    assert manager.read_engines == (replica2,)
+
+    # NOTE: Fall back to the read-write engine when no replicas are left.
+    manager.remove_engine(replica2)
+    assert manager.read_engines == (primary,)
+
+
+def test_remove_invalid_engine(engines, manager, uri):
+    primary, _, _ = engines
+
+    with pytest.raises(ValueError):
+        manager.remove_engine(primary)
+    with pytest.raises(ValueError):
+        manager.remove_engine(create_engine(uri))
+
+
+def test_remove_engine_drain(engines, manager):
+    _, replica1, replica2 = engines
+    conn = replica1.connect()
+    conn.execute(text('SELECT 1'))
+
+    timer = threading.Timer(0.05, conn.close)
+    timer.start()
+    start = time.monotonic()
+    assert manager.remove_engine(replica1) is True
+    assert time.monotonic() - start >= 0.04
+    timer.join()
+
+    with replica2.connect() as conn:
+        conn.execute(text('SELECT 1'))
+        assert manager.remove_engine(replica2, drain_timeout=0.01) is False
+
+
+def test_remove_engine_unbounded_pool(engines, manager, uri):
+    replica = create_engine(uri, poolclass=NullPool)
+    manager.add_engine(replica, EngineRole.READ)
+
+    with replica.connect() as conn:
+        conn.execute(text('SELECT 1'))
+        assert manager.remove_engine(replica, drain_timeout=0) is True
+
+
+def test_replace_engine(engines, manager, uri):
+    primary, replica1, replica2 = engines
+    monitor = manager.monitor_compiled_cache()
+    replacement = create_engine(uri)
+
+    assert manager.replace_engine(replica1, replacement) is True
+    assert manager.read_engines == (primary, replacement, replica2)
+    assert replacement in monitor.stats
+
+    other = create_engine(uri)
+    manager.replace_engine(replacement, other, EngineRole.READ_WRITE)
+    assert manager.read_engines == (primary, other, replica2)
+    assert manager.write_engines == (primary, other)
+
+
+def test_replace_main_engine(engines, uri):
+    primary, _, _ = engines
+    manager = Manager(primary)
+    replacement = create_engine(uri)
+
+    manager.replace_engine(primary, replacement)
+    assert manager.read_engines == (replacement,)
+    assert manager.write_engines == (replacement,)
+    assert manager.get_session().get_bind() is replacement
+    assert get_bind(manager, 'POST') is replacement
+
+    # NOTE: The previous main engine is no longer registered.
+    with pytest.raises(ValueError):
+        manager.remove_engine(primary)
+    with pytest.raises(ValueError):
+        manager.remove_engine(replacement)
+
+
+def test_replace_invalid_engine(engines, manager, uri):
+    primary, replica1, _ = engines
+
+    with pytest.raises(ValueError):
+        manager.replace_engine(create_engine(uri), create_engine(uri))
+    with pytest.raises(ValueError):
+        manager.replace_engine(replica1, primary)
+
+
+def test_detach_monitors(engines, manager, uri, tmp_path):
+    primary, replica1, replica2 = engines
+    manager.session_options.latency_aware_binds = True
+    monitors = [
+        manager.monitor_compiled_cache(),
+        manager._get_latency_tracker(),
+        manager.enable_adaptive_pre_ping(),
+        manager.enable_tracing(lambda trace: None),
+        manager.enable_shared_stats(str(tmp_path / 'stats.bin')),
+        manager.enable_shadow_traffic(create_engine(uri)),
+        manager.enable_workload_capture(str(tmp_path / 'workload.jsonl')),
+    ]
+
+    for engine in engines:
+        with engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+    assert replica1 in manager.compiled_cache_stats
+    assert replica1 in manager.engine_latencies
+    assert replica1 in manager.pre_ping_stats
+    assert replica1 in manager.shadow_stats
+
+    replacement = create_engine(uri)
+    manager.remove_engine(replica1)
+    manager.replace_engine(replica2, replacement)
+
+    for stats in (
+        manager.compiled_cache_stats,
+        manager.engine_latencies,
+        manager.pre_ping_stats,
+        manager.shadow_stats,
+    ):
+        assert replica1 not in stats
+        assert replica2 not in stats
+    assert replacement in manager.pre_ping_stats
+    for monitor in monitors:
+        assert replica1 not in monitor._listeners
+        assert replica2 not in monitor._listeners
+        assert replacement in monitor._listeners
+
+    # NOTE: The replacement reuses a slot instead of claiming a new one.
+    snapshot = manager.shared_stats.snapshot()
+    assert len(snapshot['engines']) == 3
+    manager.shared_stats.close()
+    manager.workload_recorder.close()
+    manager._shadow.close()
+
+
+@pytest.fixture
+def switch_often():
+    # NOTE: Switch threads often in order to provoke races.
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def test_concurrent_changes(manager, uri, switch_often):
+    stopped = threading.Event()
+
+    def change_engines():
+        while not stopped.is_set():
+            engine = create_engine(uri)
+            manager.add_engine(engine, EngineRole.READ, 'other')
+            manager.remove_engine(engine, drain_timeout=0)
+
+    with concurrent.futures.ThreadPoolExecutor(1) as executor:
+        future = executor.submit(change_engines)
+        try:
+            deadline = time.monotonic() + 0.5
+            while time.monotonic() < deadline:
+                assert manager.is_transient_error(ValueError()) is False
+                assert manager.warm_compiled_cache([]) == 0
+        finally:
+            stopped.set()
+
+    # NOTE: Propagate any errors raised while changing engines.
+    future.result()
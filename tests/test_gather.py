@@ -0,0 +1,122 @@
+import sqlite3
+import threading
+import time
+
+import falcon
+import falcon.testing
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy import event
+from sqlalchemy import func
+from sqlalchemy import select
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from falcon_sqla import EngineRole
+from falcon_sqla import Manager
+
+
+@pytest.fixture
+def uri(database, tmp_path):
+    uri = f'sqlite:///{tmp_path / "gather.db"}'
+
+    engine = create_engine(uri)
+    database.Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            database.Language.__table__.insert(),
+            [{'name': 'Python'}, {'name': 'Rust'}],
+        )
+    return uri
+
+
+@pytest.fixture
+def executed():
+    return []
+
+
+def create_tracked_engine(uri, name, executed, delay=0.0):
+    engine = create_engine(uri)
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, *args):
+        executed.append((name, threading.current_thread().name))
+        if statement == 'SELECT 0':
+            raise sqlite3.OperationalError('disk I/O error')
+        time.sleep(delay)
+
+    return engine
+
+
+@pytest.fixture
+def manager(uri, executed):
+    manager = Manager(create_tracked_engine(uri, 'primary', executed))
+    manager.session_options.read_from_rw_engines = False
+    manager.add_engine(
+        create_tracked_engine(uri, 'replica', executed), EngineRole.READ
+    )
+    return manager
+
+
+def test_gather(database, manager, executed):
+    req = falcon.testing.create_req()
+    language = database.Language
+
+    names, count, one = manager.gather(
+        req,
+        select(language.name).order_by(language.name),
+        select(func.count(language.id)),
+        text('SELECT 1'),
+    )
+    assert [row.name for row in names] == ['Python', 'Rust']
+    assert count[0][0] == 2
+    assert one[0][0] == 1
+
+    assert {name for name, _ in executed} == {'replica'}
+    # NOTE: The first statement is executed on the calling thread.
+    threads = {thread for _, thread in executed}
+    assert threading.current_thread().name in threads
+    assert len(threads) >= 2
+
+    assert manager.gather(req) == []
+
+
+def test_gather_unsafe_method(manager, executed):
+    req = falcon.testing.create_req(method='POST')
+    resp = falcon.Response()
+
+    assert manager.gather(req, text('SELECT 1'), resp=resp) == [[(1,)]]
+    assert executed[0][0] == 'primary'
+
+
+def test_gather_concurrently(uri, executed):
+    manager = Manager(create_tracked_engine(uri, 'slow', executed, 0.1))
+    manager.session_options.executor_workers = 4
+
+    req = falcon.testing.create_req()
+    start = time.perf_counter()
+    results = manager.gather(req, *(text(f'SELECT {i}') for i in range(1, 5)))
+    elapsed = time.perf_counter() - start
+
+    assert results == [[(1,)], [(2,)], [(3,)], [(4,)]]
+    assert 0.1 <= elapsed < 0.3
+
+
+@pytest.mark.parametrize('failing', [0, 1])
+def test_gather_error(manager, failing):
+    req = falcon.testing.create_req()
+    statements = [text('SELECT 1'), text('SELECT 2')]
+    statements[failing] = text('SELECT 0')
+
+    with pytest.raises(OperationalError):
+        manager.gather(req, *statements)
+
+
+def test_gather_plain_session(uri):
+    manager = Manager(create_engine(uri), session_cls=Session)
+    req = falcon.testing.create_req()
+    assert manager.gather(req, text('SELECT 1'), text('SELECT 2')) == [
+        [(1,)],
+        [(2,)],
+    ]
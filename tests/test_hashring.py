@@ -0,0 +1,114 @@
+import collections
+import uuid
+
+import falcon
+import falcon.testing
+import pytest
+from sqlalchemy import create_engine
+
+from falcon_sqla import EngineRole
+from falcon_sqla import Manager
+from falcon_sqla.hashring import context_key
+from falcon_sqla.hashring import cookie_key
+from falcon_sqla.hashring import HashRing
+from falcon_sqla.hashring import header_key
+
+
+def make_engines(count, offset=0):
+    return [
+        create_engine(f'sqlite:///replica{index}.db')
+        for index in range(offset, offset + count)
+    ]
+
+
+def test_consistent():
+    engines = make_engines(3)
+    ring = HashRing(engines)
+    other = HashRing(make_engines(3))
+
+    for key in range(100):
+        index = engines.index(ring.get(key))
+        assert other.get(key) is other.engines[index]
+
+
+def test_balanced():
+    ring = HashRing(make_engines(4))
+    counts = collections.Counter(ring.get(f'user{key}') for key in range(4000))
+    assert len(counts) == 4
+    assert all(count > 600 for count in counts.values())
+
+
+def test_add_engine_moves_few_keys():
+    engines = make_engines(4)
+    before = HashRing(engines)
+    after = HashRing(engines + make_engines(1, offset=4))
+
+    keys = [f'tenant{key}' for key in range(4000)]
+    moved = [key for key in keys if before.get(key) is not after.get(key)]
+    assert 0 < len(moved) < 0.3 * len(keys)
+    assert all(after.get(key) is after.engines[-1] for key in moved)
+
+
+def test_same_url():
+    engine = create_engine('sqlite:///replica.db')
+    twin = engine.execution_options()
+    ring = HashRing([engine, twin], vnodes=10)
+    assert {ring.get(key) for key in range(100)} == {engine, twin}
+
+
+@pytest.fixture
+def manager():
+    primary, replica1, replica2 = make_engines(3)
+    manager = Manager(primary)
+    manager.session_options.sticky_binds = True
+    manager.session_options.sticky_key_func = header_key('X-Tenant')
+    manager.add_engine(replica1, EngineRole.READ)
+    manager.add_engine(replica2, EngineRole.READ)
+    return manager
+
+
+def get_bind(manager, headers=None):
+    req = falcon.testing.create_req(headers=headers)
+    req.context.request_id = uuid.uuid4()
+    resp = falcon.Response()
+    session = manager.get_session(req, resp)
+    return session.get_bind()
+
+
+def test_sticky_key(manager):
+    ring = HashRing(manager.read_engines)
+    for tenant in ('acme', 'globex', 'initech', 'umbrella'):
+        headers = {'X-Tenant': tenant}
+        engines = {get_bind(manager, headers) for _ in range(10)}
+        assert engines == {ring.get(tenant)}
+
+    # NOTE: Requests without a key stick by request_id.
+    engines = {get_bind(manager) for _ in range(100)}
+    assert engines == set(manager.read_engines)
+
+
+def test_ring_rebuilt(manager):
+    get_bind(manager, {'X-Tenant': 'acme'})
+    assert len(manager._hash_rings) == 1
+
+    (replica,) = make_engines(1, offset=3)
+    manager.add_engine(replica, EngineRole.READ)
+    assert manager._hash_rings == {}
+
+    for vnodes in range(1, 20):
+        manager.session_options.sticky_vnodes = vnodes
+        get_bind(manager, {'X-Tenant': 'acme'})
+    assert 0 < len(manager._hash_rings) <= 16
+
+
+def test_key_funcs():
+    req = falcon.testing.create_req(
+        headers={'Cookie': 'sid=abc123', 'X-Tenant': 'acme'}
+    )
+    req.context.user = 42
+
+    assert context_key('user')(req) == 42
+    assert context_key('tenant')(req) is None
+    assert header_key('X-Tenant')(req) == 'acme'
+    assert cookie_key('sid')(req) == 'abc123'
+    assert cookie_key('session')(req) is None
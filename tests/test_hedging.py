@@ -0,0 +1,195 @@
+import sqlite3
+import time
+
+import falcon
+import falcon.testing
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy import event
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+
+from falcon_sqla import Manager
+from falcon_sqla.hedging import Hedger
+from falcon_sqla.hedging import HedgingStats
+
+
+def make_slow(engine, seconds):
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, *args):
+        if statement.lstrip().startswith('SELECT'):
+            time.sleep(seconds)
+
+    return engine
+
+
+def make_broken(engine):
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, *args):
+        if statement.lstrip().startswith('SELECT'):
+            raise sqlite3.OperationalError('disk I/O error')
+
+    return engine
+
+
+@pytest.fixture
+def uri(database, tmp_path):
+    uri = f'sqlite:///{tmp_path / "hedging.db"}'
+
+    engine = create_engine(uri)
+    database.Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            database.Language.__table__.insert(), [{'name': 'Python'}]
+        )
+    return uri
+
+
+@pytest.fixture
+def manager(uri, monkeypatch):
+    manager = Manager(create_engine(uri))
+    manager.session_options.read_from_rw_engines = False
+
+    # NOTE: Hedge from the first read engine to the second one.
+    monkeypatch.setattr(
+        'falcon_sqla.manager.random.sample', lambda seq, k: seq[:k]
+    )
+    return manager
+
+
+@pytest.fixture
+def stmt(database):
+    return select(database.Language.name)
+
+
+def get_req(method='GET'):
+    return falcon.testing.create_req(method=method)
+
+
+def test_hedging_stats():
+    stats = HedgingStats()
+    assert stats.hedge_ratio is None
+    assert stats.as_dict() == {
+        'requests': 0,
+        'hedged': 0,
+        'hedge_wins': 0,
+        'errors': 0,
+        'hedge_ratio': None,
+    }
+    assert repr(stats) == 'HedgingStats(requests=0, hedged=0, hedge_wins=0)'
+
+    stats.requests = 4
+    stats.hedged = 1
+    assert stats.hedge_ratio == 0.25
+
+
+def test_adaptive_delay():
+    hedger = Hedger(percentile=0.9, min_samples=10, default_delay=1.0)
+
+    for latency in range(1, 10):
+        hedger.observe(latency / 100)
+    assert hedger.delay == 1.0
+
+    hedger.observe(0.1)
+    assert hedger.delay == 0.1
+
+    for _ in range(10):
+        hedger.observe(0.01)
+    assert hedger.delay == 0.09
+
+
+def test_single_engine(uri, stmt):
+    manager = Manager(create_engine(uri))
+
+    assert manager.hedged_execute(get_req(), stmt) == [('Python',)]
+    assert manager.hedging_stats.as_dict() == {
+        'requests': 1,
+        'hedged': 0,
+        'hedge_wins': 0,
+        'errors': 0,
+        'hedge_ratio': 0.0,
+    }
+
+
+def test_fast_first_engine(manager, uri, stmt):
+    manager.add_engine(create_engine(uri), 'r')
+    manager.add_engine(make_broken(create_engine(uri)), 'r')
+
+    rows = manager.hedged_execute(get_req(), stmt, delay=5.0)
+    assert rows == [('Python',)]
+    assert manager.hedging_stats.hedged == 0
+
+
+def test_slow_first_engine(manager, uri, stmt):
+    manager.add_engine(make_slow(create_engine(uri), 0.5), 'r')
+    manager.add_engine(create_engine(uri), 'r')
+    manager.add_engine(make_broken(create_engine(uri)), 'r')
+
+    start = time.perf_counter()
+    rows = manager.hedged_execute(get_req(), stmt, delay=0.01)
+    assert rows == [('Python',)]
+    assert time.perf_counter() - start < 0.5
+
+    assert manager.hedging_stats.hedged == 1
+    assert manager.hedging_stats.hedge_wins == 1
+
+
+def test_failing_first_engine(manager, uri, stmt):
+    manager.add_engine(make_broken(create_engine(uri)), 'r')
+    manager.add_engine(create_engine(uri), 'r')
+
+    rows = manager.hedged_execute(get_req(), stmt, delay=5.0)
+    assert rows == [('Python',)]
+
+    stats = manager.hedging_stats
+    assert (stats.hedged, stats.hedge_wins, stats.errors) == (1, 1, 1)
+
+
+def test_slow_hedge(manager, uri, stmt):
+    manager.add_engine(make_slow(create_engine(uri), 0.05), 'r')
+    manager.add_engine(make_slow(create_engine(uri), 1.0), 'r')
+
+    rows = manager.hedged_execute(get_req(), stmt, delay=0.01)
+    assert rows == [('Python',)]
+    assert manager.hedging_stats.hedged == 1
+    assert manager.hedging_stats.hedge_wins == 0
+
+
+def test_all_engines_fail(manager, uri, stmt):
+    manager.add_engine(make_broken(create_engine(uri)), 'r')
+    manager.add_engine(make_broken(create_engine(uri)), 'r')
+
+    with pytest.raises(OperationalError):
+        manager.hedged_execute(get_req(), stmt)
+    assert manager.hedging_stats.errors == 2
+
+
+def test_unsafe_method(manager, uri, stmt):
+    manager.add_engine(make_broken(create_engine(uri)), 'r')
+
+    assert manager.hedged_execute(get_req('POST'), stmt) == [('Python',)]
+
+
+def test_executor_workers(manager):
+    manager.session_options.executor_workers = 3
+    executor = manager._get_executor()
+    assert executor._max_workers == 3
+    assert manager._get_executor() is executor
+
+
+def test_random_primary(uri, stmt):
+    manager = Manager(create_engine(uri))
+    manager.session_options.read_from_rw_engines = False
+    executed = []
+    for name in ('a', 'b'):
+        engine = create_engine(uri)
+        event.listen(
+            engine,
+            'before_cursor_execute',
+            lambda *args, name=name: executed.append(name),
+        )
+        manager.add_engine(engine, 'r')
+
+    for _ in range(50):
+        manager.hedged_execute(get_req(), stmt, delay=5.0)
+    assert set(executed) == {'a', 'b'}
@@ -0,0 +1,178 @@
+import time
+
+import falcon
+import falcon.testing
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy import event
+from sqlalchemy import select
+from sqlalchemy import text
+
+from falcon_sqla import Manager
+from falcon_sqla.latency import LatencyTracker
+
+
+def make_slow(engine, seconds):
+    # NOTE: Sleep in after_cursor_execute since the tracker's listeners are
+    #   registered later, i.e., its before_cursor_execute runs after ours.
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, *args):
+        if statement.lstrip().startswith('SELECT'):
+            time.sleep(seconds)
+
+    return engine
+
+
+def test_ewma():
+    tracker = LatencyTracker(alpha=0.5)
+    fast = create_engine('sqlite://')
+    slow = create_engine('sqlite://')
+
+    tracker.observe(fast, 0.01)
+    tracker.observe(slow, 1.0)
+    tracker.observe(slow, 0.5)
+    assert tracker.latencies == {fast: 0.01, slow: 0.75}
+
+    for _ in range(3):
+        assert tracker.choose([slow, fast]) is fast
+        assert tracker.choose([fast, slow]) is fast
+    assert tracker.choose([slow]) is slow
+
+
+def test_choose_unmeasured_first():
+    tracker = LatencyTracker()
+    measured = create_engine('sqlite://')
+    unmeasured = create_engine('sqlite://')
+
+    tracker.observe(measured, 0.001)
+    assert tracker.choose([measured, unmeasured]) is unmeasured
+
+
+def test_exploration(monkeypatch):
+    tracker = LatencyTracker()
+    fast = create_engine('sqlite://')
+    slow = create_engine('sqlite://')
+    tracker.observe(fast, 0.01)
+    tracker.observe(slow, 1.0)
+
+    monkeypatch.setattr('falcon_sqla.latency.random.random', lambda: 0.0)
+    monkeypatch.setattr(
+        'falcon_sqla.latency.random.choice', lambda seq: seq[0]
+    )
+    assert tracker.choose([slow, fast], exploration=0.1) is slow
+
+
+def test_attach():
+    tracker = LatencyTracker()
+    engine = create_engine('sqlite://')
+    tracker.attach(engine)
+    tracker.attach(engine)
+
+    with engine.connect() as conn:
+        conn.execute(text('SELECT 1'))
+
+    assert tracker.latencies[engine] > 0
+    assert len(engine.dispatch.after_cursor_execute) == 1
+
+
+def test_attach_during_execution():
+    tracker = LatencyTracker()
+    engine = create_engine('sqlite://')
+    tracker.attach(engine)
+
+    # NOTE: Simulate a statement that started before the tracker was attached.
+    with engine.connect() as conn:
+        engine.dispatch.after_cursor_execute(
+            conn, None, 'SELECT 1', (), None, False
+        )
+
+    assert tracker.latencies == {}
+
+
+class Languages:
+    def __init__(self, db):
+        self.db = db
+
+    def on_get(self, req, resp):
+        stmt = select(self.db.Language.name)
+        resp.media = req.context.session.execute(stmt).scalars().all()
+
+
+@pytest.fixture
+def engines(database, tmp_path):
+    uri = f'sqlite:///{tmp_path / "latency.db"}'
+
+    primary = create_engine(uri)
+    database.Base.metadata.create_all(primary)
+    return primary, make_slow(create_engine(uri), 0.01), create_engine(uri)
+
+
+@pytest.fixture
+def manager(engines):
+    primary, slow, fast = engines
+
+    manager = Manager(primary)
+    manager.session_options.read_from_rw_engines = False
+    manager.add_engine(slow, 'r')
+    manager.add_engine(fast, 'r')
+    return manager
+
+
+@pytest.fixture
+def client(create_app, database, manager):
+    app = create_app(middleware=[manager.middleware])
+    app.add_route('/languages', Languages(database))
+    return falcon.testing.TestClient(app)
+
+
+def count_selects(engines):
+    counts = {engine: 0 for engine in engines}
+
+    for engine in engines:
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def after_cursor_execute(conn, cursor, statement, *args):
+            if statement.lstrip().startswith('SELECT'):
+                counts[conn.engine] += 1
+
+    return counts
+
+
+def test_latency_aware_binds(client, engines, manager):
+    primary, slow, fast = engines
+    manager.session_options.latency_aware_binds = True
+    manager.session_options.latency_exploration = 0.0
+    counts = count_selects([slow, fast])
+
+    for _ in range(20):
+        resp = client.simulate_get('/languages')
+        assert resp.status_code == 200
+
+    latencies = manager.engine_latencies
+    assert latencies[slow] > latencies[fast]
+    assert counts[slow] <= 2
+    assert counts[fast] >= 18
+
+
+def test_latencies_not_tracked(client, manager):
+    resp = client.simulate_get('/languages')
+    assert resp.status_code == 200
+    assert manager.engine_latencies == {}
+
+
+def test_tracker_created_once():
+    manager = Manager(create_engine('sqlite://'))
+    tracker = LatencyTracker()
+
+    class RacingLock:
+        # NOTE: Simulate another thread creating the tracker while this one
+        #   was waiting for the lock.
+        def __enter__(self):
+            manager._latency_tracker = tracker
+
+        def __exit__(self, *exc_info):
+            pass
+
+    manager._listen_lock = RacingLock()
+    assert manager._get_latency_tracker() is tracker
+    assert manager._get_latency_tracker() is tracker
@@ -0,0 +1,204 @@
+import falcon
+import falcon.testing
+import pytest
+from sqlalchemy import Column
+from sqlalchemy import create_engine
+from sqlalchemy import event
+from sqlalchemy import insert
+from sqlalchemy import inspect
+from sqlalchemy import Integer
+from sqlalchemy import String
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.orm import Session
+from sqlalchemy.types import TypeEngine
+
+from falcon_sqla import loader
+from falcon_sqla import Manager
+from falcon_sqla.loader import DataLoader
+
+Base = declarative_base()
+
+
+class Translation(Base):
+    __tablename__ = 'translations'
+
+    language = Column(String(8), primary_key=True)
+    key = Column(Integer, primary_key=True)
+    text = Column(String, nullable=False)
+
+
+@pytest.fixture
+def engine(database, tmp_path):
+    engine = create_engine(f'sqlite:///{tmp_path / "loader.db"}')
+    database.Base.metadata.create_all(engine)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(database.Language),
+            [{'id': pk, 'name': f'lang{pk}'} for pk in range(1, 11)],
+        )
+        conn.execute(
+            insert(Translation),
+            [
+                {'language': 'en', 'key': 1, 'text': 'one'},
+                {'language': 'lt', 'key': 1, 'text': 'vienas'},
+            ],
+        )
+    return engine
+
+
+@pytest.fixture
+def statements(engine):
+    statements = []
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    return statements
+
+
+def test_load_many(database, engine, statements):
+    with Session(engine) as session:
+        loader = DataLoader(session)
+        languages = loader.load_many(database.Language, [3, 1, 42, 3, 2])
+
+        assert [lang and lang.name for lang in languages] == [
+            'lang3',
+            'lang1',
+            None,
+            'lang3',
+            'lang2',
+        ]
+        assert loader.queries == 1
+        assert len(statements) == 1
+        assert ' IN (' in statements[0]
+
+        # NOTE: Loaded objects are in the identity map.
+        assert session.get(database.Language, 2) is languages[4]
+        assert len(statements) == 1
+
+        # NOTE: Both loaded and missing keys are remembered.
+        assert loader.load_many(database.Language, [1, 42]) == [
+            languages[1],
+            None,
+        ]
+        assert loader.queries == 1
+
+
+def test_load(database, engine, statements):
+    with Session(engine) as session:
+        known = session.get(database.Language, 5)
+        statements.clear()
+
+        loader = DataLoader(session)
+        pending = [loader.load(database.Language, pk) for pk in (4, 5, 6)]
+        other = loader.load(Translation, ('lt', 1))
+        assert repr(pending[0]) == 'PendingLoad(Language, (4,))'
+        assert statements == []
+
+        loader.dispatch()
+        assert loader.queries == 2
+        assert [item.result().id for item in pending] == [4, 5, 6]
+        assert pending[1].result() is known
+        assert other.result().text == 'vienas'
+        assert loader.queries == 2
+
+        assert loader.load(database.Language, 5).result() is known
+        assert loader.queries == 2
+
+        # NOTE: All lookups are satisfied from the identity map.
+        loader = DataLoader(session)
+        assert (
+            loader.load(database.Language, 6).result() is pending[2].result()
+        )
+        assert loader.queries == 0
+
+
+def test_chunks(database, engine, statements):
+    with Session(engine) as session:
+        loader = DataLoader(session, chunk_size=3)
+        languages = loader.load_many(database.Language, range(10, 0, -1))
+        assert [lang.id for lang in languages] == list(range(10, 0, -1))
+        assert loader.queries == 4
+
+
+def test_composite_key(engine, monkeypatch, statements):
+    monkeypatch.setattr(engine.dialect, 'insertmanyvalues_max_parameters', 3)
+
+    with Session(engine) as session:
+        loader = DataLoader(session)
+        keys = [('lt', 1), ('en', 1), ('en', 2)]
+        translations = loader.load_many(Translation, keys)
+        assert [item and item.text for item in translations] == [
+            'vienas',
+            'one',
+            None,
+        ]
+        # NOTE: One key (two parameters) per statement.
+        assert loader.queries == 3
+
+
+def test_key_types(database, engine, statements):
+    with Session(engine) as session:
+        loader = DataLoader(session)
+        languages = loader.load_many(database.Language, ['2', 2, 'x'])
+        assert languages[0].name == 'lang2'
+        assert languages[1] is languages[0]
+        assert languages[2] is None
+        assert loader.queries == 1
+
+        translation = loader.load(Translation, ('en', '1')).result()
+        assert translation.text == 'one'
+
+
+class Opaque(TypeEngine):
+    # NOTE: SQLAlchemy < 2.1 raises NotImplementedError for unknown types.
+    @property
+    def python_type(self):
+        raise NotImplementedError()
+
+
+@pytest.mark.parametrize(
+    'column_type, value, expected',
+    [
+        (Integer(), '1', 1),
+        (Integer(), 1, 1),
+        (Integer(), None, None),
+        (Integer(), 'x', 'x'),
+        (String(), 1, '1'),
+        (TypeEngine(), '1', '1'),
+        (Opaque(), '1', '1'),
+    ],
+)
+def test_convert(column_type, value, expected):
+    assert loader._convert(column_type, value) == expected
+
+
+def test_key_length_mismatch(engine):
+    mapper = inspect(Translation)
+    assert loader._normalize(mapper, 'en') == ('en',)
+    assert loader._normalize(mapper, ('en', '1')) == ('en', 1)
+
+
+class Languages:
+    def __init__(self, db):
+        self.db = db
+
+    def on_get(self, req, resp):
+        ids = req.get_param_as_list('id', transform=int)
+        languages = req.context.loader.load_many(self.db.Language, ids)
+        resp.media = [lang.name for lang in languages]
+
+
+def test_middleware(create_app, database, engine, statements):
+    manager = Manager(engine)
+    manager.session_options.data_loader = True
+
+    app = create_app(middleware=[manager.middleware])
+    app.add_route('/languages', Languages(database))
+    client = falcon.testing.TestClient(app)
+
+    resp = client.simulate_get('/languages', params={'id': [7, 2, 9]})
+    assert resp.json == ['lang7', 'lang2', 'lang9']
+    assert sum(' IN (' in statement for statement in statements) == 1
@@ -0,0 +1,198 @@
+import tracemalloc
+import warnings
+
+import falcon
+import falcon.testing
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy import insert
+from sqlalchemy import inspect
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from falcon_sqla import IdentityMapAction
+from falcon_sqla import Manager
+from falcon_sqla.memory import IdentityMapLimitExceeded
+from falcon_sqla.memory import IdentityMapUsage
+from falcon_sqla.memory import IdentityMapWarning
+
+
+@pytest.fixture
+def engine(database, tmp_path):
+    engine = create_engine(f'sqlite:///{tmp_path / "memory.db"}')
+    database.Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(database.Language),
+            [{'id': pk, 'name': f'lang{pk}'} for pk in range(1, 51)],
+        )
+    return engine
+
+
+@pytest.fixture
+def manager(engine):
+    return Manager(engine)
+
+
+@pytest.fixture
+def tracing_memory():
+    yield
+    tracemalloc.stop()
+
+
+class Languages:
+    def __init__(self, db):
+        self.db = db
+
+    def on_get(self, req, resp):
+        limit = req.get_param_as_int('limit', default=50)
+        stmt = select(self.db.Language).limit(limit)
+        resp.media = len(req.context.session.scalars(stmt).all())
+        req.context.usage_during_request = True
+
+
+@pytest.fixture
+def client(create_app, database, manager):
+    usages = []
+
+    class Recorder:
+        def process_response(self, req, resp, resource, req_succeeded):
+            usages.append(getattr(req.context, 'identity_map_usage', None))
+
+    app = create_app(middleware=[Recorder(), manager.middleware])
+    app.add_route('/languages', Languages(database))
+    client = falcon.testing.TestClient(app)
+    client.usages = usages
+    return client
+
+
+def test_usage():
+    usage = IdentityMapUsage()
+    assert usage.as_dict() == {
+        'objects': 0,
+        'memory': None,
+        'exceeded': False,
+        'expunged': 0,
+    }
+    assert repr(usage) == (
+        'IdentityMapUsage(objects=0, memory=None, exceeded=False)'
+    )
+
+
+def test_accounting(client, manager):
+    assert manager.identity_map_peaks == {}
+    manager.enable_identity_map_guard()
+
+    client.simulate_get('/languages', params={'limit': 20})
+    client.simulate_get('/languages', params={'limit': 5})
+    assert [usage.objects for usage in client.usages] == [20, 5]
+
+    (peak,) = manager.identity_map_peaks.values()
+    assert manager.identity_map_peaks == {'GET /languages': peak}
+    assert peak.as_dict() == {
+        'objects': 20,
+        'memory': None,
+        'exceeded': False,
+        'expunged': 0,
+    }
+
+
+def test_warn(client, manager):
+    manager.enable_identity_map_guard(limit=10)
+
+    with pytest.warns(IdentityMapWarning) as record:
+        client.simulate_get('/languages')
+    assert len(record) == 1
+    assert client.usages[0].exceeded
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        client.simulate_get('/languages', params={'limit': 10})
+    assert manager.identity_map_peaks['GET /languages'].exceeded
+
+
+def test_abort(client, database, manager):
+    manager.enable_identity_map_guard(limit=10, action='abort')
+    manager.enable_identity_map_guard(limit=10, action=IdentityMapAction.ABORT)
+
+    resp = client.simulate_get('/languages')
+    assert resp.status_code == 500
+    assert client.usages[0].exceeded
+
+    req = falcon.testing.create_req()
+    with pytest.raises(IdentityMapLimitExceeded) as exc_info:
+        with manager.session_scope(req, falcon.Response()) as session:
+            session.scalars(select(database.Language)).all()
+    assert (exc_info.value.limit, exc_info.value.size) == (10, 11)
+
+
+def test_expunge(database, manager):
+    manager.enable_identity_map_guard(
+        limit=10, action=IdentityMapAction.EXPUNGE
+    )
+
+    req = falcon.testing.create_req()
+    with manager.session_scope(req, falcon.Response()) as session:
+        languages = session.scalars(select(database.Language)).all()
+        assert len(session.identity_map) == 50
+
+        languages[0].name = 'Python'
+        session.delete(languages[1])
+
+        # NOTE: Pending changes are retained and autoflushed as usual.
+        session.execute(select(database.Language.id).limit(1)).all()
+        assert session.identity_map.values() == [languages[0]]
+        assert inspect(languages[0]).persistent
+        assert inspect(languages[1]).deleted
+
+    usage = req.context.identity_map_usage
+    assert (usage.objects, usage.expunged, usage.exceeded) == (50, 48, True)
+
+
+def test_track_memory(database, manager, tracing_memory):
+    guard = manager.enable_identity_map_guard(track_memory=True)
+    guard.memory_interval = 10
+
+    req = falcon.testing.create_req()
+    with manager.session_scope(req, falcon.Response()) as session:
+        languages = session.scalars(select(database.Language)).all()
+        assert len(languages) == 50
+
+    usage = req.context.identity_map_usage
+    assert usage.memory > 0
+
+    peak = IdentityMapUsage()
+    peak._merge(usage)
+    peak._merge(IdentityMapUsage())
+    assert peak.memory == usage.memory
+
+
+def test_untracked_sessions(database, engine, manager):
+    guard = manager.enable_identity_map_guard(
+        limit=10, action=IdentityMapAction.EXPUNGE
+    )
+    manager.enable_identity_map_guard(
+        limit=10, action=IdentityMapAction.EXPUNGE, track_memory=False
+    )
+    assert guard.finish(Session(engine)) is None
+
+    with manager.session_scope() as session:
+        languages = session.scalars(select(database.Language)).all()
+        session.scalars(select(database.Language)).all()
+        assert len(session.identity_map) == len(languages) == 50
+
+    req = falcon.testing.create_req()
+    with manager.session_scope(req, falcon.Response()) as session:
+        session.scalars(select(database.Language).limit(5)).all()
+        session.scalars(select(database.Language).limit(5)).all()
+    assert req.context.identity_map_usage.objects == 5
+    assert manager.identity_map_peaks == {}
+
+    # NOTE: Sessions obtained without a request are not accounted for.
+    other = falcon.testing.create_req()
+    manager.close_session(manager.get_session(), True, other)
+    assert not hasattr(other.context, 'identity_map_usage')
+
+    guard.action = IdentityMapAction.WARN
+    with manager.session_scope(req, falcon.Response()) as session:
+        session.scalars(select(database.Language).limit(5)).all()
@@ -1,4 +1,6 @@
 import io
+import os
+import tempfile
 
 import falcon
 import falcon.testing
@@ -40,6 +42,10 @@ class Languages:
 
         if req.get_param_as_bool('filelike'):
             resp.stream = io.BytesIO(b''.join(stream_names()))
+        elif req.get_param_as_bool('tempfile'):
+            resp.stream = tempfile.TemporaryFile()
+            resp.stream.write(b''.join(stream_names()))
+            resp.stream.seek(0)
         elif req.get_param_as_bool('iterable_as_stream'):
             resp.stream = iter(tuple(stream_names()))
         else:
@@ -181,3 +187,35 @@ def test_wrap_response_stream(tunable_client, wrap_stream, use_file_wrapper):
         assert history == [b'Pyt', b'hon\n', b'Rust\n', b'PHP\n']
     else:
         assert history == []
+
+
+@pytest.mark.parametrize('wrap_stream', [True, False])
+def test_wrap_response_stream_sendfile(tunable_client, wrap_stream):
+    class SendfileWrapper:
+        """Mimic servers that use sendfile() when the file has a fileno."""
+
+        def __init__(self, filelike, ignored_size=8192):
+            self.filelike = filelike
+
+        def __iter__(self):
+            fd = self.filelike.fileno()
+            served.append(fd)
+            while True:
+                chunk = os.read(fd, 4096)
+                if not chunk:
+                    break
+                yield chunk
+
+        def close(self):
+            self.filelike.close()
+
+    served = []
+
+    client = tunable_client({'wrap_response_stream': wrap_stream})
+    client.simulate_post('/languages', json={'name': 'Python'})
+    client.simulate_post('/languages', json={'name': 'Rust'})
+
+    resp = client.simulate_get('/names?tempfile', file_wrapper=SendfileWrapper)
+    assert resp.status_code == 200
+    assert resp.text == 'Python\nRust\n'
+    assert len(served) == 1
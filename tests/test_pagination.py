@@ -0,0 +1,268 @@
+import datetime
+import decimal
+import uuid
+
+import falcon
+import falcon.testing
+import pytest
+from sqlalchemy import Column
+from sqlalchemy import create_engine
+from sqlalchemy import DateTime
+from sqlalchemy import event
+from sqlalchemy import insert
+from sqlalchemy import Integer
+from sqlalchemy import Numeric
+from sqlalchemy import select
+from sqlalchemy import Uuid
+from sqlalchemy.orm import declarative_base
+
+from falcon_sqla import Manager
+from falcon_sqla import pagination
+from falcon_sqla.pagination import decode_token
+from falcon_sqla.pagination import encode_token
+from falcon_sqla.pagination import KeysetPaginator
+
+Base = declarative_base()
+
+
+class Event(Base):
+    __tablename__ = 'events'
+
+    id = Column(Integer, primary_key=True)
+    created = Column(DateTime, nullable=False)
+
+
+@pytest.fixture
+def engine(database, tmp_path):
+    engine = create_engine(f'sqlite:///{tmp_path / "pagination.db"}')
+    database.Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(database.Language),
+            [
+                {'id': pk, 'name': f'lang{pk:02}', 'created': pk // 3}
+                for pk in range(1, 26)
+            ],
+        )
+    return engine
+
+
+@pytest.fixture
+def statements(engine):
+    statements = []
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, *args):
+        statements.append((statement, parameters))
+
+    return statements
+
+
+class Languages:
+    def __init__(self, db, paginator):
+        self.db = db
+        self.paginator = paginator
+
+    def on_get(self, req, resp):
+        stmt = select(self.db.Language).order_by(self.db.Language.name)
+        page = self.paginator.paginate(req.context.session, stmt, req, resp)
+        resp.media = {
+            'ids': [language.id for language in page.items],
+            'next': page.next_token,
+        }
+
+    def on_get_names(self, req, resp):
+        stmt = select(self.db.Language.id, self.db.Language.name)
+        page = self.paginator.paginate(req.context.session, stmt, req, resp)
+        resp.media = page.items
+
+
+@pytest.fixture
+def client(create_app, database, engine):
+    def create_client(columns, **kwargs):
+        manager = Manager(engine)
+        paginator = KeysetPaginator(columns, **kwargs)
+        app = create_app(middleware=[manager.middleware])
+        resource = Languages(database, paginator)
+        app.add_route('/languages', resource)
+        app.add_route('/names', resource, suffix='names')
+        return falcon.testing.TestClient(app)
+
+    return create_client
+
+
+def test_pages(client, database, statements):
+    language = database.Language
+    client = client([language.created.desc(), language.id], page_size=10)
+
+    pages = []
+    url = '/languages?q=a&q=b'
+    while url:
+        resp = client.simulate_get(url)
+        pages.append(resp.json['ids'])
+        link = resp.headers.get('Link')
+        if link:
+            assert resp.json['next'] == resp.headers['X-Next-Cursor']
+            url, rel = link.split('; ')
+            assert rel == 'rel=next'
+            url = url.strip('<>')
+            assert url == f'/languages?q=a&q=b&cursor={resp.json["next"]}'
+        else:
+            assert resp.json['next'] is None
+            assert 'X-Next-Cursor' not in resp.headers
+            url = None
+
+    expected = sorted(range(1, 26), key=lambda pk: (-(pk // 3), pk))
+    assert pages == [expected[:10], expected[10:20], expected[20:]]
+
+    # NOTE: Deep pages are seeked rather than skipped; pysqlite renders
+    #   LIMIT ? OFFSET ?, but the offset is always zero.
+    statement, parameters = statements[-1]
+    assert ' > ' in statement and ' < ' in statement
+    assert statement.endswith('LIMIT ? OFFSET ?')
+    assert parameters[-2:] == (11, 0)
+
+
+def test_limit(client, database):
+    client = client([database.Language.id], token_header=None)
+
+    resp = client.simulate_get('/languages')
+    assert resp.json == {'ids': list(range(1, 26)), 'next': None}
+
+    resp = client.simulate_get('/languages', params={'limit': 20})
+    assert resp.json['ids'] == list(range(1, 21))
+    assert 'X-Next-Cursor' not in resp.headers
+    assert resp.headers['Link'].startswith('</languages?limit=20&cursor=')
+
+    resp = client.simulate_get('/languages', params={'limit': 501})
+    assert resp.status_code == 400
+
+
+def test_multiple_columns(client, database):
+    client = client([database.Language.name.asc()], page_size=2)
+
+    resp = client.simulate_get('/names')
+    assert resp.json == [[1, 'lang01'], [2, 'lang02']]
+    cursor = resp.headers['X-Next-Cursor']
+    assert decode_token(cursor) == ['lang02']
+
+    resp = client.simulate_get('/names', params={'cursor': cursor})
+    assert resp.json == [[3, 'lang03'], [4, 'lang04']]
+
+
+@pytest.mark.parametrize(
+    'token',
+    [
+        '!',
+        'bm90IGpzb24',
+        encode_token([]),
+        encode_token([1, 2]),
+        'eyJhIjoxfQ',
+        encode_token([{'a': 1}]),
+        encode_token([[1]]),
+    ],
+)
+def test_invalid_token(client, database, token):
+    client = client([database.Language.id])
+
+    resp = client.simulate_get('/languages', params={'cursor': token})
+    assert resp.status_code == 400
+    assert 'cursor' in resp.json['title'] + resp.json['description']
+
+
+def test_paginator_repr(database, engine):
+    paginator = KeysetPaginator([database.Language.id], page_size=3)
+    req = falcon.testing.create_req()
+    with engine.connect() as conn:
+        page = paginator.paginate(
+            conn, select(database.Language.name), req, falcon.Response()
+        )
+    assert page.items == ['lang01', 'lang02', 'lang03']
+    assert repr(page) == f'KeysetPage(items=3, next_token={page.next_token!r})'
+
+    with pytest.raises(ValueError):
+        KeysetPaginator([])
+
+
+def test_datetime_keys(create_app, engine):
+    start = datetime.datetime(2025, 1, 1, 12, 0)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Event),
+            [
+                {'id': pk, 'created': start + datetime.timedelta(hours=pk)}
+                for pk in range(1, 6)
+            ],
+        )
+
+    paginator = KeysetPaginator([Event.created.desc(), Event.id], page_size=2)
+
+    class Events:
+        def on_get(self, req, resp):
+            stmt = select(Event.id)
+            page = paginator.paginate(req.context.session, stmt, req, resp)
+            resp.media = {'ids': page.items, 'next': page.next_token}
+
+    app = create_app(middleware=[Manager(engine).middleware])
+    app.add_route('/events', Events())
+    client = falcon.testing.TestClient(app)
+
+    resp = client.simulate_get('/events')
+    assert resp.json['ids'] == [5, 4]
+    assert decode_token(resp.json['next']) == ['2025-01-01T16:00:00', 4]
+
+    resp = client.simulate_get('/events', params={'cursor': resp.json['next']})
+    assert resp.json['ids'] == [3, 2]
+
+    for values in (['yesterday', 1], [1, 1], ['2025-01-01T16:00:00', 'x']):
+        resp = client.simulate_get(
+            '/events', params={'cursor': encode_token(values)}
+        )
+        assert resp.status_code == 400
+
+
+def test_encode_values():
+    token = encode_token(
+        [
+            datetime.date(2025, 1, 2),
+            decimal.Decimal('1.50'),
+            uuid.UUID(int=1),
+        ]
+    )
+    assert decode_token(token) == [
+        '2025-01-02',
+        '1.50',
+        '00000000-0000-0000-0000-000000000001',
+    ]
+
+    with pytest.raises(TypeError):
+        encode_token([object()])
+
+
+@pytest.mark.parametrize(
+    'column, value, expected',
+    [
+        (Event.id, '1', 1),
+        (Event.id, None, None),
+        (Event.created, '2025-01-01', datetime.datetime(2025, 1, 1)),
+        (Column('price', Numeric), '1.5', decimal.Decimal('1.5')),
+        ('id', 'x', 'x'),
+    ],
+)
+def test_decode_value(column, value, expected):
+    assert pagination._decode_value(column, value) == expected
+
+
+@pytest.mark.parametrize(
+    'column, value',
+    [
+        (Event.id, 'x'),
+        (Event.created, 1),
+        (Column('price', Numeric), 'x'),
+        (Column('ref', Uuid), 1),
+    ],
+)
+def test_decode_invalid_value(column, value):
+    with pytest.raises(ValueError):
+        pagination._decode_value(column, value)
@@ -0,0 +1,150 @@
+import sqlite3
+
+import falcon
+import falcon.testing
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy import event
+from sqlalchemy import select
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from falcon_sqla import Manager
+from falcon_sqla.ping import AdaptivePrePing
+from falcon_sqla.ping import PrePingStats
+
+
+@pytest.fixture
+def engine(tmp_path):
+    return create_engine(f'sqlite:///{tmp_path / "ping.db"}')
+
+
+def query(engine, times=1):
+    for _ in range(times):
+        with engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+
+
+def test_pre_ping_stats():
+    stats = PrePingStats()
+    assert stats.as_dict() == {
+        'checkouts': 0,
+        'pings': 0,
+        'saved': 0,
+        'failed': 0,
+    }
+    assert repr(stats) == (
+        'PrePingStats(checkouts=0, pings=0, saved=0, failed=0)'
+    )
+
+
+def test_pings_saved(engine):
+    pre_ping = AdaptivePrePing()
+    pre_ping.attach(engine)
+    pre_ping.attach(engine)
+
+    query(engine, 5)
+    assert pre_ping.stats[engine].as_dict() == {
+        'checkouts': 4,
+        'pings': 0,
+        'saved': 4,
+        'failed': 0,
+    }
+
+
+def test_idle_connections_pinged(engine):
+    pre_ping = AdaptivePrePing(idle_threshold=-1)
+    pre_ping.attach(engine)
+
+    query(engine, 3)
+    stats = pre_ping.stats[engine]
+    assert (stats.checkouts, stats.pings, stats.saved) == (2, 2, 0)
+
+
+def test_failed_ping(engine, monkeypatch):
+    pre_ping = AdaptivePrePing(idle_threshold=-1)
+    pre_ping.attach(engine)
+    query(engine)
+
+    def do_ping(dbapi_connection):
+        raise sqlite3.OperationalError('disk I/O error')
+
+    monkeypatch.setattr(engine.dialect, 'do_ping', do_ping)
+    monkeypatch.setattr(engine.dialect, 'is_disconnect', lambda *args: True)
+
+    # NOTE: The pool is invalidated, and a fresh connection is used instead.
+    query(engine)
+    stats = pre_ping.stats[engine]
+    assert (stats.pings, stats.failed) == (1, 1)
+    assert engine in pre_ping._disconnected
+
+
+def test_failed_ping_not_disconnect(engine, monkeypatch):
+    pre_ping = AdaptivePrePing(idle_threshold=-1)
+    pre_ping.attach(engine)
+    query(engine)
+
+    def do_ping(dbapi_connection):
+        raise sqlite3.OperationalError('syntax error')
+
+    monkeypatch.setattr(engine.dialect, 'do_ping', do_ping)
+
+    with pytest.raises(OperationalError):
+        query(engine)
+    assert pre_ping.stats[engine].failed == 1
+
+
+def test_recent_disconnect(engine, monkeypatch):
+    pre_ping = AdaptivePrePing()
+    pre_ping.attach(engine)
+    query(engine)
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, *args):
+        if statement == 'SELECT 2':
+            raise sqlite3.OperationalError('server has gone away')
+
+    monkeypatch.setattr(engine.dialect, 'is_disconnect', lambda *args: True)
+    with pytest.raises(OperationalError):
+        with engine.connect() as conn:
+            conn.execute(text('SELECT 2'))
+    monkeypatch.undo()
+
+    # NOTE: The failed connection has been invalidated, so the first
+    #   checkout gets a fresh connection; the second one is pinged.
+    query(engine, 2)
+    stats = pre_ping.stats[engine]
+    assert stats.pings == 1
+
+    pre_ping.error_window = -1
+    query(engine)
+    assert stats.pings == 1
+
+
+class Languages:
+    def __init__(self, db):
+        self.db = db
+
+    def on_get(self, req, resp):
+        stmt = select(self.db.Language.name)
+        resp.media = req.context.session.execute(stmt).scalars().all()
+
+
+def test_manager(create_app, database):
+    manager = Manager(database.write_engine)
+    assert manager.pre_ping_stats == {}
+
+    pre_ping = manager.enable_adaptive_pre_ping(idle_threshold=60)
+    assert manager.enable_adaptive_pre_ping() is pre_ping
+    manager.add_engine(database.read_engine, 'r')
+
+    app = create_app(middleware=[manager.middleware])
+    app.add_route('/languages', Languages(database))
+    client = falcon.testing.TestClient(app)
+    for _ in range(3):
+        assert client.simulate_get('/languages').status_code == 200
+
+    stats = manager.pre_ping_stats
+    assert set(stats) == {database.write_engine, database.read_engine}
+    assert sum(item.saved for item in stats.values()) >= 1
+    assert sum(item.pings for item in stats.values()) == 0
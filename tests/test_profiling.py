@@ -0,0 +1,265 @@
+import cProfile
+import json
+import os
+import threading
+
+import falcon
+import falcon.testing
+import pytest
+from sqlalchemy import event
+from sqlalchemy import select
+from sqlalchemy import text
+
+from falcon_sqla import Manager
+from falcon_sqla import profiling
+
+
+class Languages:
+    def __init__(self, db):
+        self.db = db
+        self.profiles = []
+
+    def on_get(self, req, resp):
+        self.profiles.append(getattr(req.context, 'profile', None))
+        stmt = select(self.db.Language.name)
+        resp.media = req.context.session.execute(stmt).scalars().all()
+
+    def on_post(self, req, resp):
+        self.profiles.append(getattr(req.context, 'profile', None))
+        req.context.session.add(self.db.Language(name=req.media['name']))
+
+    def on_get_broken(self, req, resp):
+        self.profiles.append(getattr(req.context, 'profile', None))
+        req.context.session.execute(text('SELECT * FROM nonexistent'))
+
+
+class Items:
+    def on_get(self, req, resp):
+        resp.media = req.context.connection.execute(text('SELECT 1')).scalar()
+
+
+@pytest.fixture(autouse=True)
+def per_thread_profiling(monkeypatch):
+    # NOTE: Other tests might leave (idle) worker threads behind.
+    monkeypatch.setattr(profiling, '_INTERPRETER_WIDE', False)
+
+
+@pytest.fixture
+def manager(database):
+    return Manager(database.write_engine)
+
+
+@pytest.fixture
+def resource(database):
+    return Languages(database)
+
+
+@pytest.fixture
+def client(create_app, manager, resource):
+    app = create_app(middleware=[manager.middleware])
+    app.add_route('/languages', resource)
+    app.add_route('/broken', resource, suffix='broken')
+    return falcon.testing.TestClient(app)
+
+
+def reports(path):
+    return sorted(path.glob('*.json')) if path.exists() else []
+
+
+def test_header_trigger(client, manager, resource, tmp_path):
+    directory = tmp_path / 'profiles'
+    profiler = manager.enable_profiling(str(directory), token='secret')
+    assert manager.enable_profiling(str(directory), token='s3cr3t') is (
+        profiler
+    )
+    assert manager.profiler is profiler
+
+    client.simulate_get('/languages')
+    client.simulate_get('/languages', headers={'X-Profile-Token': 'secret'})
+    assert resource.profiles == [None, None]
+    assert reports(directory) == []
+
+    client.simulate_post(
+        '/languages',
+        json={'name': 'Python'},
+        headers={'X-Profile-Token': 's3cr3t'},
+    )
+    resp = client.simulate_get(
+        '/languages', headers={'X-Profile-Token': 's3cr3t'}
+    )
+    assert resp.json == ['Python']
+
+    post, get = resource.profiles[2:]
+    assert (post.method, get.method) == ('POST', 'GET')
+    assert {str(path) for path in reports(directory)} == {
+        post.report_path,
+        get.report_path,
+    }
+
+    # NOTE: The INSERT is flushed upon committing the session.
+    assert [item.statement.split()[0] for item in post.statements] == [
+        'INSERT'
+    ]
+
+    with open(get.report_path) as fp:
+        report = json.load(fp)
+    assert report['method'] == 'GET'
+    assert report['path'] == '/languages'
+    assert report['status'] == 200
+    assert report['wall_time'] >= report['db_time'] > 0
+    assert 0 < report['db_share'] <= 1
+
+    (statement,) = report['statements']
+    assert statement['statement'].startswith('SELECT languages.name')
+    assert 'test_profiling.py' in statement['caller']
+    assert '(on_get)' in statement['caller']
+    assert list(report['callers']) == [statement['caller']]
+    assert report['callers'][statement['caller']]['statements'] == 1
+
+    functions = [item['function'] for item in report['functions']]
+    assert any('(on_get)' in item for item in functions)
+    assert len(functions) <= 40
+    assert os.path.exists(report['profile'])
+
+
+def test_rule_and_sampling(client, manager, resource, tmp_path):
+    profiler = manager.enable_profiling(
+        str(tmp_path), rule=lambda req: req.get_param_as_bool('profile')
+    )
+
+    client.simulate_get('/languages')
+    client.simulate_get('/languages', params={'profile': True})
+    assert resource.profiles[0] is None
+    assert resource.profiles[1] is not None
+
+    profiler.rule = None
+    profiler.sample_rate = 1.0
+    client.simulate_get('/languages')
+    assert resource.profiles[2] is not None
+    assert len(reports(tmp_path)) == 2
+
+
+def test_failed_statement(client, manager, resource, tmp_path):
+    manager.enable_profiling(str(tmp_path), sample_rate=1.0)
+
+    resp = client.simulate_get('/broken')
+    assert resp.status_code == 500
+
+    (profile,) = resource.profiles
+    (statement,) = profile.statements
+    assert statement.duration is None
+    assert repr(statement) == (
+        "ProfiledStatement(statement='SELECT * FROM nonexistent', "
+        'duration=None)'
+    )
+    assert profile.db_time == 0.0
+
+    with open(profile.report_path) as fp:
+        assert json.load(fp)['status'] == 500
+
+
+def test_one_request_at_a_time(client, manager, resource, tmp_path):
+    profiler = manager.enable_profiling(str(tmp_path), sample_rate=1.0)
+
+    profiler._lock.acquire()
+    client.simulate_get('/languages')
+    profiler._lock.release()
+    assert resource.profiles == [None]
+
+    client.simulate_get('/languages')
+    assert resource.profiles[1] is not None
+    assert profiler._lock.acquire(blocking=False)
+
+
+def test_other_profiler_active(
+    client, manager, resource, tmp_path, monkeypatch
+):
+    class ActiveProfile(cProfile.Profile):
+        def enable(self):
+            raise ValueError('Another profiling tool is already active')
+
+    monkeypatch.setattr(profiling.cProfile, 'Profile', ActiveProfile)
+    profiler = manager.enable_profiling(str(tmp_path), sample_rate=1.0)
+
+    client.simulate_get('/languages')
+    (profile,) = resource.profiles
+    assert len(profile.statements) == 1
+    assert profile.functions(10) == []
+
+    with open(profile.report_path) as fp:
+        assert 'profile' not in json.load(fp)
+    assert profiler._lock.acquire(blocking=False)
+
+
+def test_multithreaded_interpreter_wide(
+    client, manager, resource, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(profiling, '_INTERPRETER_WIDE', True)
+    profiler = manager.enable_profiling(str(tmp_path), sample_rate=1.0)
+
+    stopped = threading.Event()
+    thread = threading.Thread(target=stopped.wait)
+    thread.start()
+    try:
+        with pytest.warns(RuntimeWarning, match='per thread'):
+            client.simulate_get('/languages')
+    finally:
+        stopped.set()
+        thread.join()
+
+    (profile,) = resource.profiles
+    assert len(profile.statements) == 1
+    assert profile.functions(10) == []
+    assert profiler._lock.acquire(blocking=False)
+
+
+def test_listeners_removed(database, manager, tmp_path):
+    profiler = manager.enable_profiling(str(tmp_path))
+    req = falcon.testing.create_req()
+    resp = falcon.Response()
+
+    session = manager.get_session(req, resp)
+    profile = profiler.start(req, session)
+    connection = session.connection()
+    session.execute(select(database.Language)).all()
+    assert event.contains(session, 'after_begin', profile._after_begin)
+
+    # NOTE: A new transaction begins on a new connection.
+    session.release()
+    session.execute(select(database.Language)).all()
+
+    profile.stop()
+    manager.close_session(session, True, req, resp)
+    profiler.finish(profile, resp)
+    assert not event.contains(session, 'after_begin', profile._after_begin)
+    assert not event.contains(
+        connection, 'before_cursor_execute', profile._before_cursor_execute
+    )
+    assert len(profile.statements) == 2
+
+
+def test_connection_middleware(create_app, manager, tmp_path):
+    manager.enable_profiling(str(tmp_path), sample_rate=1.0)
+    app = create_app(middleware=[manager.connection_middleware])
+    app.add_route('/items', Items())
+    client = falcon.testing.TestClient(app)
+
+    assert client.simulate_get('/items').json == 1
+    (path,) = reports(tmp_path)
+    with open(path) as fp:
+        statements = json.load(fp)['statements']
+    assert [item['statement'] for item in statements] == ['SELECT 1']
+
+
+def test_not_finished(manager, tmp_path):
+    profiler = manager.enable_profiling(str(tmp_path))
+    req = falcon.testing.create_req()
+    with manager.connection_scope(req, falcon.Response()) as connection:
+        profile = profiler.start(req, connection)
+        profile.stop()
+        profile.stop()
+        connection.execute(text('SELECT 1'))
+
+    report = profile.as_dict()
+    assert (report['wall_time'], report['db_share']) == (None, None)
+    assert report['statements'][0]['duration'] > 0
@@ -0,0 +1,246 @@
+import falcon
+import falcon.testing
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy import event
+from sqlalchemy import func
+from sqlalchemy import select
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from falcon_sqla import Manager
+from falcon_sqla import readonly
+from falcon_sqla import ReadOnlyMode
+
+
+def is_autocommit(session):
+    # NOTE: pysqlite's autocommit mode is not reflected by any PRAGMA.
+    dbapi_connection = session.connection().connection.dbapi_connection
+    return dbapi_connection.isolation_level is None
+
+
+class Languages:
+    def __init__(self, db):
+        self.db = db
+
+    def on_get(self, req, resp):
+        if req.get_param('mode') == 'none':
+            req.context.read_only_mode = None
+        elif req.get_param('mode'):
+            req.context.read_only_mode = ReadOnlyMode(req.get_param('mode'))
+
+        session = req.context.session
+        if req.get_param_as_bool('add'):
+            session.add(self.db.Language(name='Added'))
+
+        names = session.execute(select(self.db.Language.name)).scalars().all()
+        session.execute(text('SELECT 1'))
+        resp.media = {
+            'names': names,
+            'autocommit': is_autocommit(session),
+            'query_only': session.execute(text('PRAGMA query_only')).scalar(),
+        }
+
+    def on_post(self, req, resp):
+        session = req.context.session
+        session.add(self.db.Language(name=req.media['name']))
+        session.flush()
+        resp.media = {
+            'autocommit': is_autocommit(session),
+        }
+
+
+@pytest.fixture
+def engine(database, tmp_path):
+    engine = create_engine(f'sqlite:///{tmp_path / "read_only.db"}')
+    database.Base.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture
+def commits():
+    return []
+
+
+@pytest.fixture
+def manager(engine, commits):
+    manager = Manager(engine)
+
+    @event.listens_for(manager._Session, 'after_commit')
+    def after_commit(session):
+        commits.append(session)
+
+    return manager
+
+
+@pytest.fixture
+def client(create_app, database, manager):
+    def handle_exception(req, resp, ex, params):
+        resp.status = falcon.HTTP_500
+        resp.media = {'error': str(ex)}
+
+    app = create_app(middleware=[manager.middleware])
+    app.add_route('/languages', Languages(database))
+    app.add_error_handler(Exception, handle_exception)
+    return falcon.testing.TestClient(app)
+
+
+def count_languages(database, engine):
+    with Session(engine) as session:
+        return session.scalar(select(func.count(database.Language.id)))
+
+
+def test_default(client, commits):
+    resp = client.simulate_get('/languages')
+    assert resp.json == {
+        'names': [],
+        'autocommit': False,
+        'query_only': 0,
+    }
+    assert len(commits) == 1
+
+
+def test_autocommit(client, manager, commits):
+    manager.session_options.read_only_mode = ReadOnlyMode.AUTOCOMMIT
+    client.simulate_post('/languages', json={'name': 'Python'})
+    assert len(commits) == 1
+
+    for _ in range(2):
+        resp = client.simulate_get('/languages')
+        assert resp.json == {
+            'names': ['Python'],
+            'autocommit': True,
+            'query_only': 0,
+        }
+    assert len(commits) == 1
+
+    # NOTE: Unsafe methods are unaffected.
+    resp = client.simulate_post('/languages', json={'name': 'Rust'})
+    assert resp.json == {'autocommit': False}
+    assert len(commits) == 2
+
+
+def test_autocommit_with_changes(client, database, engine, manager, commits):
+    manager.session_options.read_only_mode = ReadOnlyMode.AUTOCOMMIT
+
+    resp = client.simulate_get('/languages', params={'add': True})
+    assert resp.status_code == 200
+    assert resp.json['names'] == ['Added']
+    assert len(commits) == 1
+    assert count_languages(database, engine) == 1
+
+
+def test_read_only_transaction(client, database, engine, manager, commits):
+    manager.session_options.read_only_mode = ReadOnlyMode.READ_ONLY_TRANSACTION
+
+    resp = client.simulate_get('/languages')
+    assert resp.json == {
+        'names': [],
+        'autocommit': False,
+        'query_only': 1,
+    }
+    assert commits == []
+
+    resp = client.simulate_get('/languages', params={'add': True})
+    assert resp.status_code == 500
+    assert 'readonly' in resp.json['error']
+
+    # NOTE: PRAGMA query_only is reset when the connection is checked in.
+    resp = client.simulate_post('/languages', json={'name': 'Python'})
+    assert resp.status_code == 200
+    assert count_languages(database, engine) == 1
+
+    with engine.connect() as conn:
+        assert conn.execute(text('PRAGMA query_only')).scalar() == 0
+
+
+@pytest.mark.parametrize(
+    'default,mode,expected',
+    [
+        (None, 'autocommit', True),
+        (ReadOnlyMode.AUTOCOMMIT, 'none', False),
+    ],
+)
+def test_override_per_request(client, manager, default, mode, expected):
+    manager.session_options.read_only_mode = default
+
+    resp = client.simulate_get('/languages', params={'mode': mode})
+    assert resp.json['autocommit'] is expected
+
+
+def test_multiple_engines(create_app, database, engine, commits):
+    manager = Manager(engine)
+    manager.add_engine(engine.execution_options(), 'r')
+    manager.session_options.read_only_mode = ReadOnlyMode.AUTOCOMMIT
+
+    req = falcon.testing.create_req()
+    resp = falcon.Response()
+    with manager.session_scope(req, resp) as session:
+        session.execute(select(database.Language)).all()
+        assert is_autocommit(session)
+
+    # NOTE: The listeners are only registered once.
+    manager._listen_read_only_events()
+
+
+def test_plain_session(engine):
+    manager = Manager(engine, session_cls=Session)
+    manager.session_options.read_only_mode = ReadOnlyMode.AUTOCOMMIT
+
+    req = falcon.testing.create_req()
+    with manager.session_scope(req, falcon.Response()) as session:
+        assert not is_autocommit(session)
+
+
+def test_execution_options():
+    mode = ReadOnlyMode.READ_ONLY_TRANSACTION
+    assert readonly.execution_options(mode, 'postgresql') == {
+        'postgresql_readonly': True,
+        readonly.MODE_OPTION: mode,
+    }
+    assert readonly.execution_options(mode, 'oracle') == {
+        readonly.MODE_OPTION: mode,
+    }
+
+
+def test_begin_read_only_unsupported_dialect(engine, monkeypatch):
+    monkeypatch.delitem(readonly.READ_ONLY_STATEMENTS, 'sqlite')
+
+    with engine.connect() as conn:
+        readonly.begin_read_only(conn)
+        assert conn.execute(text('PRAGMA query_only')).scalar() == 0
+
+
+def test_reset_invalidated_connection(engine):
+    with engine.connect() as conn:
+        conn.execute(text('SELECT 1'))
+        readonly.begin_read_only(conn)
+        conn.invalidate()
+
+    with engine.connect() as conn:
+        assert conn.execute(text('PRAGMA query_only')).scalar() == 0
+
+
+def test_begin_read_only_other_dialect(engine, monkeypatch):
+    monkeypatch.setattr(engine.dialect, 'name', 'mysql')
+    monkeypatch.setitem(readonly.READ_ONLY_STATEMENTS, 'mysql', 'SELECT 1')
+
+    with engine.connect() as conn:
+        readonly.begin_read_only(conn)
+        assert readonly._QUERY_ONLY_KEY not in conn.info
+
+
+def test_commit_pending_changes(database, engine, manager, commits):
+    manager.session_options.read_only_mode = ReadOnlyMode.AUTOCOMMIT
+
+    req = falcon.testing.create_req()
+    with manager.session_scope(req, falcon.Response()) as session:
+        session.execute(select(database.Language)).all()
+        session.add(database.Language(name='Pending'))
+    assert len(commits) == 1
+
+    # NOTE: Sessions without any transaction are committed as usual.
+    with manager.session_scope(req, falcon.Response()):
+        pass
+    assert len(commits) == 2
+    assert count_languages(database, engine) == 1
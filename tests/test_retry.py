@@ -0,0 +1,304 @@
+import sqlite3
+
+import falcon
+import falcon.testing
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy import event
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from falcon_sqla import Manager
+from falcon_sqla.retry import is_transient_error
+from falcon_sqla.retry import RetryStats
+
+
+class FakeError(Exception):
+    pass
+
+
+def _error(orig, **kwargs):
+    return OperationalError('SELECT 1', {}, orig, **kwargs)
+
+
+def _pg_error(code, message='error'):
+    orig = FakeError(message)
+    orig.pgcode = code
+    return _error(orig)
+
+
+def _pg3_error(code):
+    orig = FakeError('error')
+    orig.sqlstate = code
+    return _error(orig)
+
+
+@pytest.mark.parametrize(
+    'error,dialects,expected',
+    [
+        (ValueError('database is locked'), None, False),
+        (_error(FakeError('boom'), connection_invalidated=True), (), True),
+        (_error(FakeError('database is locked')), None, True),
+        (_error(FakeError('database is locked')), ('sqlite',), True),
+        (_error(FakeError('database is locked')), ('postgresql',), False),
+        (_error(FakeError('database table is locked')), ('sqlite',), True),
+        (_error(FakeError('no such table: x')), ('sqlite',), False),
+        (_pg_error('40001'), ('postgresql',), True),
+        (_pg_error('40P01'), ('postgresql',), True),
+        (_pg_error('23505'), ('postgresql',), False),
+        (_pg3_error('57P01'), ('postgresql',), True),
+        (
+            _pg_error(None, 'could not connect to server'),
+            ('postgresql',),
+            True,
+        ),
+        (_pg_error(None, 'syntax error'), ('postgresql',), False),
+        (_error(FakeError(1213, 'Deadlock found')), ('mysql',), True),
+        (_error(FakeError(1062, 'Duplicate entry')), ('mariadb',), False),
+        (_error(FakeError()), ('mysql',), False),
+        (_error(FakeError('database is locked')), ('oracle',), False),
+    ],
+)
+def test_is_transient_error(error, dialects, expected):
+    if dialects is None:
+        assert is_transient_error(error) is expected
+    else:
+        assert is_transient_error(error, dialects) is expected
+
+
+def test_retry_stats():
+    stats = RetryStats()
+    assert stats.as_dict() == {
+        'retries': 0,
+        'recovered': 0,
+        'exhausted': 0,
+        'backoff': 0.0,
+    }
+    assert repr(stats) == 'RetryStats(retries=0, recovered=0, exhausted=0)'
+
+
+def make_flaky(engine, failures):
+    state = {'remaining': failures}
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, *args):
+        if state['remaining'] and statement.lstrip().startswith('SELECT'):
+            state['remaining'] -= 1
+            raise sqlite3.OperationalError('database is locked')
+
+    return engine
+
+
+@pytest.fixture
+def engines(database, tmp_path):
+    uri = f'sqlite:///{tmp_path / "retry.db"}'
+
+    primary = create_engine(uri)
+    database.Base.metadata.create_all(primary)
+    with primary.begin() as conn:
+        conn.execute(
+            database.Language.__table__.insert(), [{'name': 'Python'}]
+        )
+
+    broken = make_flaky(create_engine(uri), float('inf'))
+    healthy = create_engine(uri)
+    return primary, broken, healthy
+
+
+@pytest.fixture
+def manager(engines, monkeypatch):
+    primary, broken, healthy = engines
+
+    manager = Manager(primary)
+    manager.session_options.read_from_rw_engines = False
+    manager.session_options.retry_attempts = 2
+    manager.session_options.retry_backoff = 0
+    manager.add_engine(broken, 'r')
+    manager.add_engine(healthy, 'r')
+
+    # NOTE: Always start with the first eligible engine (i.e., the broken one).
+    monkeypatch.setattr(
+        'falcon_sqla.manager.random.choice', lambda seq: seq[0]
+    )
+    return manager
+
+
+class Languages:
+    def __init__(self, db, manager):
+        self.db = db
+        self.manager = manager
+
+    def on_get(self, req, resp):
+        session = req.context.session
+        if req.get_param_as_bool('add'):
+            session.add(self.db.Language(name='Rust'))
+
+        stmt = select(self.db.Language.name).order_by(self.db.Language.id)
+        resp.media = session.execute(stmt).scalars().all()
+
+    def on_get_unit(self, req, resp):
+        def work(session):
+            stmt = select(self.db.Language.name)
+            return session.execute(stmt).scalars().all()
+
+        resp.media = self.manager.run_in_session(work, req, resp)
+
+
+@pytest.fixture
+def client(create_app, database, manager):
+    def handle_exception(req, resp, ex, params):
+        resp.status = falcon.HTTP_500
+        resp.media = {'error': type(ex).__name__}
+
+    languages = Languages(database, manager)
+
+    app = create_app(middleware=[manager.middleware])
+    app.add_route('/languages', languages)
+    app.add_route('/unit', languages, suffix='unit')
+    app.add_error_handler(Exception, handle_exception)
+    return falcon.testing.TestClient(app)
+
+
+def test_failover_read(client, manager):
+    for _ in range(3):
+        resp = client.simulate_get('/languages')
+        assert resp.status_code == 200
+        assert resp.json == ['Python']
+
+    assert manager.retry_stats.as_dict() == {
+        'retries': 3,
+        'recovered': 3,
+        'exhausted': 0,
+        'backoff': 0.0,
+    }
+
+
+def test_no_retry_with_changes(client, manager):
+    resp = client.simulate_get('/languages?add')
+    assert resp.status_code == 500
+    assert manager.retry_stats.retries == 0
+
+
+def test_retries_exhausted(client, engines, manager):
+    primary, broken, healthy = engines
+    make_flaky(healthy, float('inf'))
+
+    resp = client.simulate_get('/languages')
+    assert resp.status_code == 500
+    assert resp.json == {'error': 'OperationalError'}
+    assert manager.retry_stats.retries == 2
+    assert manager.retry_stats.exhausted == 1
+
+
+def test_retries_disabled(client, manager):
+    manager.session_options.retry_attempts = 0
+
+    for path in ('/languages', '/unit'):
+        resp = client.simulate_get(path)
+        assert resp.status_code == 500
+    assert manager.retry_stats.retries == 0
+    assert manager.retry_stats.exhausted == 0
+
+
+def test_run_in_session_request(client, manager):
+    resp = client.simulate_get('/unit')
+    assert resp.status_code == 200
+    assert resp.json == ['Python']
+
+    assert manager.retry_stats.retries == 1
+    assert manager.retry_stats.recovered == 1
+
+
+def test_run_in_session_idempotent(database, engines):
+    primary, _, _ = engines
+    manager = Manager(make_flaky(primary, 1))
+    manager.session_options.retry_attempts = 1
+    manager.session_options.retry_backoff = 0
+
+    def work(session):
+        return session.execute(select(database.Language.name)).scalar_one()
+
+    with pytest.raises(OperationalError):
+        manager.run_in_session(work)
+
+    make_flaky(primary, 1)
+    assert manager.run_in_session(work, idempotent=True) == 'Python'
+    assert manager.retry_stats.recovered == 1
+
+
+def test_run_in_session_non_transient(engines):
+    primary, _, _ = engines
+    manager = Manager(primary)
+    manager.session_options.retry_attempts = 3
+
+    def work(session):
+        return 1 / 0
+
+    with pytest.raises(ZeroDivisionError):
+        manager.run_in_session(work, idempotent=True)
+    assert manager.retry_stats.retries == 0
+
+
+def test_healthy_read(client, manager, monkeypatch):
+    monkeypatch.setattr(
+        'falcon_sqla.manager.random.choice', lambda seq: seq[-1]
+    )
+
+    resp = client.simulate_get('/languages')
+    assert resp.status_code == 200
+    assert manager.retry_stats.retries == 0
+
+
+def test_run_in_session_plain_session(database, engines):
+    primary, _, _ = engines
+    manager = Manager(make_flaky(primary, 1), session_cls=Session)
+    manager.session_options.retry_attempts = 1
+    manager.session_options.retry_backoff = 0
+
+    def work(session):
+        return session.execute(select(database.Language.name)).scalar_one()
+
+    assert manager.run_in_session(work, idempotent=True) == 'Python'
+    assert manager.run_in_session(work, idempotent=True) == 'Python'
+    assert manager.retry_stats.retries == 1
+    assert manager.retry_stats.recovered == 1
+
+
+def test_failover_single_engine(create_app, database, engines):
+    primary, _, _ = engines
+    manager = Manager(make_flaky(primary, 1))
+    manager.session_options.retry_attempts = 1
+    manager.session_options.retry_backoff = 0
+
+    app = create_app(middleware=[manager.middleware])
+    app.add_route('/languages', Languages(database, manager))
+    client = falcon.testing.TestClient(app)
+
+    resp = client.simulate_get('/languages')
+    assert resp.status_code == 200
+    assert resp.json == ['Python']
+    assert manager.retry_stats.recovered == 1
+
+
+def test_run_in_session_excludes_failing_bind(
+    database, engines, manager, monkeypatch
+):
+    primary, broken, healthy = engines
+    picks = [healthy, broken]
+    monkeypatch.setattr(
+        'falcon_sqla.manager.random.choice',
+        lambda seq: picks.pop(0) if picks else seq[0],
+    )
+
+    # NOTE: Only the broken engine is avoided upon retrying, not the healthy
+    #   one that served the first statement.
+    def work(session):
+        stmt = select(database.Language.name)
+        return [session.execute(stmt).scalar_one() for _ in range(2)]
+
+    req = falcon.testing.create_req()
+    resp = falcon.Response()
+    assert manager.run_in_session(work, req, resp) == ['Python', 'Python']
+    assert manager.retry_stats.retries == 1
+    assert manager.retry_stats.recovered == 1
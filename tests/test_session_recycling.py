@@ -0,0 +1,135 @@
+import threading
+
+import falcon
+import falcon.testing
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from falcon_sqla import Manager
+
+
+class Languages:
+    def __init__(self, db):
+        self.db = db
+        self.sessions = []
+
+    def on_get(self, req, resp):
+        session = req.context.session
+        self.sessions.append(session)
+
+        resp.media = {
+            'identity_map': len(session.identity_map),
+            'info': sorted(session.info),
+            'languages': [
+                lang.name for lang in session.query(self.db.Language)
+            ],
+        }
+
+    def on_post(self, req, resp):
+        req.context.session.add(self.db.Language(name=req.media['name']))
+        resp.status = falcon.HTTP_CREATED
+
+
+@pytest.fixture
+def manager(database):
+    manager = Manager(database.write_engine)
+    manager.add_engine(database.read_engine, 'r')
+    manager.session_options.recycle_sessions = 2
+    return manager
+
+
+@pytest.fixture
+def resource(database):
+    return Languages(database)
+
+
+@pytest.fixture
+def client(create_app, manager, resource):
+    app = create_app(middleware=[manager.middleware])
+    app.add_route('/languages', resource)
+    return falcon.testing.TestClient(app)
+
+
+def test_reuse_sessions(client, resource):
+    client.simulate_post('/languages', json={'name': 'Python'})
+
+    for _ in range(3):
+        resp = client.simulate_get('/languages')
+        assert resp.json == {
+            'identity_map': 0,
+            'info': ['req', 'resp'],
+            'languages': ['Python'],
+        }
+
+    first, second, third = resource.sessions
+    assert first is second is third
+    assert first.info == {}
+
+
+def test_free_list_bounded(manager):
+    def req_resp():
+        return (
+            falcon.testing.create_req(),
+            falcon.Response(),
+        )
+
+    sessions = [manager.get_session(*req_resp()) for _ in range(3)]
+    assert len(set(map(id, sessions))) == 3
+
+    for session in sessions:
+        manager.close_session(session, True, *req_resp())
+
+    reused = [manager.get_session(*req_resp()) for _ in range(3)]
+    assert reused[0] is sessions[1]
+    assert reused[1] is sessions[0]
+    assert reused[2] not in sessions
+
+
+def test_free_list_per_thread(manager):
+    req = falcon.testing.create_req()
+    resp = falcon.Response()
+
+    session = manager.get_session(req, resp)
+    manager.close_session(session, True, req, resp)
+
+    other = []
+    thread = threading.Thread(
+        target=lambda: other.append(manager.get_session(req, resp))
+    )
+    thread.start()
+    thread.join()
+
+    assert other[0] is not session
+    assert manager.get_session(req, resp) is session
+
+
+def test_add_engine_discards_recycled(manager):
+    req = falcon.testing.create_req()
+    resp = falcon.Response()
+
+    session = manager.get_session(req, resp)
+    manager.close_session(session, True, req, resp)
+
+    manager.add_engine(create_engine('sqlite://'), 'r')
+    assert manager.get_session(req, resp) is not session
+
+
+def test_plain_sessions_not_recycled(database):
+    manager = Manager(database.write_engine, session_cls=Session)
+    manager.session_options.recycle_sessions = 2
+
+    req = falcon.testing.create_req()
+    resp = falcon.Response()
+
+    session = manager.get_session(req, resp)
+    manager.close_session(session, True, req, resp)
+    assert manager.get_session(req, resp) is not session
+
+
+def test_standalone_sessions_not_recycled(manager):
+    with manager.session_scope() as session:
+        pass
+
+    with manager.session_scope() as other:
+        assert other is not session
@@ -0,0 +1,238 @@
+import threading
+import time
+
+import falcon
+import falcon.testing
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy import event
+from sqlalchemy import select
+from sqlalchemy import text
+from sqlalchemy.orm import selectinload
+
+from falcon_sqla import EngineRole
+from falcon_sqla import Manager
+from falcon_sqla.shadow import ShadowStats
+
+
+@pytest.fixture
+def uri(database, tmp_path):
+    uri = f'sqlite:///{tmp_path / "shadow.db"}'
+
+    engine = create_engine(uri)
+    database.Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            database.Language.__table__.insert(),
+            [{'name': 'Python'}, {'name': 'Rust'}],
+        )
+    return uri
+
+
+@pytest.fixture
+def mirrored():
+    return []
+
+
+@pytest.fixture
+def shadow_engine(uri, mirrored):
+    engine = create_engine(uri)
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, *args):
+        mirrored.append((statement, threading.current_thread().name))
+        if 'snippets' in statement:
+            raise RuntimeError('unsupported')
+
+    return engine
+
+
+@pytest.fixture
+def manager(uri, shadow_engine):
+    manager = Manager(create_engine(uri))
+    mirror = manager.enable_shadow_traffic(shadow_engine, sample_rate=1.0)
+    yield manager
+    mirror.close()
+
+
+class Languages:
+    def __init__(self, db):
+        self.db = db
+
+    def on_get(self, req, resp):
+        session = req.context.session
+        stmt = select(self.db.Language.name).where(
+            self.db.Language.name == req.get_param('name', default='Rust')
+        )
+        resp.media = session.execute(stmt).scalars().all()
+
+    def on_post(self, req, resp):
+        session = req.context.session
+        session.add(self.db.Language(name='Go'))
+        session.flush()
+        resp.media = (
+            session.execute(select(self.db.Language.name)).scalars().all()
+        )
+
+
+def wait_for(mirror, count):
+    for _ in range(500):
+        stats = next(iter(mirror.stats.values()))
+        if stats.mirrored + stats.errors >= count:
+            return stats
+        time.sleep(0.01)
+    raise AssertionError('timed out')
+
+
+def test_shadow_stats():
+    stats = ShadowStats()
+    assert stats.slowdown is None
+    assert stats.as_dict() == {
+        'mirrored': 0,
+        'dropped': 0,
+        'errors': 0,
+        'primary_time': 0.0,
+        'shadow_time': 0.0,
+        'slowdown': None,
+    }
+    assert repr(stats) == 'ShadowStats(mirrored=0, dropped=0, errors=0)'
+
+    stats.primary_time = 0.5
+    stats.shadow_time = 1.0
+    assert stats.slowdown == 2.0
+
+
+def test_mirror(create_app, database, manager, mirrored):
+    mirror = manager.enable_shadow_traffic(None)
+    assert manager.shadow_stats is mirror.stats
+
+    app = create_app(middleware=[manager.middleware])
+    app.add_route('/languages', Languages(database))
+    client = falcon.testing.TestClient(app)
+
+    resp = client.simulate_get('/languages', params={'name': 'Python'})
+    assert resp.json == ['Python']
+    stats = wait_for(mirror, 1)
+    assert stats.mirrored == 1
+    assert stats.primary_time > 0
+    assert stats.shadow_time > 0
+
+    # NOTE: The bound parameters are mirrored, too.
+    statement, thread = mirrored[0]
+    assert statement.startswith('SELECT languages.name')
+    assert thread == 'falcon-sqla-shadow'
+
+    # NOTE: Unsafe requests are not mirrored.
+    resp = client.simulate_post('/languages')
+    assert resp.json == ['Python', 'Rust', 'Go']
+    client.simulate_get('/languages')
+    assert wait_for(mirror, 2).mirrored == 2
+    assert len(mirrored) == 2
+
+
+def test_mirror_eager_loads(database, manager, mirrored):
+    req = falcon.testing.create_req()
+    with manager.session_scope(req, falcon.Response()) as session:
+        session.add(database.Snippet(languageid=1, code='print()'))
+
+    with manager.session_scope(req, falcon.Response()) as session:
+        stmt = select(database.Language).options(
+            selectinload(database.Language.snippets)
+        )
+        assert len(session.execute(stmt).scalars().all()) == 2
+
+    stats = wait_for(manager._shadow, 2)
+    assert (stats.mirrored, stats.errors) == (1, 1)
+
+
+def test_sample_rate(manager, mirrored):
+    manager._shadow.sample_rate = 0.0
+    req = falcon.testing.create_req()
+    with manager.session_scope(req, falcon.Response()) as session:
+        session.execute(select(text('1'))).all()
+    with manager.session_scope() as session:
+        session.execute(select(text('2'))).all()
+
+    manager._shadow.close()
+    assert mirrored == []
+
+
+def test_dropped(uri, shadow_engine):
+    manager = Manager(create_engine(uri))
+    assert manager.shadow_stats == {}
+    mirror = manager.enable_shadow_traffic(shadow_engine, 1.0, max_pending=1)
+    mirror.close()
+
+    # NOTE: Block the worker until the queue has overflown.
+    blocked = threading.Event()
+
+    @event.listens_for(shadow_engine, 'connect')
+    def connect(dbapi_connection, connection_record):
+        blocked.wait()
+
+    req = falcon.testing.create_req()
+    for _ in range(4):
+        with manager.session_scope(req, falcon.Response()) as session:
+            session.execute(select(text('1'))).all()
+    blocked.set()
+    mirror.close()
+
+    (stats,) = manager.shadow_stats.values()
+    assert stats.dropped >= 2
+    assert stats.mirrored + stats.dropped == 4
+
+    # NOTE: Attaching an engine again is a no-op.
+    mirror.attach(manager.write_engines[0])
+    assert manager.shadow_stats == {manager.write_engines[0]: stats}
+
+
+def test_remove_engine(uri, shadow_engine):
+    manager = Manager(create_engine(uri))
+    manager.session_options.read_from_rw_engines = False
+    replica = create_engine(uri)
+    manager.add_engine(replica, EngineRole.READ)
+    mirror = manager.enable_shadow_traffic(shadow_engine, 1.0)
+
+    # NOTE: Block the worker until the replica has been removed.
+    blocked = threading.Event()
+
+    @event.listens_for(shadow_engine, 'connect')
+    def connect(dbapi_connection, connection_record):
+        blocked.wait()
+
+    req = falcon.testing.create_req()
+    for _ in range(2):
+        with manager.session_scope(req, falcon.Response()) as session:
+            session.execute(select(text('1'))).all()
+    assert replica in manager.shadow_stats
+
+    manager.remove_engine(replica)
+    blocked.set()
+    mirror.close()
+
+    assert replica not in manager.shadow_stats
+    assert all(stats.mirrored == 0 for stats in manager.shadow_stats.values())
+
+
+def test_shadow_time(uri, shadow_engine):
+    manager = Manager(create_engine(uri))
+    mirror = manager.enable_shadow_traffic(shadow_engine, 1.0)
+
+    # NOTE: Connecting to the shadow engine is not timed.
+    @event.listens_for(shadow_engine, 'connect')
+    def connect(dbapi_connection, connection_record):
+        time.sleep(0.2)
+
+    req = falcon.testing.create_req()
+    with manager.session_scope(req, falcon.Response()) as session:
+        session.execute(select(text('1'))).all()
+    mirror.close()
+
+    (stats,) = manager.shadow_stats.values()
+    assert stats.mirrored == 1
+    assert 0.0 < stats.shadow_time < 0.2
+
+    # NOTE: Statements that are not mirrored are not timed either.
+    with shadow_engine.connect() as conn:
+        assert conn.execute(text('SELECT 2')).scalar() == 2
+    assert stats.shadow_time < 0.2
@@ -0,0 +1,256 @@
+import gc
+import multiprocessing
+import os
+import subprocess
+import sys
+import weakref
+
+import falcon
+import falcon.testing
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy import select
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from falcon_sqla import EngineRole
+from falcon_sqla import Manager
+from falcon_sqla import sharedstats
+from falcon_sqla.sharedstats import SharedStats
+from falcon_sqla.sharedstats import SharedStatsResource
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'stats.bin')
+
+
+@pytest.fixture
+def engine(tmp_path):
+    return create_engine(f'sqlite:///{tmp_path / "stats.db"}')
+
+
+def query(engine, times=1):
+    for _ in range(times):
+        with engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+class Languages:
+    def __init__(self, db):
+        self.db = db
+
+    def on_get(self, req, resp):
+        stmt = select(self.db.Language.name)
+        resp.media = req.context.session.execute(stmt).scalars().all()
+
+    def on_get_core(self, req, resp):
+        resp.media = req.context.connection.execute(text('SELECT 1')).scalar()
+
+
+def test_manager(create_app, database, path):
+    manager = Manager(database.write_engine)
+    manager.session_options.read_from_rw_engines = False
+    manager.add_engine(database.read_engine, EngineRole.READ)
+    assert manager.shared_stats is None
+
+    stats = manager.enable_shared_stats(path, max_workers=4, max_engines=4)
+    assert manager.enable_shared_stats(path) is stats
+    assert manager.shared_stats is stats
+
+    app = create_app(middleware=[manager.middleware])
+    app.add_route('/languages', Languages(database))
+    client = falcon.testing.TestClient(app)
+    for _ in range(3):
+        assert client.simulate_get('/languages').status_code == 200
+    assert client.simulate_post('/languages').status_code == 405
+
+    app = create_app(middleware=[manager.connection_middleware])
+    app.add_route('/core', Languages(database), suffix='core')
+    client = falcon.testing.TestClient(app)
+    assert client.simulate_get('/core').json == 1
+
+    snapshot = stats.snapshot()
+    write_name = database.write_engine.url.render_as_string() + '#0'
+    read_name = database.read_engine.url.render_as_string() + '#0'
+    assert set(snapshot['engines']) == {write_name, read_name}
+
+    read = snapshot['engines'][read_name]
+    assert read['selections'] == 4
+    assert read['checkouts'] == 4
+    assert read['statements'] == 4
+    assert read['checkout_time'] > 0
+    assert read['db_time'] > 0
+    assert read['errors'] == 0
+    assert snapshot['workers'] == {os.getpid(): snapshot['engines']}
+
+    resp = falcon.testing.TestClient(create_app(middleware=[])).simulate_get(
+        '/'
+    )
+    assert resp.status_code == 404
+
+    stats.close()
+    stats.close()
+
+
+def test_resource(create_app, engine, path):
+    stats = SharedStats(path)
+    stats.attach(engine)
+    stats.attach(engine)
+    query(engine, 2)
+
+    app = create_app()
+    app.add_route('/stats', SharedStatsResource(stats))
+    resp = falcon.testing.TestClient(app).simulate_get('/stats')
+    name = f'{engine.url}#0'
+    assert resp.json['engines'][name]['statements'] == 2
+    assert resp.json['workers'] == {str(os.getpid()): resp.json['engines']}
+
+
+def test_errors(engine, path):
+    stats = SharedStats(path)
+    stats.attach(engine)
+
+    with pytest.raises(OperationalError):
+        with engine.connect() as conn:
+            conn.execute(text('SELECT * FROM nonexistent'))
+
+    counters = stats.snapshot()['engines'][f'{engine.url}#0']
+    assert (counters['statements'], counters['errors']) == (0, 1)
+
+    # NOTE: Errors connecting to the database are counted too.
+    broken = create_engine(f'sqlite:///{path}.d/nonexistent/stats.db')
+    stats.attach(broken)
+    with pytest.raises(OperationalError):
+        query(broken)
+    assert stats.snapshot()['engines'][f'{broken.url}#0']['errors'] == 1
+
+
+def test_same_url(engine, path):
+    stats = SharedStats(path)
+    replica = create_engine(engine.url)
+    stats.attach(engine)
+    stats.attach(replica)
+    query(replica)
+
+    engines = stats.snapshot()['engines']
+    assert engines[f'{engine.url}#0']['statements'] == 0
+    assert engines[f'{engine.url}#1']['statements'] == 1
+
+
+def _child(path, url):
+    stats = SharedStats(path)
+    engine = create_engine(url)
+    stats.attach(engine)
+    query(engine, 3)
+
+
+def _forked_child(engine):
+    query(engine, 2)
+
+
+def test_multiple_processes(engine, path):
+    stats = SharedStats(path)
+    stats.attach(engine)
+    query(engine)
+
+    context = multiprocessing.get_context('fork')
+    for target, args in (
+        (_child, (path, str(engine.url))),
+        (_forked_child, (engine,)),
+    ):
+        process = context.Process(target=target, args=args)
+        process.start()
+        process.join()
+        assert process.exitcode == 0
+
+    snapshot = stats.snapshot()
+    assert snapshot['engines'][f'{engine.url}#0']['statements'] == 6
+    assert list(snapshot['workers']) == [os.getpid()]
+
+
+def test_reopen(engine, path):
+    SharedStats(path).close()
+    with pytest.raises(ValueError):
+        SharedStats(path, max_workers=2)
+
+    stats = SharedStats(path)
+    stats.attach(engine)
+    query(engine)
+
+    # NOTE: The slots of exited workers are reused, and counters retained.
+    stats._counters[stats._pid_offset(0)] = dead_pid()
+    stats._claim_worker()
+    query(engine)
+    assert stats.snapshot()['engines'][f'{engine.url}#0']['statements'] == 2
+
+    other = SharedStats(path)
+    other.attach(create_engine(engine.url))
+    assert list(other._engines.values()) == list(stats._engines.values())
+
+
+def test_long_url(tmp_path, path):
+    url = f'sqlite:///{tmp_path / ("x" * 300)}.db'
+    stats = SharedStats(path, max_engines=2)
+    stats.attach(create_engine(url))
+
+    # NOTE: Truncated names are still matched by other workers.
+    other = SharedStats(path, max_engines=2)
+    other.attach(create_engine(url))
+    assert list(other._engines.values()) == [0]
+
+
+def test_no_vacant_slots(tmp_path, path):
+    stats = SharedStats(path, max_workers=1, max_engines=1)
+    engines = [
+        create_engine(f'sqlite:///{tmp_path / f"db{index}.db"}')
+        for index in range(2)
+    ]
+
+    stats.attach(engines[0])
+    with pytest.warns(RuntimeWarning, match='engine slots'):
+        stats.attach(engines[1])
+    query(engines[1])
+
+    stats._counters[stats._pid_offset(0)] = os.getppid()
+    with pytest.warns(RuntimeWarning, match='worker slots'):
+        stats._claim_worker()
+    query(engines[0])
+
+    snapshot = stats.snapshot()
+    assert snapshot['engines'] == {
+        f'{engines[0].url}#0': dict.fromkeys(sharedstats.COUNTERS, 0)
+    }
+    stats.close()
+
+
+def test_after_fork(path):
+    stats = SharedStats(path)
+    stats.close()
+    sharedstats._after_fork(weakref.ref(stats))
+
+    ref = weakref.ref(SharedStats(path))
+    gc.collect()
+    sharedstats._after_fork(ref)
+
+    stats = SharedStats(path)
+    base = stats._base
+    sharedstats._after_fork(weakref.ref(stats))
+    assert stats._base == base
+
+
+def test_plain_session(database, path):
+    manager = Manager(database.write_engine, session_cls=Session)
+    stats = manager.enable_shared_stats(path)
+
+    with manager.session_scope() as session:
+        session.execute(text('SELECT 1'))
+    name = f'{database.write_engine.url}#0'
+    assert stats.snapshot()['engines'][name]['statements'] == 1
@@ -0,0 +1,124 @@
+import threading
+
+import falcon
+import falcon.testing
+import pytest
+from sqlalchemy import exc
+from sqlalchemy import func
+from sqlalchemy import select
+from sqlalchemy import text
+
+from falcon_sqla import EngineRole
+from falcon_sqla import Manager
+from falcon_sqla import sqlite
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / 'profile.db'
+
+
+def pragma(engine, name):
+    with engine.connect() as conn:
+        return conn.execute(text(f'PRAGMA {name}')).scalar()
+
+
+class Languages:
+    def __init__(self, db, manager):
+        self.db = db
+        self.manager = manager
+
+    def on_get(self, req, resp):
+        session = req.context.session
+        stmt = select(func.count(self.db.Language.id))
+        resp.media = {
+            'count': session.scalar(stmt),
+            'reader': session.get_bind() in self.manager.read_engines,
+        }
+
+    def on_post(self, req, resp):
+        req.context.session.add(self.db.Language(name=req.media['name']))
+
+
+def test_for_sqlite(create_app, database, path):
+    manager = Manager.for_sqlite(path, readers=2)
+    writer = manager.write_engines[0]
+    assert path.exists()
+    assert manager._engines == {
+        writer: EngineRole.READ_WRITE,
+        manager.read_engines[0]: EngineRole.READ,
+        manager.read_engines[1]: EngineRole.READ,
+    }
+    database.Base.metadata.create_all(writer)
+
+    app = create_app(middleware=[manager.middleware])
+    app.add_route('/languages', Languages(database, manager))
+    client = falcon.testing.TestClient(app)
+
+    for name in ('Python', 'Rust'):
+        resp = client.simulate_post('/languages', json={'name': name})
+        assert resp.status_code == 200
+    assert client.simulate_get('/languages').json == {
+        'count': 2,
+        'reader': True,
+    }
+
+
+def test_pragmas(path):
+    manager = Manager.for_sqlite(
+        path, readers=1, pragmas={'cache_size': None, 'foreign_keys': 'ON'}
+    )
+    writer = manager.write_engines[0]
+    (reader,) = manager.read_engines
+
+    assert pragma(writer, 'journal_mode') == 'wal'
+    assert pragma(reader, 'journal_mode') == 'wal'
+    for engine in (writer, reader):
+        assert pragma(engine, 'busy_timeout') == 5000
+        assert pragma(engine, 'synchronous') == 1
+        assert pragma(engine, 'foreign_keys') == 1
+        assert pragma(engine, 'cache_size') == -2000
+
+
+def test_reader_is_read_only(path):
+    writer = sqlite.create_writer_engine(path)
+    with writer.begin() as conn:
+        conn.execute(text('CREATE TABLE items (id INTEGER PRIMARY KEY)'))
+
+    reader = sqlite.create_reader_engine(path)
+    with reader.connect() as conn:
+        with pytest.raises(exc.OperationalError, match='readonly'):
+            conn.execute(text('INSERT INTO items DEFAULT VALUES'))
+
+
+def test_writers_serialized(path):
+    writer = sqlite.create_writer_engine(path, pool_timeout=0.01)
+    acquired = threading.Event()
+    release = threading.Event()
+
+    def hold():
+        with writer.connect():
+            acquired.set()
+            release.wait()
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    acquired.wait()
+    try:
+        with pytest.raises(exc.TimeoutError):
+            writer.connect()
+    finally:
+        release.set()
+        thread.join()
+
+    writer.connect().close()
+
+
+def test_no_readers(path):
+    manager = Manager.for_sqlite(str(path), readers=0)
+    assert manager.read_engines == manager.write_engines
+    assert manager.session_options.read_from_rw_engines is True
+
+    req = falcon.testing.create_req()
+    with manager.session_scope(req, falcon.Response()) as session:
+        assert session.scalar(text('SELECT 1')) == 1
@@ -0,0 +1,287 @@
+import json
+import random
+import sqlite3
+
+import falcon
+import falcon.testing
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy import select
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from falcon_sqla import EngineRole
+from falcon_sqla import Manager
+from falcon_sqla import tracing
+from falcon_sqla.tracing import JSONLinesExporter
+from falcon_sqla.tracing import Span
+from falcon_sqla.tracing import Trace
+from falcon_sqla.tracing import Tracer
+
+
+@pytest.fixture
+def engine(database, tmp_path):
+    engine = create_engine(f'sqlite:///{tmp_path / "tracing.db"}')
+    database.Base.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture
+def traces():
+    return []
+
+
+@pytest.fixture
+def manager(engine, traces):
+    manager = Manager(engine)
+    manager.session_options.read_from_rw_engines = False
+    manager.add_engine(engine.execution_options(), EngineRole.READ)
+    manager.enable_tracing(traces.append)
+    return manager
+
+
+class Languages:
+    def __init__(self, db):
+        self.db = db
+
+    def on_get(self, req, resp):
+        stmt = select(self.db.Language.name)
+        names = req.context.session.execute(stmt).scalars().all()
+        if req.get_param_as_bool('stream'):
+            resp.stream = iter([json.dumps(names).encode()])
+        else:
+            resp.media = names
+
+    def on_post(self, req, resp):
+        req.context.session.add(self.db.Language(name=req.media['name']))
+
+    def on_options(self, req, resp):
+        resp.status = falcon.HTTP_204
+
+
+@pytest.fixture
+def client(create_app, database, manager):
+    app = create_app(middleware=[manager.middleware])
+    app.add_route('/languages', Languages(database))
+    return falcon.testing.TestClient(app)
+
+
+def tree(trace):
+    names = {span.span_id: span.name for span in trace.spans}
+    return [(span.name, names.get(span.parent_id)) for span in trace.spans]
+
+
+def test_span():
+    span = Span('statement', None, {'db.statement': 'SELECT 1'}, 1000)
+    assert span.duration is None
+    assert repr(span) == f"Span('statement', {span.span_id})"
+
+    span.end_time = 3000
+    span.error = 'disk I/O error'
+    assert span.duration == 2e-6
+    assert span.as_dict('t' * 32) == {
+        'traceId': 't' * 32,
+        'spanId': span.span_id,
+        'parentSpanId': None,
+        'name': 'statement',
+        'startTimeUnixNano': 1000,
+        'endTimeUnixNano': 3000,
+        'attributes': {'db.statement': 'SELECT 1'},
+        'status': {'code': 'ERROR', 'message': 'disk I/O error'},
+    }
+
+
+def test_trace_nesting():
+    tracer = Tracer(lambda trace: None)
+    trace = tracer.start_trace('request')
+    assert tracing.current_trace() is trace
+
+    outer = trace.start_span('outer')
+    trace.start_span('inner')
+    trace.end_span(outer)
+    assert all(span.end_time for span in trace.spans[1:])
+
+    with pytest.raises(ValueError):
+        with tracing.span('failing', answer=42):
+            raise ValueError('no such thing')
+
+    with tracing.span('ok') as span:
+        trace.add_span('child', span.start_time)
+
+    tracer.finish_trace(trace, status=200)
+    assert tracing.current_trace() is None
+    assert tree(trace) == [
+        ('request', None),
+        ('outer', 'request'),
+        ('inner', 'outer'),
+        ('failing', 'request'),
+        ('ok', 'request'),
+        ('child', 'ok'),
+    ]
+    assert trace.spans[0].attributes == {'status': 200}
+    assert trace.spans[3].error == 'no such thing'
+    assert [span['status']['code'] for span in trace.as_dicts()] == [
+        'OK',
+        'OK',
+        'OK',
+        'ERROR',
+        'OK',
+        'OK',
+    ]
+
+    with tracing.span('untraced') as span:
+        assert span is None
+
+
+def test_sampling(monkeypatch):
+    tracer = Tracer(lambda trace: None, sample_rate=0.0)
+    assert tracer.start_trace('request') is None
+
+    tracer.sample_rate = 0.5
+    monkeypatch.setattr(random, 'random', lambda: 0.25)
+    trace = tracer.start_trace('request')
+    other = tracer.start_trace('request')
+    tracer.finish_trace(other)
+    assert tracing.current_trace() is trace
+    tracer.finish_trace(trace)
+    assert tracing.current_trace() is None
+
+    # NOTE: Unsampled requests do not inherit a stale trace.
+    stale = tracer.start_trace('request')
+    monkeypatch.setattr(random, 'random', lambda: 0.75)
+    assert tracer.start_trace('request') is None
+    assert tracing.current_trace() is None
+    tracer.finish_trace(stale)
+    assert tracing.current_trace() is None
+
+    # NOTE: Traces that have not been started by the tracer are not current.
+    orphan = Trace(tracer)
+    orphan.start_span('request')
+    tracer.finish_trace(orphan)
+    assert tracing.current_trace() is None
+
+
+def test_not_sampled(client, manager, traces):
+    manager.enable_tracing(traces.append, sample_rate=0.0)
+    assert client.simulate_get('/languages').status_code == 200
+    assert traces == []
+
+
+def test_engine_attributes(engine):
+    tracer = Tracer(lambda trace: None)
+    with engine.connect() as conn:
+        attributes = tracer.engine_attributes(conn)
+    assert attributes == {
+        'db.system': 'sqlite',
+        'falcon_sqla.engine': str(engine.url),
+        'falcon_sqla.engine_id': id(engine),
+        'falcon_sqla.engine_role': None,
+    }
+
+
+def test_request(client, engine, manager, traces):
+    replica = manager.read_engines[0]
+
+    resp = client.simulate_get('/languages')
+    assert resp.status_code == 200
+
+    (trace,) = traces
+    assert tree(trace) == [
+        ('GET /languages', None),
+        ('session', 'GET /languages'),
+        ('checkout', 'session'),
+        ('statement', 'session'),
+        ('commit', 'session'),
+    ]
+    root = trace.spans[0]
+    assert root.attributes == {
+        'http.method': 'GET',
+        'http.target': '/languages',
+        'http.status_code': 200,
+    }
+
+    statement = trace.spans[3]
+    assert statement.attributes['db.statement'].startswith('SELECT')
+    assert statement.attributes['falcon_sqla.engine_id'] == id(replica)
+    assert statement.attributes['falcon_sqla.engine_role'] == 'READ'
+    assert all(span.end_time >= span.start_time for span in trace.spans)
+    assert tracing.current_trace() is None
+
+
+def test_streamed_response(client, traces):
+    resp = client.simulate_get('/languages', params={'stream': True})
+    assert resp.json == []
+    assert [span.name for span in traces[0].spans][-1] == 'commit'
+
+
+def test_no_session(client, traces):
+    client.simulate_options('/languages')
+    assert tree(traces[0]) == [('OPTIONS /languages', None)]
+
+
+def test_failed_commit(client, traces):
+    resp = client.simulate_post('/languages', json={'name': None})
+    assert resp.status_code == 500
+
+    (trace,) = traces
+    assert trace.spans[1].name == 'session'
+    assert 'NOT NULL' in trace.spans[1].error
+    errors = {span.name for span in trace.spans if span.error}
+    assert errors == {'session', 'statement', 'commit'}
+
+
+def test_untraced_statements(engine, manager, traces):
+    with engine.connect() as conn:
+        conn.execute(text('SELECT 1'))
+
+    def connect():
+        raise sqlite3.OperationalError('unable to open database file')
+
+    failing = create_engine('sqlite:///', creator=connect)
+    manager.add_engine(failing, EngineRole.READ)
+    manager.tracer.attach(failing)
+    with pytest.raises(OperationalError):
+        failing.connect()
+
+    with pytest.raises(OperationalError):
+        with engine.connect() as conn:
+            conn.execute(text('SELECT nothing FROM nowhere'))
+
+    assert traces == []
+
+
+def test_enable_tracing_twice(manager, traces):
+    tracer = manager.tracer
+    assert manager.enable_tracing(print, sample_rate=0.5) is tracer
+    assert (tracer.sink, tracer.sample_rate) == (print, 0.5)
+    assert Manager(manager.write_engines[0]).tracer is None
+
+
+def test_json_lines_exporter(client, manager, tmp_path):
+    path = tmp_path / 'traces.jsonl'
+    exporter = JSONLinesExporter(str(path))
+    manager.enable_tracing(exporter)
+
+    client.simulate_get('/languages')
+    client.simulate_get('/languages')
+    exporter.close()
+    exporter.close()
+
+    spans = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(spans) == 10
+    assert len({span['traceId'] for span in spans}) == 2
+    assert spans[0]['name'] == 'GET /languages'
+    assert spans[0]['attributes']['http.status_code'] == 200
+
+
+def test_json_lines_exporter_dropped(monkeypatch, tmp_path):
+    exporter = JSONLinesExporter(str(tmp_path / 'x.jsonl'), max_queue_size=1)
+    exporter._start()
+    exporter._start()
+    exporter.close()
+    monkeypatch.setattr(exporter, '_start', lambda: None)
+
+    tracer = Tracer(exporter)
+    for _ in range(3):
+        tracer.finish_trace(tracer.start_trace('request'))
+    assert exporter.dropped == 2
@@ -0,0 +1,283 @@
+import json
+import os
+import runpy
+import sys
+import time
+
+import falcon
+import falcon.testing
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy import func
+from sqlalchemy import select
+from sqlalchemy import text
+
+from falcon_sqla import EngineRole
+from falcon_sqla import Manager
+from falcon_sqla import workload
+
+
+class Languages:
+    def __init__(self, db):
+        self.db = db
+
+    def on_get(self, req, resp):
+        stmt = select(self.db.Language.name).where(
+            self.db.Language.name != req.get_param('exclude', default='')
+        )
+        resp.media = req.context.session.execute(stmt).scalars().all()
+
+    def on_post(self, req, resp):
+        req.context.session.add(self.db.Language(name=req.media['name']))
+
+
+class Items:
+    def on_post(self, req, resp):
+        req.context.connection.execute(
+            text('INSERT INTO languages (name) VALUES (:name)'),
+            [{'name': name} for name in req.media],
+        )
+        resp.media = req.context.connection.scalar(
+            text('SELECT count(*) FROM languages')
+        )
+
+
+def create_database(database, path):
+    engine = create_engine(f'sqlite:///{path}')
+    database.Base.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture
+def manager(database, tmp_path):
+    primary = create_database(database, tmp_path / 'primary.db')
+    manager = Manager(primary)
+    manager.session_options.read_from_rw_engines = False
+    manager.add_engine(create_engine(primary.url), EngineRole.READ)
+    return manager
+
+
+@pytest.fixture
+def client(create_app, database, manager):
+    app = create_app(middleware=[manager.middleware])
+    app.add_route('/languages', Languages(database))
+    return falcon.testing.TestClient(app)
+
+
+@pytest.fixture
+def capture_path(tmp_path):
+    return str(tmp_path / 'workload.jsonl')
+
+
+def capture(client, manager):
+    client.simulate_post('/languages', json={'name': 'Python'})
+    client.simulate_get('/languages', params={'exclude': 'Rust'})
+    client.simulate_options('/languages')
+    manager.workload_recorder.close()
+
+
+def test_capture(client, manager, capture_path):
+    recorder = manager.enable_workload_capture(capture_path)
+    assert manager.enable_workload_capture(capture_path) is recorder
+    assert manager.workload_recorder is recorder
+
+    capture(client, manager)
+    post, get = workload.read_workload(capture_path)
+
+    assert (post.method, post.path) == ('POST', '/languages')
+    assert post.duration > 0
+    ((offset, duration, role, statement, parameters, executemany),) = (
+        post.statements
+    )
+    assert offset >= 0
+    assert duration > 0
+    assert role == 'rw'
+    assert statement.startswith('INSERT INTO languages')
+    assert parameters[0] == 'Python'
+    assert executemany is False
+
+    assert repr(get) == (
+        "CapturedRequest(method='GET', path='/languages', statements=1)"
+    )
+    _, _, role, statement, parameters, _ = get.statements[0]
+    assert role == 'r'
+    assert statement.startswith('SELECT languages.name')
+    assert parameters == ['Rust']
+
+    # NOTE: The file is appended to.
+    recorder.close()
+    capture(client, manager)
+    assert len(workload.read_workload(capture_path)) == 4
+
+
+@pytest.mark.parametrize('redact', [False, True])
+def test_capture_connection(
+    create_app, database, manager, capture_path, tmp_path, redact
+):
+    manager.enable_workload_capture(capture_path, redact=redact)
+
+    app = create_app(middleware=[manager.connection_middleware])
+    app.add_route('/items', Items())
+    client = falcon.testing.TestClient(app)
+    assert client.simulate_post('/items', json=['Python', 'Rust']).json == 2
+    manager.workload_recorder.close()
+
+    (captured,) = workload.read_workload(capture_path)
+    insert, count = captured.statements
+    assert insert[2:] == [
+        'rw',
+        'INSERT INTO languages (name) VALUES (?)',
+        [[None], [None]] if redact else [['Python'], ['Rust']],
+        True,
+    ]
+    assert count[2:] == ['rw', 'SELECT count(*) FROM languages', [], False]
+
+    if not redact:
+        engine = create_database(database, tmp_path / 'replay.db')
+        stats = workload.replay([captured], [engine], commit=True)
+        assert (stats.statements, stats.errors) == (2, 0)
+        assert count_languages(database, engine) == 2
+
+
+def test_redact():
+    assert workload._redact({'name': 'Python'}, False) == {'name': None}
+    assert workload._redact(('Python', 1), False) == [None, None]
+
+
+def test_capture_sampling(client, manager, capture_path):
+    recorder = manager.enable_workload_capture(capture_path, sample_rate=0.0)
+    capture(client, manager)
+    assert not os.path.exists(capture_path)
+
+    # NOTE: Statements outside of captured requests are not recorded.
+    recorder.sample_rate = 1.0
+    req = falcon.testing.create_req()
+    recorder.finish(recorder.start(req))
+    with manager.session_scope() as session:
+        session.execute(text('SELECT 1'))
+
+    # NOTE: Finishing a nested capture restores the outer one.
+    outer = recorder.start(req)
+    recorder.finish(recorder.start(req))
+    assert workload._current.get() is outer
+    recorder.finish(outer)
+    assert workload._current.get() is None
+
+    # NOTE: Unsampled requests do not inherit a stale capture.
+    stale = recorder.start(req)
+    recorder.sample_rate = 0.0
+    assert recorder.start(req) is None
+    assert workload._current.get() is None
+    recorder.finish(stale)
+    recorder.finish(workload.CapturedRequest('GET', '/'))
+    assert workload._current.get() is None
+
+    recorder.close()
+    assert [
+        item.statements for item in workload.read_workload(capture_path)
+    ] == [[]] * 5
+
+
+def test_capture_dropped(database, tmp_path, capture_path, monkeypatch):
+    recorder = workload.WorkloadRecorder(capture_path, max_queue_size=1)
+    engine = create_database(database, tmp_path / 'dropped.db')
+    recorder.attach(engine)
+    recorder.attach(engine)
+
+    # NOTE: Defer starting the writer thread until the queue has overflown.
+    monkeypatch.setattr(recorder, '_start', lambda: None)
+    req = falcon.testing.create_req()
+    for _ in range(3):
+        captured = recorder.start(req)
+        with engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+        recorder.finish(captured)
+    monkeypatch.undo()
+
+    recorder._start()
+    recorder._start()
+    recorder.close()
+    assert recorder.dropped == 2
+    (captured,) = workload.read_workload(capture_path)
+    assert captured.statements[0][2:] == [None, 'SELECT 1', [], False]
+
+
+@pytest.fixture
+def captured(client, manager, capture_path):
+    manager.enable_workload_capture(capture_path)
+    capture(client, manager)
+    return workload.read_workload(capture_path)
+
+
+def count_languages(database, engine):
+    with engine.connect() as conn:
+        return conn.scalar(select(func.count(database.Language.id)))
+
+
+@pytest.mark.parametrize('commit', [False, True])
+def test_replay(database, tmp_path, captured, commit):
+    engine = create_database(database, tmp_path / 'replay.db')
+    replica = create_engine(engine.url)
+
+    stats = workload.replay(
+        captured, [engine], [replica], speed=0.0, commit=commit
+    )
+    assert (stats.requests, stats.statements, stats.errors) == (2, 2, 0)
+    assert stats.db_time > 0
+    assert stats.original_db_time > 0
+    assert count_languages(database, engine) == int(commit)
+
+    summary = stats.as_dict()
+    assert summary['requests'] == 2
+    assert summary['throughput_rps'] > 0
+    assert summary['p50'] <= summary['p99']
+    assert repr(stats) == 'ReplayStats(requests=2, statements=2, errors=0)'
+
+
+def test_replay_errors(tmp_path, captured):
+    engine = create_engine(f'sqlite:///{tmp_path / "empty.db"}')
+
+    stats = workload.replay(captured, [engine], speed=0.0, commit=True)
+    assert (stats.requests, stats.statements, stats.errors) == (2, 0, 2)
+
+
+def test_replay_pace(database, tmp_path, captured):
+    engine = create_database(database, tmp_path / 'replay.db')
+    captured[1].start = captured[0].start + 0.2
+
+    start = time.perf_counter()
+    workload.replay(captured, [engine], speed=2.0)
+    assert time.perf_counter() - start >= 0.1
+
+
+def test_replay_stats():
+    assert workload.ReplayStats().as_dict() == {
+        'requests': 0,
+        'statements': 0,
+        'errors': 0,
+        'elapsed': 0.0,
+        'throughput_rps': None,
+        'original_db_time': 0.0,
+        'db_time': 0.0,
+        'p50': None,
+        'p99': None,
+    }
+
+
+def test_main(database, tmp_path, captured, capture_path, capsys, monkeypatch):
+    engine = create_database(database, tmp_path / 'replay.db')
+    url = engine.url.render_as_string()
+
+    workload.main([capture_path, '--write', url, '--speed', '0', '--commit'])
+    assert json.loads(capsys.readouterr().out)['statements'] == 2
+    assert count_languages(database, engine) == 1
+
+    monkeypatch.setattr(
+        sys,
+        'argv',
+        ['workload', capture_path, '--write', url, '--read', url]
+        + ['--pool-size', '2', '--speed', '0'],
+    )
+    monkeypatch.delitem(sys.modules, 'falcon_sqla.workload')
+    runpy.run_module('falcon_sqla.workload', run_name='__main__')
+    assert json.loads(capsys.readouterr().out)['errors'] == 0